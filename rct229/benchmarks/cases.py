@@ -0,0 +1,155 @@
+import io
+import json
+import os
+
+from rct229.data_fns.table_8_4_4_eff import table_8_4_4_eff
+from rct229.rule_engine.engine import evaluate_all_rules
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.rules.section15 import Section15Rule4
+from rct229.schema.validate import validate_rmr
+from rct229.utils.file import deserialize_rmr_file
+from rct229.utils.jsonpath_utils import find_all
+from rct229.utils.match_lists import match_lists
+from rct229.utils.rmr_generator import RMRGenerator
+
+# Generator counts of each model size; see RMRGenerator
+SIZES = {
+    'small': {},
+    'medium': {'zones': 20, 'transformers': 50},
+    'large': {'buildings': 2, 'zones': 50, 'transformers': 200, 'schedules': 8}
+}
+
+# The fraction of baseline and proposed objects that differ from the user RMR
+MODEL_DIVERGENCE = 0.1
+MODEL_SEED = 0
+
+SURFACES_JSONPATH = 'buildings[*].building_segments[*].thermal_blocks[*].zones[*].spaces[*].surfaces[*]'
+
+
+class BenchmarkModel:
+    """A synthetic RMR trio of one size, generated on first use"""
+
+    def __init__(self, size, directory):
+        """
+        Parameters
+        ----------
+        size : string
+            A key of SIZES
+        directory : string
+            A directory for the RMR files of the trio
+        """
+        self.size = size
+        self.directory = directory
+        self._texts = None
+        self._rmrs = None
+        self._user_path = None
+
+    @property
+    def texts(self):
+        """The user, baseline, and proposed RMR JSON"""
+        if self._texts is None:
+            generator = RMRGenerator(SIZES[self.size], MODEL_SEED, MODEL_DIVERGENCE)
+            texts = []
+            for variant in ['user', 'baseline', 'proposed']:
+                stream = io.StringIO()
+                generator.write(stream, variant)
+                texts.append(stream.getvalue())
+            self._texts = UserBaselineProposedVals(*texts)
+
+        return self._texts
+
+    @property
+    def rmrs(self):
+        """The user, baseline, and proposed RMRs"""
+        if self._rmrs is None:
+            texts = self.texts
+            self._rmrs = UserBaselineProposedVals(
+                json.loads(texts.user), json.loads(texts.baseline), json.loads(texts.proposed)
+            )
+
+        return self._rmrs
+
+    @property
+    def user_path(self):
+        """The path of the user RMR file"""
+        if self._user_path is None:
+            path = os.path.join(self.directory, f'{self.size}_user_rmr.json')
+            with open(path, 'w') as f:
+                f.write(self.texts.user)
+            self._user_path = path
+
+        return self._user_path
+
+
+# Each case returns (function to measure, number of units it processes, unit)
+# for a model; the units let a cost be estimated for other models
+
+def _validate_rmr_case(model):
+    rmr = model.rmrs.user
+
+    return lambda: validate_rmr(rmr), len(model.texts.user), 'bytes'
+
+def _deserialize_rmr_file_case(model):
+    path = model.user_path
+
+    def deserialize():
+        with open(path, 'rb') as f:
+            return deserialize_rmr_file(f)
+
+    return deserialize, os.path.getsize(path), 'bytes'
+
+def _match_lists_case(model):
+    user_transformers = model.rmrs.user['transformers']
+    baseline_transformers = model.rmrs.baseline['transformers']
+
+    return (
+        lambda: match_lists(user_transformers, baseline_transformers, '/name'),
+        len(user_transformers),
+        'transformers'
+    )
+
+def _find_all_case(model):
+    rmr = model.rmrs.user
+
+    return lambda: find_all(SURFACES_JSONPATH, rmr), len(find_all(SURFACES_JSONPATH, rmr)), 'surfaces'
+
+def _table_8_4_4_eff_case(model):
+    transformers = model.rmrs.user['transformers']
+    inputs = [(transformer['phase'], transformer['capacity'] / 1000) for transformer in transformers]
+
+    def look_up():
+        for phase, kVA in inputs:
+            table_8_4_4_eff(phase = phase, kVA = kVA)
+
+    return look_up, len(inputs), 'transformers'
+
+def _create_context_list_case(model):
+    rule = Section15Rule4()
+    rmrs = model.rmrs
+    context = UserBaselineProposedVals(
+        rmrs.user['transformers'], rmrs.baseline['transformers'], rmrs.proposed['transformers']
+    )
+
+    return lambda: rule.create_context_list(context), len(context.user), 'transformers'
+
+def _evaluate_all_rules_case(model):
+    rmrs = model.rmrs
+    texts = model.texts
+
+    return (
+        lambda: evaluate_all_rules(rmrs.user, rmrs.baseline, rmrs.proposed),
+        len(texts.user) + len(texts.baseline) + len(texts.proposed),
+        'bytes'
+    )
+
+
+# Benchmark cases by name
+CASES = {
+    'validate_rmr': _validate_rmr_case,
+    'deserialize_rmr_file': _deserialize_rmr_file_case,
+    'match_lists': _match_lists_case,
+    'find_all': _find_all_case,
+    'table_8_4_4_eff': _table_8_4_4_eff_case,
+    'create_context_list': _create_context_list_case,
+    'evaluate_all_rules': _evaluate_all_rules_case
+}
@@ -0,0 +1,133 @@
+import json
+import platform
+import statistics
+import tempfile
+import timeit
+
+from rct229.benchmarks.cases import BenchmarkModel, CASES, SIZES
+from rct229.utils.instrumentation import MemoryTracker
+
+DEFAULT_REPEAT = 3
+
+# The relative increase over the baseline that counts as a regression
+DEFAULT_THRESHOLD = 0.2
+
+# The measurements compared against a baseline
+COMPARED_METRICS = ['min_seconds', 'peak_bytes']
+
+
+def _measure(name, func, repeat):
+    """Returns the min and median seconds of repeat calls and the peak bytes
+    allocated by one more call
+    """
+    # timeit turns garbage collection off while timing
+    times = timeit.Timer(func).repeat(repeat = repeat, number = 1)
+
+    # Traced separately, since tracing slows the calls down
+    with MemoryTracker() as memory:
+        memory.call(name, None, func)
+    peak_bytes = memory.records[(None, name)][1]
+
+    return min(times), statistics.median(times), peak_bytes
+
+
+def run_benchmarks(sizes = None, cases = None, repeat = DEFAULT_REPEAT):
+    """Runs benchmark cases against synthetic RMR trios of several sizes
+
+    Parameters
+    ----------
+    sizes : list of string
+        Keys of SIZES; defaults to all sizes
+    cases : list of string
+        Keys of CASES; defaults to all cases
+    repeat : int
+        The number of timed calls of each case
+
+    Returns
+    -------
+    dict
+        {
+            python: string - The Python version
+            platform: string - The platform the benchmarks ran on
+            results: [dict] - {case, size, units, unit, repeat, min_seconds,
+                median_seconds, peak_bytes} for each case and size
+        }
+    """
+    sizes = list(SIZES) if sizes is None else sizes
+    cases = list(CASES) if cases is None else cases
+    for name in cases:
+        if name not in CASES:
+            raise ValueError(f'Unknown benchmark case: {name}')
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            model = BenchmarkModel(size, directory)
+            for name in cases:
+                func, units, unit = CASES[name](model)
+                min_seconds, median_seconds, peak_bytes = _measure(name, func, repeat)
+                results.append({
+                    'case': name,
+                    'size': size,
+                    'units': units,
+                    'unit': unit,
+                    'repeat': repeat,
+                    'min_seconds': min_seconds,
+                    'median_seconds': median_seconds,
+                    'peak_bytes': peak_bytes
+                })
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+
+
+def compare_to_baseline(report, baseline, threshold = DEFAULT_THRESHOLD):
+    """Returns the measurements that regressed against a baseline
+
+    Parameters
+    ----------
+    report : dict
+        Benchmark results as returned by run_benchmarks()
+    baseline : dict
+        Earlier benchmark results; cases and sizes missing from either are
+        not compared
+    threshold : float
+        The relative increase of a metric over the baseline that counts as a
+        regression, e.g. 0.2 for 20%
+
+    Returns
+    -------
+    list of dict
+        {case, size, metric, baseline, current, change} for each regressed
+        metric, where change is the relative increase
+    """
+    baseline_results = {(result['case'], result['size']): result for result in baseline['results']}
+
+    regressions = []
+    for result in report['results']:
+        baseline_result = baseline_results.get((result['case'], result['size']))
+        if baseline_result is None:
+            continue
+        for metric in COMPARED_METRICS:
+            before = baseline_result[metric]
+            after = result[metric]
+            if after > before * (1 + threshold):
+                regressions.append({
+                    'case': result['case'],
+                    'size': result['size'],
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': after / before - 1 if before else None
+                })
+
+    return regressions
+
+
+def load_benchmark_report(path):
+    """Loads benchmark results written as JSON, e.g. a stored baseline"""
+    with open(path) as f:
+        return json.load(f)
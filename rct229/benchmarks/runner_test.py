@@ -0,0 +1,31 @@
+from rct229.benchmarks.runner import compare_to_baseline, run_benchmarks
+
+
+def _result(case, min_seconds, peak_bytes, size = 'small'):
+    return {'case': case, 'size': size, 'min_seconds': min_seconds, 'peak_bytes': peak_bytes}
+
+# Testing run_benchmarks()
+def test__run_benchmarks__measures_each_case():
+    report = run_benchmarks(['small'], ['find_all', 'table_8_4_4_eff'], repeat = 2)
+    assert [(result['case'], result['size']) for result in report['results']] == [
+        ('find_all', 'small'), ('table_8_4_4_eff', 'small')
+    ]
+    find_all_result = report['results'][0]
+    assert find_all_result['unit'] == 'surfaces'
+    assert find_all_result['units'] == 48
+    assert 0 < find_all_result['min_seconds'] <= find_all_result['median_seconds']
+    assert find_all_result['peak_bytes'] > 0
+
+# Testing compare_to_baseline()
+def test__compare_to_baseline__flags_regressions_beyond_threshold():
+    baseline = {'results': [_result('find_all', 1.0, 1000), _result('match_lists', 1.0, 1000)]}
+    report = {'results': [
+        _result('find_all', 1.1, 1500),
+        _result('match_lists', 1.5, 1000),
+        _result('find_all', 9.0, 9000, size = 'large')
+    ]}
+    regressions = compare_to_baseline(report, baseline, threshold = 0.2)
+    assert [(r['case'], r['metric']) for r in regressions] == [
+        ('find_all', 'peak_bytes'), ('match_lists', 'min_seconds')
+    ]
+    assert regressions[0]['change'] == 0.5
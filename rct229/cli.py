@@ -1,8 +1,27 @@
 import click
-from rct229.rule_engine.engine import evaluate_all_rules
-from rct229.reports.project_report import print_rule_report, print_summary_report
+import contextlib
+import json
+import os
+import signal
+import sys
+from rct229.benchmarks.cases import CASES as BENCHMARK_CASES, SIZES as BENCHMARK_SIZES
+from rct229.benchmarks.runner import compare_to_baseline, DEFAULT_REPEAT, DEFAULT_THRESHOLD, load_benchmark_report, run_benchmarks
+from rct229.rule_engine.engine import evaluate_all_rules, evaluate_all_rules_iter, get_all_rules, get_rmr_pointers, select_rules
+from rct229.rule_engine.evaluation_plan import estimate_cost, plan_evaluation
+from rct229.rule_engine.outcome_counter import OutcomeCounter
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.reports.project_report import print_rule_report, print_memory_report, print_summary_report, print_timings_report, write_json_report, write_ndjson_report
+from rct229.reports.report_diff import diff_reports
+from rct229.reports.report_store import ReportStore
 from rct229.schema.validate import validate_rmr
-from rct229.utils.file import deserialize_rmr_file
+from rct229.service.server import create_server, DEFAULT_HOST, DEFAULT_PORT, DEFAULT_QUEUE_SIZE, EvaluationService
+from rct229.utils.binary_rmr import compile_rmr
+from rct229.utils.file import deserialize_rmr_file, open_output_file
+from rct229.utils.instrumentation import deep_sizeof, MemoryTracker, Timings
+from rct229.utils.profiling import Profiler
+from rct229.utils.rmr_generator import DEFAULT_COUNTS, write_rmr_trio
+from rct229.utils.schedules import compact_schedules
+from rct229.utils.structural_sharing import SubtreeInterner
 
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 
@@ -23,7 +42,22 @@ help_text = short_help_text
 @click.argument('user_rmr', type=click.File('rb'))
 @click.argument('baseline_rmr', type=click.File('rb'))
 @click.argument('proposed_rmr', type=click.File('rb'))
-def evalute_rmr_triplet(user_rmr, baseline_rmr, proposed_rmr):
+@click.option('--share-structure', is_flag=True, help='Store subtrees that are identical across the RMRs only once, sharing them as the RMRs are parsed.')
+@click.option('--load-used-only', is_flag=True, help='Load only the parts of each RMR read by the rules; the rest is neither parsed nor validated.')
+@click.option('--cache-dir', type=click.Path(file_okay=False), envvar='RCT229_RMR_CACHE_DIR', help='Directory of binary RMRs reused across runs.')
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='Also write the report as JSON, or write the NDJSON report; compressed when the path ends with .gz, .bz2, or .xz.')
+@click.option('--format', 'report_format', type=click.Choice(['text', 'ndjson']), default='text', help='Print a text report, or stream each outcome as a line of JSON as soon as its rule finishes.')
+@click.option('--summarised', is_flag=True, help='Report only per-result counts and the non-passing items of list rules.')
+@click.option('--timings', 'record_timings', is_flag=True, help='Time each rule workflow stage and list item and add the timings to the report.')
+@click.option('--profile', type=click.Path(dir_okay=False), help='Profile rule evaluation, writing PROFILE.pstats and a PROFILE.speedscope.json flame graph attributed to rules.')
+@click.option('--memory', 'track_memory', is_flag=True, help='Measure peak and retained memory of RMR loading, validation, and each rule and add them to the report.')
+def evalute_rmr_triplet(user_rmr, baseline_rmr, proposed_rmr, share_structure, load_used_only, cache_dir, output, report_format, summarised, record_timings, profile, track_memory):
+    # Keep stdout clean for an NDJSON report
+    print = click.echo if report_format == 'text' or output else lambda *args: click.echo(*args, err=True)
+
+    # Track memory from loading the RMRs until the command finishes
+    memory_tracker = click.get_current_context().with_resource(MemoryTracker()) if track_memory else None
+
     print("Test implementation of rule engine for ASHRAE Std 229 RCT.")
     print("")
 
@@ -31,35 +65,75 @@ def evalute_rmr_triplet(user_rmr, baseline_rmr, proposed_rmr):
     baseline_rmr_obj = None
     proposed_rmr_obj = None
     rmr_are_valid_json = True
+
+    # Restrict loading to the rmr_context pointers of the rules
+    pointers = get_rmr_pointers(get_all_rules()) if load_used_only else None
+
+    # Shared across the trio, so subtrees identical in any of the RMRs are stored once
+    interner = SubtreeInterner() if share_structure else None
+
     try:
-        user_rmr_obj = deserialize_rmr_file(user_rmr)
+        user_rmr_obj = deserialize_rmr_file(user_rmr, pointers.user if pointers else None, cache_dir, interner)
     except:
         rmr_are_valid_json = False
         print("User RMR is not a valid JSON file")
     try:
-        baseline_rmr_obj = deserialize_rmr_file(baseline_rmr)
+        baseline_rmr_obj = deserialize_rmr_file(baseline_rmr, pointers.baseline if pointers else None, cache_dir, interner)
     except:
         rmr_are_valid_json = False
         print("Baseline RMR is not a valid JSON file")
     try:
-        proposed_rmr_obj = deserialize_rmr_file(proposed_rmr)
+        proposed_rmr_obj = deserialize_rmr_file(proposed_rmr, pointers.proposed if pointers else None, cache_dir, interner)
     except:
         rmr_are_valid_json = False
         print("Proposed RMR is not a valid JSON file")
 
+    # The RMRs keep their shared subtrees; the interner's pool is no longer needed
+    interner = None
+
     if not rmr_are_valid_json:
         print("")
         return
     else:
+        # Share packed storage for identical schedules across the RMR trio;
+        # shared RMRs are immutable and already store identical schedules once
+        if not share_structure:
+            compact_schedules(user_rmr_obj, baseline_rmr_obj, proposed_rmr_obj)
+
         print("Processing rules...")
         print("")
 
-        report = evaluate_all_rules(user_rmr_obj, baseline_rmr_obj, proposed_rmr_obj)
-        # Example - Print a final compliance report
-        # [We'll actually most likely save a data file here and report occurs from separate CLI command]
-        print_rule_report(report)
-        print_summary_report(report)
+        timings = Timings() if record_timings else None
+        profiler = Profiler(profile) if profile else None
+        if report_format == 'ndjson':
+            counter = OutcomeCounter()
+            with timings or contextlib.nullcontext(), profiler or contextlib.nullcontext():
+                invalid_rmrs, outcomes = evaluate_all_rules_iter(user_rmr_obj, baseline_rmr_obj, proposed_rmr_obj, counter = counter)
+                if output:
+                    with open_output_file(output) as f:
+                        write_ndjson_report(invalid_rmrs, outcomes, f, counter, timings, memory_tracker)
+                else:
+                    write_ndjson_report(invalid_rmrs, outcomes, sys.stdout, counter, timings, memory_tracker)
+        else:
+            with timings or contextlib.nullcontext(), profiler or contextlib.nullcontext():
+                report = evaluate_all_rules(user_rmr_obj, baseline_rmr_obj, proposed_rmr_obj, columnar = not summarised, summarised = summarised)
+            if timings:
+                report['timings'] = timings.to_dict()
+            if memory_tracker:
+                report['memory'] = memory_tracker.to_dict()
+            # Example - Print a final compliance report
+            # [We'll actually most likely save a data file here and report occurs from separate CLI command]
+            print_rule_report(report)
+            print_summary_report(report)
+            if timings:
+                print_timings_report(report)
+            if memory_tracker:
+                print_memory_report(report)
+            if output:
+                write_json_report(report, output)
 
+        if profiler:
+            print(f"Profiles written to {profiler.pstats_path} and {profiler.speedscope_path}")
         print("Rules completed.")
         print("")
 
@@ -86,5 +160,244 @@ def evalute_rmr_triplet(user_rmr, baseline_rmr, proposed_rmr):
     #     print("Rules completed.")
     #     print("")
 
+# Compile an RMR into the binary RMR format
+short_help_text = "Compile an RMR JSON file into a binary RMR."
+help_text = short_help_text + " The binary RMR can be used anywhere an RMR JSON file is accepted."
+@cli.command('compile-rmr', short_help=short_help_text, help=help_text)
+@click.argument('rmr', type=click.Path(exists=True, dir_okay=False))
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='Binary RMR file to write; defaults to the RMR path with a .rmrb extension.')
+def compile_rmr_file(rmr, output):
+    binary_path = compile_rmr(rmr, output)
+    print(f"Binary RMR written to {binary_path}")
+
+# Store reports in a SQLite database
+short_help_text = "Store reports in a SQLite database and query them."
+help_text = short_help_text
+@cli.group('store', short_help=short_help_text, help=help_text)
+def report_store():
+    pass
+
+short_help_text = "Add JSON reports to a report store."
+help_text = short_help_text + " Each report replaces any stored report for the same project."
+@report_store.command('ingest', short_help=short_help_text, help=help_text)
+@click.argument('database', type=click.Path(dir_okay=False))
+@click.argument('reports', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('-p', '--project', help='Project name; defaults to the report file name without extensions. Only valid with a single report.')
+def ingest_reports(database, reports, project):
+    if project and len(reports) > 1:
+        raise click.UsageError('--project can only be given with a single report')
+    with ReportStore(database) as store:
+        for report in reports:
+            report_project = project or os.path.basename(report).split('.')[0]
+            count = store.ingest_file(report_project, report)
+            print(f"{report}: {count} outcomes stored for project {report_project}")
+
+short_help_text = "Query the evaluations in a report store."
+help_text = short_help_text + " Prints project, rule id, item name, and result separated by tabs."
+@report_store.command('query', short_help=short_help_text, help=help_text)
+@click.argument('database', type=click.Path(exists=True, dir_okay=False))
+@click.option('-r', '--rule', 'rule_id', help='Rule id, e.g. 15-3.')
+@click.option('--result', type=click.Choice(['PASSED', 'FAILED', 'NA', 'MANUAL_CHECK_REQUIRED', 'MISSING_CONTEXT']), help='Result.')
+@click.option('-p', '--project', help='Project name.')
+@click.option('-n', '--name', help='Item name.')
+def query_reports(database, rule_id, result, project, name):
+    with ReportStore(database) as store:
+        for row in store.query(rule_id = rule_id, result = result, project = project, name = name):
+            click.echo('\t'.join('' if value is None else value for value in row))
+
+short_help_text = "Export a project's report from a report store as JSON."
+help_text = short_help_text
+@report_store.command('export', short_help=short_help_text, help=help_text)
+@click.argument('database', type=click.Path(exists=True, dir_okay=False))
+@click.argument('project')
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='JSON file to write, compressed when the path ends with .gz, .bz2, or .xz; defaults to standard output.')
+def export_report(database, project, output):
+    with ReportStore(database) as store:
+        try:
+            report = store.export(project)
+        except KeyError as err:
+            raise click.ClickException(str(err.args[0]))
+    if output:
+        write_json_report(report, output)
+    else:
+        click.echo(json.dumps(report, indent = 4))
+
+# Compare two reports
+short_help_text = "List the evaluations that changed between two reports."
+help_text = short_help_text + " Reports may be JSON or NDJSON, optionally compressed. Each change is written as a line of JSON with the rule id, item names, and the before and after results."
+@cli.command('diff-reports', short_help=short_help_text, help=help_text)
+@click.argument('before', type=click.Path(exists=True, dir_okay=False))
+@click.argument('after', type=click.Path(exists=True, dir_okay=False))
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='File to write the changes to, compressed when the path ends with .gz, .bz2, or .xz; defaults to standard output.')
+def diff_report_files(before, after, output):
+    stream = open_output_file(output) if output else sys.stdout
+    count = 0
+    try:
+        for change in diff_reports(before, after):
+            stream.write(json.dumps(change) + '\n')
+            count += 1
+    finally:
+        if output:
+            stream.close()
+    click.echo(f"{count} changed evaluations", err=True)
+
+# Report the memory used by each part of an RMR
+short_help_text = "Report the approximate in-memory size of each top-level RMR subtree."
+help_text = short_help_text
+@cli.command('inspect-size', short_help=short_help_text, help=help_text)
+@click.argument('rmrs', nargs=-1, required=True, type=click.File('rb'))
+@click.option('--json', 'as_json', is_flag=True, help='Print the sizes in bytes as JSON.')
+def inspect_rmr_size(rmrs, as_json):
+    sizes = {}
+    for rmr_file in rmrs:
+        rmr = deserialize_rmr_file(rmr_file)
+        sizes[rmr_file.name] = {key: deep_sizeof(value) for key, value in rmr.items()}
+
+    if as_json:
+        click.echo(json.dumps(sizes, indent = 4))
+        return
+    for name, rmr_sizes in sizes.items():
+        click.echo(name)
+        for key, size in sorted(rmr_sizes.items(), key = lambda item: item[1], reverse = True):
+            click.echo(f"    {key:<40} {size / 1024:12.1f} KiB")
+
+# Generate a synthetic RMR trio
+short_help_text = "Generate a synthetic, schema-valid RMR trio for load testing."
+help_text = short_help_text + " Writes user_rmr, baseline_rmr, and proposed_rmr files to OUTPUT_DIR one object at a time, so models of any size can be generated. Counts are per parent object; buildings, transformers, and schedules are per RMR."
+@cli.command('generate-rmr', short_help=short_help_text, help=help_text)
+@click.argument('output_dir', type=click.Path(file_okay=False))
+@click.option('--buildings', type=click.IntRange(0), default=DEFAULT_COUNTS['buildings'], show_default=True, help='Buildings per RMR.')
+@click.option('--segments', type=click.IntRange(0), default=DEFAULT_COUNTS['building_segments'], show_default=True, help='Building segments per building.')
+@click.option('--hvac-systems', type=click.IntRange(0), default=DEFAULT_COUNTS['hvac_systems'], show_default=True, help='HVAC systems per building segment.')
+@click.option('--zones', type=click.IntRange(0), default=DEFAULT_COUNTS['zones'], show_default=True, help='Zones per building segment.')
+@click.option('--spaces', type=click.IntRange(0), default=DEFAULT_COUNTS['spaces'], show_default=True, help='Spaces per zone.')
+@click.option('--surfaces', type=click.IntRange(0), default=DEFAULT_COUNTS['surfaces'], show_default=True, help='Surfaces per space.')
+@click.option('--fenestrations', type=click.IntRange(0), default=DEFAULT_COUNTS['fenestrations'], show_default=True, help='Fenestrations per surface.')
+@click.option('--transformers', type=click.IntRange(0), default=DEFAULT_COUNTS['transformers'], show_default=True, help='Transformers per RMR.')
+@click.option('--schedules', type=click.IntRange(0), default=DEFAULT_COUNTS['schedules'], show_default=True, help='8760-hour schedules per RMR.')
+@click.option('--divergence', type=click.FloatRange(0.0, 1.0), default=0.0, show_default=True, help='Fraction of baseline and proposed objects whose values differ from the user RMR.')
+@click.option('--seed', type=int, default=0, show_default=True, help='Seed of the random values; the same options and seed give the same RMRs.')
+@click.option('--compression', type=click.Choice(['none', 'gz', 'bz2', 'xz']), default='none', show_default=True, help='Compress the RMR files.')
+def generate_rmr_trio(output_dir, buildings, segments, hvac_systems, zones, spaces, surfaces, fenestrations, transformers, schedules, divergence, seed, compression):
+    counts = {
+        'buildings': buildings,
+        'building_segments': segments,
+        'hvac_systems': hvac_systems,
+        'zones': zones,
+        'spaces': spaces,
+        'surfaces': surfaces,
+        'fenestrations': fenestrations,
+        'transformers': transformers,
+        'schedules': schedules
+    }
+    extension = '.json' if compression == 'none' else f'.json.{compression}'
+    for path in write_rmr_trio(output_dir, counts, seed, divergence, extension):
+        click.echo(f"RMR written to {path}")
+
+# Benchmark the engine
+short_help_text = "Benchmark the engine's hot paths on synthetic RMRs."
+help_text = short_help_text + " Prints the time and peak memory of each case and model size as JSON. With --baseline, lists the measurements that regressed beyond the threshold and exits with status 1 if there are any."
+@cli.command('bench', short_help=short_help_text, help=help_text)
+@click.option('-s', '--size', 'sizes', multiple=True, type=click.Choice(list(BENCHMARK_SIZES)), help='Model size to run; may be repeated. Defaults to all sizes.')
+@click.option('-c', '--case', 'cases', multiple=True, type=click.Choice(list(BENCHMARK_CASES)), help='Case to run; may be repeated. Defaults to all cases.')
+@click.option('-r', '--repeat', type=click.IntRange(1), default=DEFAULT_REPEAT, show_default=True, help='Timed calls of each case.')
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='JSON file to write the results to; defaults to standard output.')
+@click.option('-b', '--baseline', type=click.Path(exists=True, dir_okay=False), help='Earlier results to compare against.')
+@click.option('-t', '--threshold', type=click.FloatRange(0.0), default=DEFAULT_THRESHOLD, show_default=True, help='Relative increase over the baseline that counts as a regression.')
+def run_benchmark_suite(sizes, cases, repeat, output, baseline, threshold):
+    report = run_benchmarks(list(sizes) or None, list(cases) or None, repeat)
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent = 4)
+    else:
+        click.echo(json.dumps(report, indent = 4))
+
+    if baseline:
+        regressions = compare_to_baseline(report, load_benchmark_report(baseline), threshold)
+        for regression in regressions:
+            click.echo(
+                f"Regression: {regression['case']} ({regression['size']}) {regression['metric']} "
+                f"{regression['baseline']:.6g} -> {regression['current']:.6g}",
+                err=True
+            )
+        if regressions:
+            sys.exit(1)
+        click.echo(f"No regressions beyond {threshold:.0%}", err=True)
+
+# Explain an evaluation without running it
+short_help_text = "Describe the work of evaluating an RMR trio without evaluating any rule."
+help_text = short_help_text + " Lists the rules to run, the RMRs to load and validate with the rmr_context pointers read from each, and the size of each context. With --calibration, also estimates the time and memory of the evaluation from rct229 bench results."
+@cli.command('explain', short_help=short_help_text, help=help_text)
+@click.argument('user_rmr', type=click.Path(exists=True, dir_okay=False))
+@click.argument('baseline_rmr', type=click.Path(exists=True, dir_okay=False))
+@click.argument('proposed_rmr', type=click.Path(exists=True, dir_okay=False))
+@click.option('-r', '--rule', 'rule_ids', multiple=True, help='Id of a rule to run, e.g. 15-3; may be repeated. Defaults to all rules.')
+@click.option('-c', '--calibration', type=click.Path(exists=True, dir_okay=False), help='Benchmark results written by rct229 bench.')
+@click.option('--json', 'as_json', is_flag=True, help='Print the plan as JSON.')
+def explain_evaluation(user_rmr, baseline_rmr, proposed_rmr, rule_ids, calibration, as_json):
+    rules_list = get_all_rules()
+    if rule_ids:
+        try:
+            rules_list = select_rules(rules_list, rule_ids)
+        except ValueError as err:
+            raise click.BadParameter(str(err), param_hint='--rule')
+
+    plan = plan_evaluation(rules_list, UserBaselineProposedVals(user_rmr, baseline_rmr, proposed_rmr))
+    if calibration:
+        try:
+            plan['estimate'] = estimate_cost(plan, load_benchmark_report(calibration))
+        except ValueError as err:
+            raise click.ClickException(str(err))
+
+    if as_json:
+        click.echo(json.dumps(plan, indent = 4))
+        return
+
+    click.echo(f"Rules to evaluate: {len(plan['rules'])}")
+    for rule in plan['rules']:
+        kind = 'list' if rule['list_rule'] else 'single'
+        click.echo(f"    {rule['id']:<8} {rule['rmr_context']:<24} {kind:<7} {', '.join(rule['rmrs_used']):<24} {rule['description']}")
+    click.echo("RMRs to load and validate:")
+    for name, rmr in plan['rmrs'].items():
+        click.echo(f"    {name:<9} {rmr['bytes'] / 1024:12.1f} KiB  {rmr['path']}  reads {', '.join(pointer or '/' for pointer in rmr['pointers'])}")
+    click.echo("Context sizes:")
+    for context in plan['contexts']:
+        sizes = ', '.join(f"{name} {'missing' if size is None else size}" for name, size in context['sizes'].items())
+        click.echo(f"    {context['rmr_context'] or '/':<24} {sizes}")
+    if calibration:
+        estimate = plan['estimate']
+        click.echo("Estimated cost:")
+        click.echo(f"    load        {estimate['load_seconds']:10.3f} s")
+        click.echo(f"    validate    {estimate['validate_seconds']:10.3f} s")
+        click.echo(f"    rules       {estimate['rules_seconds']:10.3f} s")
+        click.echo(f"    total       {estimate['total_seconds']:10.3f} s")
+        click.echo(f"    peak memory {estimate['peak_bytes'] / (1024 * 1024):10.1f} MiB")
+
+
+# Serve evaluations from a long-lived process
+short_help_text = "Serve RMR trio evaluations over HTTP."
+help_text = short_help_text + " The schema validator, enumerations, data tables, and rules are created once at startup. POST /evaluate takes a JSON object with user, baseline, and proposed RMRs, or their file paths under paths, and optional rules ids and summarised flag, and answers with the JSON report. GET /health reports the service status."
+@cli.command('serve', short_help=short_help_text, help=help_text)
+@click.option('--host', default=DEFAULT_HOST, show_default=True, help='Address to listen on.')
+@click.option('-p', '--port', type=int, default=DEFAULT_PORT, show_default=True, help='Port to listen on.')
+@click.option('--socket', 'socket_path', type=click.Path(dir_okay=False), help='Listen on a Unix socket at this path instead of a TCP port.')
+@click.option('-q', '--queue-size', type=click.IntRange(0), default=DEFAULT_QUEUE_SIZE, show_default=True, help='Requests that may wait while another is evaluated; later requests get 503 responses.')
+@click.option('--quiet', is_flag=True, help='Do not log requests.')
+def serve_evaluations(host, port, socket_path, queue_size, quiet):
+    service = EvaluationService(queue_size = queue_size)
+    server = create_server(service, host, port, socket_path, quiet)
+    address = socket_path or f"http://{server.server_address[0]}:{server.server_address[1]}"
+    click.echo(f"Serving {len(service.rules_list)} rules on {address}, started in {service.startup_seconds:.3f} s")
+    # Shut down cleanly when terminated, e.g. removing the Unix socket
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
 if __name__ == '__main__':
     cli()
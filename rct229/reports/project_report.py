@@ -1,5 +1,8 @@
+import json
 import os
 from rct229.reports.utils import aggregate_outcomes
+from rct229.rule_engine.outcome_store import OutcomeListView, OutcomeStore, OutcomeView
+from rct229.utils.file import open_output_file
 
 def print_rule_report(report):
     outcomes = report['outcomes']
@@ -12,7 +15,14 @@ def print_rule_report(report):
         # print(f"Applicable: {str(outcome['applicable'])}")
         # print(f"Manual check required: {str(outcome['manual_check_required'])}")
         # print(f"Rule passed: {str(outcome['rule_passed'])}")
-        print(f"Rule result: {str(outcome['result'])}")
+        if 'result_counts' in outcome:
+            # A summarised list rule keeps only its non-passing items
+            counts = ', '.join(f"{result}: {count}" for result, count in outcome['result_counts'].items())
+            print(f"Rule result counts: {counts or 'no items'}")
+            if outcome['result']:
+                print(f"Non-passing items: {str(outcome['result'])}")
+        else:
+            print(f"Rule result: {str(outcome['result'])}")
         print("--------------------------------------------------------------------")
 
 
@@ -23,7 +33,8 @@ def print_summary_report(report):
         print(f"Invalid RMRs: {str(invalid_rmrs)}")
     else:
         outcomes = report['outcomes']
-        summary_dict = aggregate_outcomes(outcomes)
+        # Reports from evaluate_rules() carry the counts kept by the engine
+        summary_dict = report.get('summary') or aggregate_outcomes(outcomes)
 
 
         print("----------------------------------")
@@ -35,3 +46,120 @@ def print_summary_report(report):
         print(f"{summary_dict['number_not_applicable']} evaluations not applicable")
         print(f"{summary_dict['number_manual_check_required']} evaluations requiring manual check")
         print("----------------------------------")
+
+
+def print_timings_report(report, limit = 10):
+    """Prints the slowest rule workflow stages recorded in report['timings']"""
+    stages = report['timings']['stages']
+
+    print("----------------------------------")
+    print("Slowest stages")
+    for stage in stages[:limit]:
+        rule = f"{stage['rule_id']} {stage['rule_class']}" if stage['rule_class'] else "(no rule)"
+        print(f"{stage['seconds']:10.4f} s {stage['calls']:8d} calls  {rule} {stage['stage']}")
+    print("----------------------------------")
+
+
+def print_memory_report(report, limit = 10):
+    """Prints the phases with the largest peaks recorded in report['memory']"""
+    phases = report['memory']['phases']
+
+    print("----------------------------------")
+    print("Largest memory peaks")
+    for phase in phases[:limit]:
+        rule = phase['rule_id'] if phase['rule_id'] is not None else "(no rule)"
+        print(f"{phase['peak_bytes'] / 1024:12.1f} KiB peak {phase['retained_bytes'] / 1024:12.1f} KiB retained  {rule} {phase['phase']}")
+    print("----------------------------------")
+
+
+def write_json_report(report, path):
+    """Writes a report as JSON
+
+    The report is encoded incrementally, so a compressed file is compressed
+    as it is written.
+
+    Parameters
+    ----------
+    report : dict
+        A report as returned by evaluate_rules()
+    path : string
+        The file to write; it is gzip, bzip2, or xz compressed when the path
+        ends with .gz, .bz2, or .xz
+    """
+    with open_output_file(path) as f:
+        json.dump(report, f, indent = 4, default = _outcome_store_to_json)
+
+
+def _outcome_store_to_json(obj):
+    """Encodes OutcomeStore views one outcome at a time"""
+    if isinstance(obj, (OutcomeStore, OutcomeListView)):
+        return list(obj)
+    if isinstance(obj, OutcomeView):
+        return dict(obj)
+
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def write_ndjson_report(invalid_rmrs, outcomes, stream, counter = None, timings = None, memory_tracker = None):
+    """Writes rule outcomes as newline-delimited JSON as they are produced
+
+    Each line is a JSON object:
+        - {"invalid_rmrs": {...}} when any used RMR is invalid
+        - {"id", "description", "rmr_context", "result"} for each rule; for a
+            list-type rule "result" is omitted and "list" is true
+        - {"id", "name", "result"} for each item of a list-type rule,
+            following its rule line; "id" is the id of the rule
+        - {"summary": {...}} when a counter is given
+        - {"timings": {...}} when timings are given
+        - {"memory": {...}} last, when a memory tracker is given
+
+    Parameters
+    ----------
+    invalid_rmrs : dict
+        The invalid RMRs as returned by evaluate_rules_iter()
+    outcomes : iterable of dict
+        Rule outcomes as returned by evaluate_rules_iter(); the result of a
+        list-type rule may be an iterator, which is consumed item by item
+    stream : file
+        A buffered text stream; it is flushed after each rule
+    counter : OutcomeCounter
+        Optional counter tracking the outcomes, as passed to
+        evaluate_rules_iter()
+    timings : Timings
+        Optional timings active while the outcomes are consumed
+    memory_tracker : MemoryTracker
+        Optional memory tracker active while the outcomes are consumed
+    """
+    if invalid_rmrs:
+        stream.write(json.dumps({'invalid_rmrs': invalid_rmrs}) + '\n')
+
+    for outcome in outcomes:
+        result = outcome.get('result')
+        is_list = not isinstance(result, str)
+        rule_line = {key: value for key, value in outcome.items() if key != 'result'}
+        if is_list:
+            rule_line['list'] = True
+        else:
+            rule_line['result'] = result
+        stream.write(json.dumps(rule_line) + '\n')
+
+        if is_list:
+            rule_id = outcome.get('id')
+            for item_outcome in result:
+                item_line = {'id': rule_id}
+                item_line.update(item_outcome)
+                stream.write(json.dumps(item_line) + '\n')
+
+        stream.flush()
+
+    if counter is not None:
+        stream.write(json.dumps({'summary': counter.to_dict()}) + '\n')
+        stream.flush()
+
+    if timings is not None:
+        stream.write(json.dumps({'timings': timings.to_dict()}) + '\n')
+        stream.flush()
+
+    if memory_tracker is not None:
+        stream.write(json.dumps({'memory': memory_tracker.to_dict()}) + '\n')
+        stream.flush()
@@ -0,0 +1,22 @@
+from rct229.reports.project_report import print_rule_report
+
+outcome = {'id': '15-3', 'description': 'Transformers match', 'rmr_context': 'transformers'}
+
+# Testing print_rule_report()
+def test__print_rule_report__with_result(capsys):
+    print_rule_report({'outcomes': [dict(outcome, result = 'PASSED')]})
+    assert 'Rule result: PASSED' in capsys.readouterr().out
+
+def test__print_rule_report__with_summarised_passing_list_rule(capsys):
+    print_rule_report({'outcomes': [dict(outcome, result = [], result_counts = {'PASSED': 2})]})
+    printed = capsys.readouterr().out
+    assert 'Rule result counts: PASSED: 2' in printed
+    assert 'Rule result:' not in printed
+    assert 'Non-passing items' not in printed
+
+def test__print_rule_report__with_summarised_failing_list_rule(capsys):
+    failed_item = {'result': 'FAILED', 'name': 'T2'}
+    print_rule_report({'outcomes': [dict(outcome, result = [failed_item], result_counts = {'PASSED': 1, 'FAILED': 1})]})
+    printed = capsys.readouterr().out
+    assert 'Rule result counts: PASSED: 1, FAILED: 1' in printed
+    assert f'Non-passing items: {[failed_item]}' in printed
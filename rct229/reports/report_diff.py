@@ -0,0 +1,314 @@
+import io
+from itertools import groupby
+import json
+import mmap
+from operator import itemgetter
+
+from rct229.utils.file import open_input_file
+from rct229.utils.json_tokenizer import JsonStreamTokenizer, JsonTokenizer
+
+
+def _flatten(outcome, name_path, rule_id, evaluations):
+    """Appends (rule_id, name_path, result) for each evaluation in an outcome"""
+    name = outcome.get('name')
+    if name is not None:
+        name_path = name_path + (name,)
+    result = outcome['result']
+    if isinstance(result, str):
+        evaluations.append((rule_id, name_path, result))
+    else:
+        for item_outcome in result:
+            _flatten(item_outcome, name_path, rule_id, evaluations)
+
+
+def _flatten_rule(outcome, evaluations):
+    """Appends the evaluations of a top-level rule outcome, starting with
+    the result counts of a summarised list rule
+    """
+    rule_id = outcome.get('id')
+    if 'result_counts' in outcome:
+        evaluations.append((rule_id, None, outcome['result_counts']))
+    _flatten(outcome, (), rule_id, evaluations)
+
+
+def iter_evaluations(outcomes):
+    """Yields (rule_id, name_path, result) for each evaluation in a list of
+    outcomes
+
+    Parameters
+    ----------
+    outcomes : iterable of dict
+        Rule outcomes, e.g. the outcomes of a report or an OutcomeStore
+
+    Yields
+    ------
+    tuple
+        The top-level rule id, a tuple of the item names leading to the
+        evaluation, and the result string. A summarised list rule, see
+        summarise_outcome(), first yields its rule id, None, and its
+        result_counts dictionary, followed by its non-passing items.
+    """
+    for outcome in outcomes:
+        evaluations = []
+        _flatten_rule(outcome, evaluations)
+        yield from evaluations
+
+
+def _iter_json_report_evaluations(tokenizer):
+    """Walks the outcomes of a JSON report one item at a time"""
+    tokenizer.start_object()
+    key = tokenizer.next_key()
+    while key is not None:
+        if key != 'outcomes':
+            tokenizer.skip_value()
+            key = tokenizer.next_key()
+            continue
+
+        tokenizer.start_array()
+        while tokenizer.next_item():
+            rule_id = None
+            evaluations = []
+            tokenizer.start_object()
+            outcome_key = tokenizer.next_key()
+            while outcome_key is not None:
+                if outcome_key == 'id':
+                    rule_id = tokenizer.read_value()
+                elif outcome_key == 'result_counts':
+                    evaluations.insert(0, (None, None, tokenizer.read_value()))
+                elif outcome_key == 'result' and tokenizer.peek() == '[':
+                    tokenizer.start_array()
+                    for item_outcome in tokenizer.iter_items():
+                        _flatten(item_outcome, (), None, evaluations)
+                elif outcome_key == 'result':
+                    evaluations.append((None, (), tokenizer.read_value()))
+                else:
+                    tokenizer.skip_value()
+                outcome_key = tokenizer.next_key()
+
+            # The rule id may follow the result
+            for _, name_path, result in evaluations:
+                yield rule_id, name_path, result
+
+        key = tokenizer.next_key()
+
+
+def _iter_ndjson_report_evaluations(lines):
+    """Walks the lines of an NDJSON report written by write_ndjson_report()"""
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if record.get('list'):
+            # The line of a list rule, carrying the counts of a summarised
+            # rule; its items follow on their own lines
+            if 'result_counts' in record:
+                yield record.get('id'), None, record['result_counts']
+        elif 'result' in record:
+            evaluations = []
+            _flatten(record, (), record.get('id'), evaluations)
+            yield from evaluations
+
+
+def _is_ndjson(f):
+    """Tells an NDJSON report from a JSON report, which may be on a single
+    line, by whether its first object has outcomes
+
+    Reading stops at the outcomes key, so only the values before it, such
+    as invalid_rmrs, or the first NDJSON line are held.
+    """
+    tokenizer = JsonStreamTokenizer(f)
+    if tokenizer.peek() is None:
+        # An NDJSON report of no lines
+        return True
+
+    tokenizer.start_object()
+    key = tokenizer.next_key()
+    while key is not None:
+        if key == 'outcomes':
+            return False
+        tokenizer.skip_value()
+        key = tokenizer.next_key()
+
+    return True
+
+
+def iter_report_file_evaluations(path):
+    """Yields (rule_id, name_path, result) for each evaluation in a report
+    file without loading the whole report
+
+    Parameters
+    ----------
+    path : string
+        A JSON report as written by write_json_report() or an NDJSON report
+        as written by write_ndjson_report(); either may be gzip, bzip2, or
+        xz compressed
+
+    Yields
+    ------
+    tuple
+        See iter_evaluations()
+    """
+    with open_input_file(path) as f:
+        is_ndjson = _is_ndjson(f)
+        f.seek(0)
+        if is_ndjson:
+            yield from _iter_ndjson_report_evaluations(f)
+            return
+
+        # Compressed reports are decompressed as the tokenizer reads them
+        if not isinstance(f, io.BufferedReader):
+            yield from _iter_json_report_evaluations(JsonStreamTokenizer(f))
+            return
+
+        buf = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        try:
+            yield from _iter_json_report_evaluations(JsonTokenizer(buf))
+        finally:
+            buf.close()
+
+
+# The index key of the result counts of a summarised rule
+_COUNTS_KEY = (None, 0)
+
+
+def _indexed(evaluations):
+    """Returns a dict of the results of one rule keyed by (item names,
+    occurrence), where the occurrence tells apart repeated names by their
+    order of appearance
+    """
+    index = {}
+    occurrences = {}
+    for _, name_path, result in evaluations:
+        occurrence = occurrences.get(name_path, 0)
+        occurrences[name_path] = occurrence + 1
+        index[(name_path, occurrence)] = result
+
+    return index
+
+
+def _result_counts(index):
+    """Returns the result counts of an indexed rule, counting its
+    evaluations when the rule was not summarised
+    """
+    counts = index.get(_COUNTS_KEY)
+    if counts is None:
+        counts = {}
+        for result in index.values():
+            counts[result] = counts.get(result, 0) + 1
+
+    return counts
+
+
+def _diff_rule(rule_id, before_index, after_index):
+    """Yields the changes between the indexed results of one rule"""
+    if _COUNTS_KEY in before_index or _COUNTS_KEY in after_index:
+        # A summarised rule keeps only its non-passing items, so items
+        # missing from it cannot be told from removed items; the rule is
+        # compared by its counts instead
+        before_counts = _result_counts(before_index)
+        after_counts = _result_counts(after_index)
+        if before_counts != after_counts:
+            yield {'id': rule_id, 'name': [], 'before': before_counts, 'after': after_counts}
+        return
+
+    for key, after_result in after_index.items():
+        before_result = before_index.pop(key, None)
+        if before_result != after_result:
+            yield {'id': rule_id, 'name': list(key[0]), 'before': before_result, 'after': after_result}
+
+    for key, before_result in before_index.items():
+        yield {'id': rule_id, 'name': list(key[0]), 'before': before_result, 'after': None}
+
+
+def _rule_groups(evaluations):
+    """Yields (rule_id, index) for each run of evaluations of the same rule"""
+    for rule_id, rule_evaluations in groupby(evaluations, key = itemgetter(0)):
+        yield rule_id, _indexed(rule_evaluations)
+
+
+def diff_evaluations(before, after):
+    """Yields the evaluations that differ between two reports
+
+    Both reports list their evaluations rule by rule, so they are merged one
+    rule at a time and only the evaluations of the rules being compared are
+    held. A rule found in one report but not yet in the other is held until
+    its counterpart appears, so when the rules are in the same order each
+    report is read once holding a single rule of each.
+
+    Parameters
+    ----------
+    before : iterable of tuple
+        The evaluations of the earlier report, e.g. from iter_evaluations()
+    after : iterable of tuple
+        The evaluations of the later report
+
+    Yields
+    ------
+    dict
+        {id, name, before, after} for each changed evaluation, where name is
+        the list of item names leading to the evaluation and before or after
+        is None for an evaluation missing from that report. The changes of
+        each rule are yielded in the order of the later report, followed by
+        its removals. A list rule summarised in either report is compared
+        by its result counts, yielding a single change with an empty name
+        whose before and after are the result_counts dictionaries.
+    """
+    before_groups = _rule_groups(before)
+    after_groups = _rule_groups(after)
+    pending_before = {}
+    pending_after = {}
+
+    while True:
+        before_group = next(before_groups, None)
+        after_group = next(after_groups, None)
+        if before_group is None and after_group is None:
+            break
+
+        if before_group is not None and after_group is not None and before_group[0] == after_group[0]:
+            yield from _diff_rule(after_group[0], before_group[1], after_group[1])
+            continue
+
+        if before_group is not None:
+            rule_id, before_index = before_group
+            if rule_id in pending_after:
+                yield from _diff_rule(rule_id, before_index, pending_after.pop(rule_id))
+            else:
+                pending_before[rule_id] = before_index
+
+        if after_group is not None:
+            rule_id, after_index = after_group
+            if rule_id in pending_before:
+                yield from _diff_rule(rule_id, pending_before.pop(rule_id), after_index)
+            else:
+                pending_after[rule_id] = after_index
+
+    # Rules found in only one report
+    for rule_id, after_index in pending_after.items():
+        yield from _diff_rule(rule_id, {}, after_index)
+    for rule_id, before_index in pending_before.items():
+        yield from _diff_rule(rule_id, before_index, {})
+
+
+def diff_reports(before, after):
+    """Yields the evaluations that differ between two reports
+
+    Parameters
+    ----------
+    before : string or dict
+        The path of the earlier report file, see
+        iter_report_file_evaluations(), or a report as returned by
+        evaluate_rules()
+    after : string or dict
+        The later report
+
+    Yields
+    ------
+    dict
+        See diff_evaluations()
+    """
+    def _evaluations(report):
+        if isinstance(report, str):
+            return iter_report_file_evaluations(report)
+        return iter_evaluations(report['outcomes'])
+
+    return diff_evaluations(_evaluations(before), _evaluations(after))
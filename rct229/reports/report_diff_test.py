@@ -0,0 +1,133 @@
+import gzip
+import io
+import json
+import pytest
+
+from rct229.reports.project_report import write_json_report, write_ndjson_report
+from rct229.reports.report_diff import _is_ndjson, diff_reports, iter_evaluations, iter_report_file_evaluations
+from rct229.rule_engine.engine import summarise_outcome
+
+before_report = {
+    'invalid_rmrs': {},
+    'outcomes': [
+        {'id': '15-1', 'description': 'A rule', 'result': 'PASSED'},
+        {'id': '15-3', 'result': [
+            {'result': 'PASSED', 'name': 'T1'},
+            {'result': [{'result': 'FAILED', 'name': 'T2a'}], 'name': 'T2'},
+            {'result': 'PASSED', 'name': 'T3'}
+        ]}
+    ]
+}
+
+after_report = {
+    'invalid_rmrs': {},
+    'outcomes': [
+        {'id': '15-1', 'description': 'A rule', 'result': 'PASSED'},
+        {'id': '15-3', 'result': [
+            {'result': 'FAILED', 'name': 'T1'},
+            {'result': [{'result': 'PASSED', 'name': 'T2a'}], 'name': 'T2'},
+            {'result': 'PASSED', 'name': 'T4'}
+        ]}
+    ]
+}
+
+expected_diff = [
+    {'id': '15-3', 'name': ['T1'], 'before': 'PASSED', 'after': 'FAILED'},
+    {'id': '15-3', 'name': ['T2', 'T2a'], 'before': 'FAILED', 'after': 'PASSED'},
+    {'id': '15-3', 'name': ['T4'], 'before': None, 'after': 'PASSED'},
+    {'id': '15-3', 'name': ['T3'], 'before': 'PASSED', 'after': None}
+]
+
+def _write_ndjson(report, path):
+    stream = io.StringIO()
+    write_ndjson_report(report['invalid_rmrs'], report['outcomes'], stream)
+    path.write_text(stream.getvalue())
+
+# Testing iter_evaluations()
+def test__iter_evaluations():
+    assert list(iter_evaluations(before_report['outcomes'])) == [
+        ('15-1', (), 'PASSED'),
+        ('15-3', ('T1',), 'PASSED'),
+        ('15-3', ('T2', 'T2a'), 'FAILED'),
+        ('15-3', ('T3',), 'PASSED')
+    ]
+
+# Testing iter_report_file_evaluations()
+@pytest.mark.parametrize('suffix', ['.json', '.json.bz2', '.json.gz'])
+def test__iter_report_file_evaluations__json(tmp_path, suffix):
+    path = str(tmp_path / ('report' + suffix))
+    write_json_report(before_report, path)
+    assert list(iter_report_file_evaluations(path)) == list(iter_evaluations(before_report['outcomes']))
+
+def test__iter_report_file_evaluations__ndjson(tmp_path):
+    path = tmp_path / 'report.ndjson'
+    _write_ndjson(before_report, path)
+    assert list(iter_report_file_evaluations(str(path))) == list(iter_evaluations(before_report['outcomes']))
+
+def test__iter_report_file_evaluations__single_line_json(tmp_path):
+    path = str(tmp_path / 'report.json.gz')
+    with gzip.open(path, 'wt') as f:
+        f.write(json.dumps(before_report))
+    assert list(iter_report_file_evaluations(path)) == list(iter_evaluations(before_report['outcomes']))
+
+def test__is_ndjson__reads_only_to_outcomes():
+    report = {'invalid_rmrs': {}, 'outcomes': [{'id': str(i), 'result': 'PASSED'} for i in range(100000)]}
+    f = io.BytesIO(json.dumps(report).encode())
+    assert not _is_ndjson(f)
+    assert f.tell() < len(f.getvalue()) / 10
+
+# Testing diff_reports()
+def test__diff_reports__dicts():
+    assert list(diff_reports(before_report, after_report)) == expected_diff
+
+def test__diff_reports__files(tmp_path):
+    before_path = str(tmp_path / 'before.json')
+    write_json_report(before_report, before_path)
+    after_path = tmp_path / 'after.ndjson'
+    _write_ndjson(after_report, after_path)
+    assert list(diff_reports(before_path, str(after_path))) == expected_diff
+
+def test__diff_reports__repeated_names():
+    before = {'outcomes': [{'id': '1', 'result': [{'result': 'PASSED', 'name': 'A'}, {'result': 'PASSED', 'name': 'A'}]}]}
+    after = {'outcomes': [{'id': '1', 'result': [{'result': 'PASSED', 'name': 'A'}, {'result': 'FAILED', 'name': 'A'}]}]}
+    assert list(diff_reports(before, after)) == [{'id': '1', 'name': ['A'], 'before': 'PASSED', 'after': 'FAILED'}]
+
+def test__diff_reports__rules_in_one_report():
+    before = {'outcomes': [
+        {'id': '1', 'result': 'PASSED'},
+        {'id': '2', 'result': [{'result': 'PASSED', 'name': 'A'}]},
+        {'id': '3', 'result': 'FAILED'}
+    ]}
+    after = {'outcomes': [
+        {'id': '1', 'result': 'FAILED'},
+        {'id': '4', 'result': 'PASSED'},
+        {'id': '3', 'result': 'PASSED'}
+    ]}
+    assert list(diff_reports(before, after)) == [
+        {'id': '1', 'name': [], 'before': 'PASSED', 'after': 'FAILED'},
+        {'id': '3', 'name': [], 'before': 'FAILED', 'after': 'PASSED'},
+        {'id': '4', 'name': [], 'before': None, 'after': 'PASSED'},
+        {'id': '2', 'name': ['A'], 'before': 'PASSED', 'after': None}
+    ]
+
+def _summarised(report):
+    return dict(report, outcomes = [summarise_outcome(outcome) for outcome in report['outcomes']])
+
+def test__diff_reports__summarised_against_full():
+    # Passing items left out of the summarised report are not removals
+    assert list(diff_reports(before_report, _summarised(before_report))) == []
+    failing_report = {'invalid_rmrs': {}, 'outcomes': [
+        before_report['outcomes'][0],
+        {'id': '15-3', 'result': [{'result': 'FAILED', 'name': 'T1'}, {'result': 'FAILED', 'name': 'T3'}]}
+    ]}
+    assert list(diff_reports(_summarised(before_report), failing_report)) == [
+        {'id': '15-3', 'name': [], 'before': {'PASSED': 2, 'FAILED': 1}, 'after': {'FAILED': 2}}
+    ]
+
+def test__diff_reports__summarised_files(tmp_path):
+    before_path = str(tmp_path / 'before.json')
+    write_json_report(before_report, before_path)
+    after_path = tmp_path / 'after.ndjson'
+    _write_ndjson(_summarised(before_report), after_path)
+    assert list(diff_reports(before_path, str(after_path))) == []
+    assert list(diff_reports(str(after_path), before_path)) == []
@@ -0,0 +1,235 @@
+import json
+import sqlite3
+
+from rct229.utils.file import open_input_file
+
+# Outcome rows are inserted in batches of this many rows
+INSERT_BATCH_SIZE = 10000
+
+# Result of a row whose result is a list of item outcomes
+_LIST_RESULT = None
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    invalid_rmrs TEXT
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    id INTEGER PRIMARY KEY,
+    project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    parent_id INTEGER,
+    rule_id TEXT,
+    description TEXT,
+    rmr_context TEXT,
+    name TEXT,
+    result TEXT,
+    result_counts TEXT
+);
+CREATE INDEX IF NOT EXISTS outcomes_project ON outcomes(project_id, id);
+CREATE INDEX IF NOT EXISTS outcomes_rule_result ON outcomes(rule_id, result);
+CREATE INDEX IF NOT EXISTS outcomes_result_project ON outcomes(result, project_id);
+CREATE INDEX IF NOT EXISTS outcomes_name ON outcomes(name);
+"""
+
+_OUTCOME_COLUMNS = 'id, project_id, parent_id, rule_id, description, rmr_context, name, result, result_counts'
+_INSERT_OUTCOME = f'INSERT INTO outcomes ({_OUTCOME_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+
+UNKNOWN_PROJECT_MSG = 'Unknown project'
+
+
+class ReportStore:
+    """SQLite database of rule outcomes from many project reports
+
+    Every outcome, including each item of a list-type rule, is a row keyed by
+    project, rule id, item name, and result, so that questions such as which
+    projects fail a rule are answered from an index rather than by loading
+    every report. Item rows carry the id of their top-level rule and point
+    to their parent row.
+    """
+
+    def __init__(self, path):
+        """Opens, and if needed creates, a report store
+
+        Parameters
+        ----------
+        path : string
+            The SQLite database file
+        """
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _outcome_rows(self, project_id, outcomes, next_id):
+        """Yields the rows for a list of outcomes in depth-first order"""
+        # Each stack entry is (parent row id, top-level rule id, outcome iterator)
+        stack = [(None, None, iter(outcomes))]
+        while stack:
+            parent_id, rule_id, items = stack[-1]
+            outcome = next(items, None)
+            if outcome is None:
+                stack.pop()
+                continue
+
+            row_id = next_id
+            next_id += 1
+            if parent_id is None:
+                rule_id = outcome.get('id')
+            result = outcome['result']
+            result_counts = outcome.get('result_counts')
+            yield (
+                row_id, project_id, parent_id, rule_id,
+                outcome.get('description') if parent_id is None else None,
+                outcome.get('rmr_context') if parent_id is None else None,
+                outcome.get('name'),
+                result if isinstance(result, str) else _LIST_RESULT,
+                json.dumps(result_counts) if result_counts is not None else None
+            )
+            if not isinstance(result, str):
+                stack.append((row_id, rule_id, iter(result)))
+
+    def ingest(self, project, report):
+        """Adds a report, replacing any earlier report for the same project
+
+        The report is inserted in a single transaction.
+
+        Parameters
+        ----------
+        project : string
+            The project name
+        report : dict
+            A report as returned by evaluate_rules(); its outcomes may be a
+            list or an OutcomeStore
+
+        Returns
+        -------
+        int
+            The number of outcome rows inserted
+        """
+        connection = self.connection
+        with connection:
+            connection.execute('DELETE FROM projects WHERE name = ?', (project,))
+            project_id = connection.execute(
+                'INSERT INTO projects (name, invalid_rmrs) VALUES (?, ?)',
+                (project, json.dumps(report.get('invalid_rmrs') or {}))
+            ).lastrowid
+            next_id = connection.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM outcomes').fetchone()[0]
+
+            count = 0
+            batch = []
+            for row in self._outcome_rows(project_id, report.get('outcomes', []), next_id):
+                batch.append(row)
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    connection.executemany(_INSERT_OUTCOME, batch)
+                    count += len(batch)
+                    batch = []
+            connection.executemany(_INSERT_OUTCOME, batch)
+            count += len(batch)
+
+        return count
+
+    def ingest_file(self, project, path):
+        """Adds a JSON report file, which may be gzip, bzip2, or xz compressed;
+        see ingest()
+        """
+        with open_input_file(path) as f:
+            report = json.load(f)
+
+        return self.ingest(project, report)
+
+    def projects(self):
+        """Returns the names of the stored projects"""
+        return [row[0] for row in self.connection.execute('SELECT name FROM projects ORDER BY name')]
+
+    def query(self, rule_id = None, result = None, project = None, name = None):
+        """Finds evaluations by rule, result, project, or item name
+
+        Parameters
+        ----------
+        rule_id : string
+            Optional top-level rule id, e.g. '15-3'
+        result : string
+            Optional result, e.g. 'FAILED'
+        project : string
+            Optional project name
+        name : string
+            Optional item name
+
+        Returns
+        -------
+        list of tuple
+            (project, rule_id, name, result) for each matching evaluation;
+            outcomes whose result is a list are not included
+        """
+        conditions = ['o.result IS NOT NULL']
+        params = []
+        for column, value in [('o.rule_id', rule_id), ('o.result', result), ('p.name', project), ('o.name', name)]:
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+
+        return self.connection.execute(
+            'SELECT p.name, o.rule_id, o.name, o.result FROM outcomes o JOIN projects p ON p.id = o.project_id '
+            f'WHERE {" AND ".join(conditions)} ORDER BY p.name, o.id',
+            params
+        ).fetchall()
+
+    def export(self, project):
+        """Rebuilds the report of a project
+
+        Parameters
+        ----------
+        project : string
+            The project name
+
+        Returns
+        -------
+        dict
+            The report in the form returned by evaluate_rules(), without
+            outcome keys other than id, description, rmr_context, name,
+            result, and result_counts
+        """
+        row = self.connection.execute('SELECT id, invalid_rmrs FROM projects WHERE name = ?', (project,)).fetchone()
+        if row is None:
+            raise KeyError(f'{UNKNOWN_PROJECT_MSG}: {project}')
+        project_id, invalid_rmrs = row
+
+        outcomes = []
+        list_results = {}
+        cursor = self.connection.execute(
+            'SELECT id, parent_id, rule_id, description, rmr_context, name, result, result_counts '
+            'FROM outcomes WHERE project_id = ? ORDER BY id',
+            (project_id,)
+        )
+        for row_id, parent_id, rule_id, description, rmr_context, name, result, result_counts in cursor:
+            outcome = {}
+            if parent_id is None:
+                if rule_id:
+                    outcome['id'] = rule_id
+                if description:
+                    outcome['description'] = description
+                if rmr_context:
+                    outcome['rmr_context'] = rmr_context
+            if result is _LIST_RESULT:
+                result = list_results[row_id] = []
+            outcome['result'] = result
+            if name is not None:
+                outcome['name'] = name
+            if result_counts is not None:
+                outcome['result_counts'] = json.loads(result_counts)
+
+            if parent_id is None:
+                outcomes.append(outcome)
+            else:
+                list_results[parent_id].append(outcome)
+
+        return {'invalid_rmrs': json.loads(invalid_rmrs), 'outcomes': outcomes}
@@ -0,0 +1,53 @@
+import gzip
+import json
+
+from rct229.reports.report_store import ReportStore
+from rct229.rule_engine.outcome_store import OutcomeStore
+
+test_report = {
+    'invalid_rmrs': {},
+    'outcomes': [
+        {'id': '15-1', 'description': 'A rule', 'rmr_context': 'transformers', 'result': 'PASSED'},
+        {'id': '15-3', 'result': [
+            {'result': 'PASSED', 'name': 'T1'},
+            {'result': [{'result': 'FAILED', 'name': 'T2a'}], 'name': 'T2'}
+        ]},
+        {'id': '15-6', 'result': [{'result': 'NA', 'name': 'T3'}], 'result_counts': {'PASSED': 4, 'NA': 1}}
+    ]
+}
+
+# Testing ReportStore
+def test__report_store__export_round_trip(tmp_path):
+    with ReportStore(str(tmp_path / 'reports.db')) as store:
+        assert store.ingest('P1', test_report) == 7
+        assert store.export('P1') == test_report
+
+def test__report_store__query(tmp_path):
+    with ReportStore(str(tmp_path / 'reports.db')) as store:
+        store.ingest('P1', test_report)
+        store.ingest('P2', {'invalid_rmrs': {}, 'outcomes': [{'id': '15-3', 'result': [{'result': 'PASSED', 'name': 'T1'}]}]})
+        assert store.projects() == ['P1', 'P2']
+        assert store.query(rule_id = '15-3', result = 'FAILED') == [('P1', '15-3', 'T2a', 'FAILED')]
+        assert store.query(name = 'T1') == [('P1', '15-3', 'T1', 'PASSED'), ('P2', '15-3', 'T1', 'PASSED')]
+        assert len(store.query(project = 'P1')) == 4
+
+def test__report_store__ingest_replaces_project(tmp_path):
+    with ReportStore(str(tmp_path / 'reports.db')) as store:
+        store.ingest('P1', test_report)
+        store.ingest('P1', {'invalid_rmrs': {}, 'outcomes': [{'id': '15-1', 'result': 'FAILED'}]})
+        assert store.query() == [('P1', '15-1', None, 'FAILED')]
+
+def test__report_store__ingest_outcome_store(tmp_path):
+    outcomes = OutcomeStore()
+    for outcome in test_report['outcomes'][:2]:
+        outcomes.add_outcome(outcome)
+    with ReportStore(str(tmp_path / 'reports.db')) as store:
+        store.ingest('P1', {'invalid_rmrs': {}, 'outcomes': outcomes})
+        assert store.export('P1')['outcomes'] == test_report['outcomes'][:2]
+
+def test__report_store__ingest_compressed_file(tmp_path):
+    path = tmp_path / 'report.json.gz'
+    path.write_bytes(gzip.compress(json.dumps(test_report).encode()))
+    with ReportStore(str(tmp_path / 'reports.db')) as store:
+        store.ingest_file('P1', str(path))
+        assert store.export('P1') == test_report
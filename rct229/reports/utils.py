@@ -1,11 +1,25 @@
-def aggregate_outcomes(outcomes):
+from rct229.rule_engine.outcome_store import OutcomeStore, ResultCode, SUMMARY_KEYS
 
+def aggregate_outcomes(outcomes):
+    if isinstance(outcomes, OutcomeStore):
+        # The store counts its result codes directly
+        return outcomes.summary()
 
     def _count_results(outcomes):
         for outcome in outcomes:
             summary_dict['number_evaluations'] += 1
             result = outcome['result']
-            if result == 'FAILED':
+            if 'result_counts' in outcome:
+                # A summarised list-type outcome; its non-passing items are
+                # already counted
+                summary_dict['number_evaluations'] -= 1
+                for item_result, count in outcome['result_counts'].items():
+                    try:
+                        summary_dict[SUMMARY_KEYS[ResultCode[item_result]]] += count
+                    except KeyError:
+                        raise ValueError('Unknown result type')
+                    summary_dict['number_evaluations'] += count
+            elif result == 'FAILED':
                 summary_dict['number_failed'] += 1
             elif result == 'PASSED':
                 summary_dict['number_passed'] += 1
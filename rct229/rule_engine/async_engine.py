@@ -0,0 +1,167 @@
+import asyncio
+import functools
+
+from rct229.rule_engine.engine import get_all_rules, summarise_outcome, validate_used_rmrs
+from rct229.rule_engine.outcome_counter import OutcomeCounter
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.schema.validate import validate_rmr
+from rct229.utils.file import deserialize_rmr_file
+
+# Async counterparts of the loading, validation, and evaluation functions.
+# Each runs the blocking work in an executor: the executor passed in, or the
+# event loop's default executor, which can be replaced with
+# loop.set_default_executor(). The event loop is free to serve other
+# requests meanwhile.
+
+
+async def _run(executor, func, *args, **kwargs):
+    """Runs func in an executor and waits for its result"""
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+
+def _load_rmr_path(path, pointers, cache_dir):
+    with open(path, 'rb') as f:
+        return deserialize_rmr_file(f, pointers, cache_dir)
+
+
+async def load_rmr_async(path, pointers = None, cache_dir = None, executor = None):
+    """Deserializes an RMR file in an executor; see deserialize_rmr_file()
+
+    Parameters
+    ----------
+    path : string
+        The path of the RMR file
+    pointers : iterable of string
+        Optional JSON pointers selecting the parts of the RMR to load
+    cache_dir : string
+        Optional directory of binary RMRs reused across runs
+    executor : concurrent.futures.Executor
+        The executor to load in; the event loop's default executor if None
+
+    Returns
+    -------
+    dict or Mapping
+        The RMR
+    """
+    return await _run(executor, _load_rmr_path, path, pointers, cache_dir)
+
+
+async def validate_rmr_async(rmr_obj, executor = None):
+    """Validates an RMR in an executor; see validate_rmr()"""
+    return await _run(executor, validate_rmr, rmr_obj)
+
+
+async def validate_used_rmrs_async(rules_list, rmrs, executor = None):
+    """Validates the RMRs used by a list of rules in an executor; see
+    validate_used_rmrs()
+    """
+    return await _run(executor, validate_used_rmrs, rules_list, rmrs)
+
+
+def _evaluate_rule(rule, rmrs, summarised, counter):
+    """Evaluates a rule completely, so that no work is left for the event loop"""
+    if summarised:
+        outcome = rule.evaluate_lazily(rmrs)
+        return summarise_outcome(counter.track(outcome) if counter is not None else outcome)
+
+    outcome = rule.evaluate(rmrs)
+
+    return counter.track(outcome) if counter is not None else outcome
+
+
+async def _iter_outcomes(rules_list, rmrs, summarised, counter, executor):
+    for rule in rules_list:
+        yield await _run(executor, _evaluate_rule, rule, rmrs, summarised, counter)
+
+
+async def evaluate_rules_async_iter(rules_list, rmrs, summarised = False, counter = None, executor = None):
+    """ Evaluates a list of rules against an RMR trio in an executor,
+    yielding each rule outcome as its rule finishes
+
+    The RMRs are validated before this returns. Each rule is then evaluated
+    as a separate executor call when the next outcome is awaited, so
+    cancelling the consuming task, or closing the iterator, stops the
+    evaluation before the next rule; a rule already running in the
+    executor runs to completion.
+
+    Parameters
+    ----------
+    rules_list : list
+        list of rule definitions
+    rmrs : UserBaselineProposedVals
+        Object containing the user, baseline, and proposed RMRs
+    summarised : bool
+        If True, the outcome of each list-type rule keeps only per-result
+        counts and its non-passing items; see summarise_outcome()
+    counter : OutcomeCounter
+        Optional counters updated as the rules are evaluated
+    executor : concurrent.futures.Executor
+        The executor to validate and evaluate in; the event loop's default
+        executor if None
+
+    Returns
+    -------
+    tuple
+        A tuple containing:
+        - invalid_rmrs (dict): The keys are the names of the invalid RMRs.
+            The values are the corresponding schema validation errors.
+        - outcomes (async iterator): The rule outcomes described in
+            evaluate_rules(), each fully evaluated. No rules are evaluated
+            if any used RMR is invalid.
+    """
+    invalid_rmrs = await validate_used_rmrs_async(rules_list, rmrs, executor)
+    if len(invalid_rmrs) != 0:
+        rules_list = []
+
+    return invalid_rmrs, _iter_outcomes(rules_list, rmrs, summarised, counter, executor)
+
+
+async def evaluate_rules_async(rules_list, rmrs, summarised = False, counter = None, executor = None):
+    """ Evaluates a list of rules against an RMR trio in an executor
+
+    The async counterpart of evaluate_rules(); the outcomes are a list of
+    dictionaries. Cancellation takes effect between rules, see
+    evaluate_rules_async_iter().
+
+    Parameters
+    ----------
+    rules_list : list
+        list of rule definitions
+    rmrs : UserBaselineProposedVals
+        Object containing the user, baseline, and proposed RMRs
+    summarised : bool
+        If True, the outcome of each list-type rule keeps only per-result
+        counts and its non-passing items; see summarise_outcome()
+    counter : OutcomeCounter
+        Optional counters to update as the rules are evaluated; a new
+        OutcomeCounter is used by default
+    executor : concurrent.futures.Executor
+        The executor to validate and evaluate in; the event loop's default
+        executor if None
+
+    Returns
+    -------
+    dict
+        The report described in evaluate_rules()
+    """
+    if counter is None:
+        counter = OutcomeCounter()
+
+    invalid_rmrs, outcomes = await evaluate_rules_async_iter(rules_list, rmrs, summarised, counter, executor)
+
+    return {
+        'invalid_rmrs': invalid_rmrs,
+        'outcomes': [outcome async for outcome in outcomes],
+        'summary': counter.to_dict()
+    }
+
+
+async def evaluate_all_rules_async(user_rmr, baseline_rmr, proposed_rmr, summarised = False, executor = None):
+    """ Evaluates all available rules in an executor; see
+    evaluate_rules_async()
+    """
+    rmrs = UserBaselineProposedVals(user_rmr, baseline_rmr, proposed_rmr)
+
+    return await evaluate_rules_async(get_all_rules(), rmrs, summarised = summarised, executor = executor)
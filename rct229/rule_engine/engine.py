@@ -1,7 +1,9 @@
 import inspect
 import rct229.rule_engine.rule_base as base_classes
 import rct229.rules as rules
-from rct229.schema.validate import validate_rmr
+from rct229.schema.validate import get_validator, validate_rmr
+from rct229.rule_engine.outcome_counter import OutcomeCounter
+from rct229.rule_engine.outcome_store import OutcomeStore
 from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
 
 def get_available_rules():
@@ -22,18 +24,100 @@ def get_available_rules():
 # def check_rule_definition_format():
 #     pass
 
-# Functions for evaluating rules
-def evaluate_all_rules(user_rmr, baseline_rmr, proposed_rmr):
+def get_rmr_pointers(rules_list):
+    """Returns the JSON pointers into the RMRs that are read by a list of rules
+
+    Nested rules work within their parent rule's context, so only the
+    top-level rmr_context of each rule is needed.
+
+    Parameters
+    ----------
+    rules_list : list
+        list of rule definitions
+
+    Returns
+    -------
+    UserBaselineProposedVals
+        Object containing a set of JSON pointers for each of the user,
+        baseline, and proposed RMRs; a set is empty if that RMR is not used
+    """
+    pointers = UserBaselineProposedVals(set(), set(), set())
+    for rule in rules_list:
+        pointer = rule.get_rmr_pointer()
+        if rule.rmrs_used.user:
+            pointers.user.add(pointer)
+        if rule.rmrs_used.baseline:
+            pointers.baseline.add(pointer)
+        if rule.rmrs_used.proposed:
+            pointers.proposed.add(pointer)
 
-    # Get reference to rule functions in rules model
+    return pointers
+
+def get_all_rules():
+    """Returns an instance of every available rule definition"""
     AvailableRuleDefinitions = rules.__getrules__()
 
-    rules_list = [RuleDef[1]() for RuleDef in AvailableRuleDefinitions]
+    return [RuleDef[1]() for RuleDef in AvailableRuleDefinitions]
+
+def warm_up():
+    """Creates the process-wide state used to evaluate rules: the schema
+    validator, the schema enumerations and data tables loaded by the rule
+    modules, and an instance of every rule definition
+
+    Long-lived processes call this once so that no evaluation pays for it.
+
+    Returns
+    -------
+    list
+        An instance of every available rule definition, as returned by
+        get_all_rules()
+    """
+    get_validator()
+
+    return get_all_rules()
+
+def select_rules(rules_list, rule_ids):
+    """Returns the rules with the given ids, in the order of rules_list
+
+    Parameters
+    ----------
+    rules_list : list
+        list of rule definitions
+    rule_ids : iterable of string
+        Rule ids, e.g. '15-3'
+
+    Returns
+    -------
+    list
+        The selected rule definitions
+    """
+    UNKNOWN_RULE_MSG = 'Unknown rule id'
+
+    rule_ids = set(rule_ids)
+    unknown_ids = rule_ids - set(rule.id for rule in rules_list)
+    if unknown_ids:
+        raise ValueError(f"{UNKNOWN_RULE_MSG}: {', '.join(sorted(unknown_ids))}")
+
+    return [rule for rule in rules_list if rule.id in rule_ids]
+
+# Functions for evaluating rules
+def evaluate_all_rules(user_rmr, baseline_rmr, proposed_rmr, columnar = False, summarised = False):
+
+    # Get an instance of each rule definition in the rules module
+    rules_list = get_all_rules()
     rmrs = UserBaselineProposedVals(user_rmr, baseline_rmr, proposed_rmr)
-    report = evaluate_rules(rules_list, rmrs)
+    report = evaluate_rules(rules_list, rmrs, columnar = columnar, summarised = summarised)
 
     return report
 
+def evaluate_all_rules_iter(user_rmr, baseline_rmr, proposed_rmr, counter = None):
+    """ Evaluates all available rules, yielding each outcome as the rule is
+    evaluated; see evaluate_rules_iter()
+    """
+    rmrs = UserBaselineProposedVals(user_rmr, baseline_rmr, proposed_rmr)
+
+    return evaluate_rules_iter(get_all_rules(), rmrs, counter = counter)
+
 def evaluate_rule(rule, rmrs):
     """ Evaluates a single rule against an RMR trio
 
@@ -63,8 +147,8 @@ def evaluate_rule(rule, rmrs):
 
     return evaluate_rules([rule], rmrs)
 
-def evaluate_rules(rules_list, rmrs):
-    """ Evaluates a list of rules against an RMR trio
+def validate_used_rmrs(rules_list, rmrs):
+    """ Validates the RMRs used by a list of rules
 
     Parameters
     ----------
@@ -76,20 +160,8 @@ def evaluate_rules(rules_list, rmrs):
     Returns
     -------
     dict
-        A dictionary of the form:
-        {
-            invalid_rmrs: dict - The keys are the names of the invalid RMRs.
-                The values are the corresponding schema validation errors.
-            outcomes: [dict] - A list of rule outcomes; each outcome is
-                a dictionary of the form:
-                {
-                    id: string - A unique identifier for the rule
-                    description: string
-                    rmr_context: string - a JSON pointer into the RMR
-                    result: string or list - One of the strings "PASS", "FAIL", "NA", or "REQUIRES_MANUAL_CHECK" or a list
-                        of outcomes for a list-type rule
-                }
-        }
+        The keys are the names of the invalid RMRs. The values are the
+        corresponding schema validation errors.
     """
 
     # Determine which rmrs are used by the rule definitions
@@ -103,7 +175,6 @@ def evaluate_rules(rules_list, rmrs):
             rmrs_used.proposed = True
 
     # Validate the rmrs against the schema and other high-level checks
-    outcomes = []
     invalid_rmrs = {}
 
     if rmrs_used.user:
@@ -121,10 +192,154 @@ def evaluate_rules(rules_list, rmrs):
         if proposed_validation["passed"] is not True:
             invalid_rmrs['Proposed'] = proposed_validation['error']
 
+    return invalid_rmrs
+
+def evaluate_rules_iter(rules_list, rmrs, counter = None):
+    """ Evaluates a list of rules against an RMR trio, yielding each rule
+    outcome as the rule is evaluated
+
+    The RMRs are validated before this returns; the rules are evaluated one
+    at a time as the outcomes are consumed.
+
+    Parameters
+    ----------
+    rules_list : list
+        list of rule definitions
+    rmrs : UserBaselineProposedVals
+        Object containing the user, baseline, and proposed RMRs
+    counter : OutcomeCounter
+        Optional counters updated as the outcomes are consumed
+
+    Returns
+    -------
+    tuple
+        A tuple containing:
+        - invalid_rmrs (dict): The keys are the names of the invalid RMRs.
+            The values are the corresponding schema validation errors.
+        - outcomes (iterator): The rule outcomes described in evaluate_rules().
+            The result of a list-type rule is itself an iterator that
+            evaluates each item as it is consumed. No rules are evaluated if
+            any used RMR is invalid.
+    """
+    invalid_rmrs = validate_used_rmrs(rules_list, rmrs)
+    if len(invalid_rmrs) != 0:
+        return invalid_rmrs, iter([])
+
+    if counter is not None:
+        return invalid_rmrs, (counter.track(rule.evaluate_lazily(rmrs)) for rule in rules_list)
+
+    return invalid_rmrs, (rule.evaluate_lazily(rmrs) for rule in rules_list)
+
+def summarise_outcome(outcome):
+    """ Replaces the item outcomes of a list-type rule outcome with counts
+
+    The items are counted as they are evaluated, so a lazy result from
+    evaluate_lazily() is never held in memory. Only the items that did not
+    pass are kept.
+
+    Parameters
+    ----------
+    outcome : dict
+        A rule outcome as returned by evaluate() or evaluate_lazily()
+
+    Returns
+    -------
+    dict
+        The outcome unchanged if its result is a string. Otherwise a copy
+        whose result is the list of non-passing item outcomes, themselves
+        summarised, and with an added result_counts dictionary mapping each
+        result string to the number of items with that result. Items of
+        nested list-type rules are counted in the same dictionary.
+    """
+    result = outcome['result']
+    if isinstance(result, str):
+        return outcome
+
+    result_counts = {}
+    non_passing = []
+    for item_outcome in result:
+        item_outcome = summarise_outcome(item_outcome)
+        item_result = item_outcome['result']
+        if isinstance(item_result, str):
+            result_counts[item_result] = result_counts.get(item_result, 0) + 1
+            if item_result != 'PASSED':
+                non_passing.append(item_outcome)
+        else:
+            for item_result, count in item_outcome['result_counts'].items():
+                result_counts[item_result] = result_counts.get(item_result, 0) + count
+            if item_outcome['result']:
+                non_passing.append(item_outcome)
+
+    summarised_outcome = dict(outcome)
+    summarised_outcome['result'] = non_passing
+    summarised_outcome['result_counts'] = result_counts
+
+    return summarised_outcome
+
+def evaluate_rules(rules_list, rmrs, columnar = False, summarised = False, counter = None):
+    """ Evaluates a list of rules against an RMR trio
+
+    Parameters
+    ----------
+    rules_list : list
+        list of rule definitions
+    rmrs : UserBaselineProposedVals
+        Object containing the user, baseline, and proposed RMRs
+    columnar : bool
+        If True, the outcomes are collected in an OutcomeStore as they are
+        evaluated instead of a list of dictionaries. The store reads like the
+        list, but holds each item outcome as a few integers.
+    summarised : bool
+        If True, the outcome of each list-type rule keeps only per-result
+        counts and its non-passing items; see summarise_outcome(). Cannot
+        be combined with columnar.
+    counter : OutcomeCounter
+        Optional counters to update as the rules are evaluated, e.g. to
+        watch the progress of a long run. A new OutcomeCounter is used by
+        default.
+
+    Returns
+    -------
+    dict
+        A dictionary of the form:
+        {
+            invalid_rmrs: dict - The keys are the names of the invalid RMRs.
+                The values are the corresponding schema validation errors.
+            outcomes: [dict] or OutcomeStore - A list of rule outcomes; each outcome is
+                a dictionary of the form:
+                {
+                    id: string - A unique identifier for the rule
+                    description: string
+                    rmr_context: string - a JSON pointer into the RMR
+                    result: string or list - One of the strings "PASS", "FAIL", "NA", or "REQUIRES_MANUAL_CHECK" or a list
+                        of outcomes for a list-type rule
+                }
+            summary: dict - The totals described in aggregate_outcomes()
+                along with 'by_rule' and 'by_section' breakdowns of the same
+                counts; see OutcomeCounter.to_dict()
+        }
+    """
+
+    if columnar and summarised:
+        raise ValueError('A report cannot be both columnar and summarised')
+
+    # Validate the rmrs against the schema and other high-level checks
+    outcomes = OutcomeStore() if columnar else []
+    invalid_rmrs = validate_used_rmrs(rules_list, rmrs)
+    if counter is None:
+        counter = OutcomeCounter()
+
     # Evaluate the rules if all the used rmrs are valid
     if len(invalid_rmrs) == 0:
         for rule in rules_list:
-            outcome = rule.evaluate(rmrs)
-            outcomes.append(outcome)
+            if columnar:
+                # Item outcomes go straight into the store without being
+                # collected in a list first
+                outcomes.add_outcome(counter.track(rule.evaluate_lazily(rmrs)))
+            elif summarised:
+                outcomes.append(summarise_outcome(counter.track(rule.evaluate_lazily(rmrs))))
+            else:
+                outcome = counter.track(rule.evaluate(rmrs))
+                outcomes.append(outcome)
 
-    return { 'invalid_rmrs': invalid_rmrs, 'outcomes': outcomes }
+    return { 'invalid_rmrs': invalid_rmrs, 'outcomes': outcomes, 'summary': counter.to_dict() }
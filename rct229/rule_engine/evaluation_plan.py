@@ -0,0 +1,196 @@
+from collections.abc import Sequence
+import io
+import os
+
+from rct229.rule_engine.engine import get_all_rules, get_rmr_pointers
+from rct229.rule_engine.rule_base import RuleDefinitionListBase
+from rct229.utils.file import deserialize_rmr_file, open_input_file
+from rct229.utils.instrumentation import resolve_pointer
+
+RMR_NAMES = ['user', 'baseline', 'proposed']
+
+# Benchmark cases used to estimate each part of an evaluation; see
+# rct229.benchmarks.cases
+LOAD_CASE = 'deserialize_rmr_file'
+VALIDATE_CASE = 'validate_rmr'
+EVALUATE_CASE = 'evaluate_all_rules'
+
+_READ_CHUNK_SIZE = 1 << 20
+
+
+def _json_bytes(path):
+    """Returns the size of an RMR file, uncompressed"""
+    with open_input_file(path) as f:
+        if isinstance(f, io.BufferedReader):
+            return os.fstat(f.fileno()).st_size
+        size = 0
+        chunk = f.read(_READ_CHUNK_SIZE)
+        while chunk:
+            size += len(chunk)
+            chunk = f.read(_READ_CHUNK_SIZE)
+
+    return size
+
+
+def _context_size(rmr, pointer):
+    """Returns the length of a list context, 1 for any other context, or
+    None when the context is missing
+    """
+    context = resolve_pointer(rmr, pointer, None)
+    if context is None:
+        return None
+    if isinstance(context, Sequence) and not isinstance(context, str):
+        return len(context)
+
+    return 1
+
+
+def plan_evaluation(rules_list, rmr_paths):
+    """Describes the work of evaluating rules against an RMR trio without
+    evaluating them
+
+    Only the parts of the RMRs read by the rules are loaded.
+
+    Parameters
+    ----------
+    rules_list : list
+        list of rule definitions
+    rmr_paths : UserBaselineProposedVals
+        The paths of the user, baseline, and proposed RMR files
+
+    Returns
+    -------
+    dict
+        {
+            rules: [dict] - {id, description, rmr_context, rmrs_used,
+                list_rule, index_rmr} for each rule, where rmrs_used lists
+                the names of the RMRs the rule reads
+            rmrs: dict - {path, bytes, pointers} for each RMR that must be
+                loaded and validated, by RMR name; bytes is the
+                uncompressed file size
+            contexts: [dict] - {rmr_context, sizes} for each distinct
+                rmr_context, where sizes has the list length of the context
+                in each RMR reading it, 1 for a context that is not a list,
+                or None for a missing context
+        }
+    """
+    pointers = get_rmr_pointers(rules_list)
+
+    rmrs = {}
+    loaded_rmrs = {}
+    for name in RMR_NAMES:
+        rmr_pointers = getattr(pointers, name)
+        if not rmr_pointers:
+            continue
+        path = getattr(rmr_paths, name)
+        rmrs[name] = {'path': path, 'bytes': _json_bytes(path), 'pointers': sorted(rmr_pointers)}
+        with open(path, 'rb') as f:
+            # The root pointer needs the whole RMR
+            loaded_rmrs[name] = deserialize_rmr_file(f, None if '' in rmr_pointers else rmr_pointers)
+
+    rules = []
+    contexts = {}
+    for rule in rules_list:
+        pointer = rule.get_rmr_pointer()
+        rmrs_used = [name for name in RMR_NAMES if getattr(rule.rmrs_used, name)]
+        rules.append({
+            'id': rule.id,
+            'description': rule.description,
+            'rmr_context': pointer,
+            'rmrs_used': rmrs_used,
+            'list_rule': isinstance(rule, RuleDefinitionListBase),
+            'index_rmr': getattr(rule, 'index_rmr', None)
+        })
+        sizes = contexts.setdefault(pointer, {})
+        for name in rmrs_used:
+            if name not in sizes:
+                sizes[name] = _context_size(loaded_rmrs[name], pointer)
+
+    return {
+        'rules': rules,
+        'rmrs': rmrs,
+        'contexts': [{'rmr_context': pointer, 'sizes': sizes} for pointer, sizes in contexts.items()]
+    }
+
+
+def _calibration_rates(calibration):
+    """Returns (seconds per unit, peak bytes per unit) by benchmark case,
+    taken from the largest model measured for each case
+    """
+    largest = {}
+    for result in calibration['results']:
+        current = largest.get(result['case'])
+        if result['units'] and (current is None or result['units'] > current['units']):
+            largest[result['case']] = result
+
+    return {
+        case: (result['min_seconds'] / result['units'], result['peak_bytes'] / result['units'])
+        for case, result in largest.items()
+    }
+
+
+def estimate_cost(plan, calibration):
+    """Estimates the time and memory of an evaluation from benchmark results
+
+    Loading and validation scale with the RMR sizes in bytes at the rates
+    measured for the largest benchmark model. The rule time is calibrated
+    from the evaluation of all rules: the evaluate_all_rules case validates
+    its loaded RMRs and evaluates every rule, so its time per byte less the
+    validation time per byte is the time of all rules. That time is shared
+    among the rules by the RMRs each reads, taking the RMRs of the benchmark
+    trio to be of equal size, which gives each rule's time per byte of the
+    RMRs it reads.
+
+    Parameters
+    ----------
+    plan : dict
+        An evaluation plan as returned by plan_evaluation()
+    calibration : dict
+        Benchmark results as returned by
+        rct229.benchmarks.runner.run_benchmarks()
+
+    Returns
+    -------
+    dict
+        {
+            load_seconds: float
+            validate_seconds: float
+            rules_seconds: float
+            total_seconds: float
+            peak_bytes: int - The memory held by the loaded RMRs
+            rules: dict - The estimated seconds of each rule by rule id
+        }
+    """
+    MISSING_CASE_MSG = 'The calibration data has no results for benchmark case'
+
+    rates = _calibration_rates(calibration)
+    for case in [LOAD_CASE, VALIDATE_CASE, EVALUATE_CASE]:
+        if case not in rates:
+            raise ValueError(f'{MISSING_CASE_MSG} {case}')
+
+    rmr_bytes = {name: rmr['bytes'] for name, rmr in plan['rmrs'].items()}
+    total_bytes = sum(rmr_bytes.values())
+    load_seconds = rates[LOAD_CASE][0] * total_bytes
+    validate_seconds = rates[VALIDATE_CASE][0] * total_bytes
+
+    # Timing noise can put the validation of a small model above its
+    # whole evaluation
+    evaluate_rate = max(rates[EVALUATE_CASE][0] - rates[VALIDATE_CASE][0], 0.0)
+    rmrs_read = sum(
+        len([name for name in RMR_NAMES if getattr(rule.rmrs_used, name)]) for rule in get_all_rules()
+    )
+    rule_rate = evaluate_rate * len(RMR_NAMES) / rmrs_read
+    rule_seconds = {
+        rule['id']: rule_rate * sum(rmr_bytes[name] for name in rule['rmrs_used'])
+        for rule in plan['rules']
+    }
+    rules_seconds = sum(rule_seconds.values())
+
+    return {
+        'load_seconds': load_seconds,
+        'validate_seconds': validate_seconds,
+        'rules_seconds': rules_seconds,
+        'total_seconds': load_seconds + validate_seconds + rules_seconds,
+        'peak_bytes': int(rates[LOAD_CASE][1] * total_bytes),
+        'rules': rule_seconds
+    }
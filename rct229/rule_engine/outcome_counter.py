@@ -0,0 +1,116 @@
+import threading
+
+from rct229.rule_engine.outcome_store import ResultCode, SUMMARY_KEYS
+
+UNKNOWN_RESULT_MSG = 'Unknown result type'
+
+
+def _new_summary():
+    summary_dict = {'number_evaluations': 0}
+    for key in SUMMARY_KEYS.values():
+        summary_dict[key] = 0
+
+    return summary_dict
+
+
+def get_rule_section(rule_id):
+    """Returns the section of a rule id such as '15-1', or None"""
+    if not rule_id:
+        return None
+
+    return str(rule_id).split('-')[0]
+
+
+class OutcomeCounter:
+    """Summary counters kept up to date while rules are evaluated
+
+    The counters hold the same totals as aggregate_outcomes(), along with
+    per-rule and per-section breakdowns. They may be read with to_dict() at
+    any time, e.g. from another thread to report progress on a long run;
+    updates and reads hold a lock so that a reader never sees the
+    breakdowns change while it copies them.
+    """
+
+    def __init__(self):
+        self.totals = _new_summary()
+        self.by_rule = {}
+        self.by_section = {}
+        self.rules_evaluated = 0
+        self._lock = threading.Lock()
+
+    def count(self, rule_id, result):
+        """Counts a single evaluation
+
+        Parameters
+        ----------
+        rule_id : string
+            The id of the top-level rule
+        result : string
+            The result string, e.g. 'PASSED'
+        """
+        try:
+            key = SUMMARY_KEYS[ResultCode[result]]
+        except KeyError:
+            raise ValueError(UNKNOWN_RESULT_MSG)
+
+        section = get_rule_section(rule_id)
+        with self._lock:
+            rule_summary = self.by_rule.get(rule_id)
+            if rule_summary is None:
+                rule_summary = self.by_rule[rule_id] = _new_summary()
+            section_summary = self.by_section.get(section)
+            if section_summary is None:
+                section_summary = self.by_section[section] = _new_summary()
+
+            for summary_dict in (self.totals, rule_summary, section_summary):
+                summary_dict['number_evaluations'] += 1
+                summary_dict[key] += 1
+
+    def _counted_items(self, rule_id, items):
+        for item_outcome in items:
+            yield self._track(rule_id, item_outcome)
+
+    def _track(self, rule_id, outcome):
+        result = outcome['result']
+        if isinstance(result, str):
+            self.count(rule_id, result)
+            return outcome
+        if isinstance(result, list):
+            # Already evaluated, e.g. the items of a nested list-type rule
+            for item_outcome in result:
+                self._track(rule_id, item_outcome)
+            return outcome
+
+        tracked_outcome = dict(outcome)
+        tracked_outcome['result'] = self._counted_items(rule_id, result)
+
+        return tracked_outcome
+
+    def track(self, outcome):
+        """Counts a top-level rule outcome as it is consumed
+
+        Parameters
+        ----------
+        outcome : dict
+            A rule outcome as returned by evaluate() or evaluate_lazily()
+
+        Returns
+        -------
+        dict
+            The outcome, or for a lazy list-type rule outcome a copy whose
+            result is an iterator that counts each item outcome as it is
+            consumed
+        """
+        with self._lock:
+            self.rules_evaluated += 1
+
+        return self._track(outcome.get('id'), outcome)
+
+    def to_dict(self):
+        """Returns the totals with 'by_rule' and 'by_section' breakdowns"""
+        with self._lock:
+            summary_dict = dict(self.totals)
+            summary_dict['by_rule'] = {rule_id: dict(counts) for rule_id, counts in self.by_rule.items()}
+            summary_dict['by_section'] = {section: dict(counts) for section, counts in self.by_section.items()}
+
+        return summary_dict
@@ -0,0 +1,228 @@
+from array import array
+from collections.abc import Mapping, Sequence
+from enum import IntEnum
+
+
+class ResultCode(IntEnum):
+    """Rule outcome results as small integers
+
+    LIST marks an outcome whose result is a list of item outcomes.
+    """
+    PASSED = 0
+    FAILED = 1
+    NA = 2
+    MANUAL_CHECK_REQUIRED = 3
+    MISSING_CONTEXT = 4
+    LIST = 5
+
+
+# Keys of the summary returned by OutcomeStore.summary() and
+# aggregate_outcomes(), by result code
+SUMMARY_KEYS = {
+    ResultCode.PASSED: 'number_passed',
+    ResultCode.FAILED: 'number_failed',
+    ResultCode.MISSING_CONTEXT: 'number_missing_context',
+    ResultCode.NA: 'number_not_applicable',
+    ResultCode.MANUAL_CHECK_REQUIRED: 'number_manual_check_required'
+}
+
+_NO_NAME = -1
+UNKNOWN_RESULT_MSG = 'Unknown result type'
+
+
+class OutcomeStore(Sequence):
+    """Columnar store of rule outcomes
+
+    Every outcome, including each item of a list-type rule, is a row in a
+    set of parallel arrays holding a rule index, an interned item name, and
+    a ResultCode. The id, description, and rmr_context of each top-level
+    rule are stored once. Rows are kept in evaluation order, so the items of
+    a list-type outcome are the rows that follow it up to its subtree end.
+
+    The store is a sequence of read-only OutcomeView mappings that look like
+    the outcome dictionaries returned by RuleDefinitionBase.evaluate().
+    Outcome keys other than id, description, rmr_context, name, and result
+    are not kept.
+    """
+
+    def __init__(self):
+        # Per top-level rule
+        self._rules = []
+        self._rule_rows = array('I')
+
+        # Per row
+        self.rule_index = array('I')
+        self.name_index = array('i')
+        self.result_code = array('b')
+        self._subtree_end = array('I')
+
+        self._names = []
+        self._name_indexes = {}
+
+    def _intern_name(self, name):
+        if name is None:
+            return _NO_NAME
+        index = self._name_indexes.get(name)
+        if index is None:
+            index = self._name_indexes[name] = len(self._names)
+            self._names.append(name)
+
+        return index
+
+    def _add_row(self, rule_index, outcome):
+        row = len(self.result_code)
+        self.rule_index.append(rule_index)
+        self.name_index.append(self._intern_name(outcome.get('name')))
+        self._subtree_end.append(row + 1)
+
+        result = outcome['result']
+        if isinstance(result, str):
+            try:
+                self.result_code.append(ResultCode[result])
+            except KeyError:
+                raise ValueError(UNKNOWN_RESULT_MSG)
+        else:
+            # A list, or an iterator from evaluate_lazily(), of item outcomes
+            self.result_code.append(ResultCode.LIST)
+            for item_outcome in result:
+                self._add_row(rule_index, item_outcome)
+            self._subtree_end[row] = len(self.result_code)
+
+        return row
+
+    def add_outcome(self, outcome):
+        """Adds a top-level rule outcome
+
+        Parameters
+        ----------
+        outcome : dict
+            A rule outcome as returned by RuleDefinitionBase.evaluate() or
+            evaluate_lazily(); a lazy list result is consumed item by item
+        """
+        rule_index = len(self._rules)
+        self._rules.append((outcome.get('id'), outcome.get('description'), outcome.get('rmr_context')))
+        self._rule_rows.append(self._add_row(rule_index, outcome))
+
+    def __len__(self):
+        return len(self._rules)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        return OutcomeView(self, self._rule_rows[index], top_level = True)
+
+    def rule_ids(self):
+        """Returns the id of each top-level rule"""
+        return [rule[0] for rule in self._rules]
+
+    def summary(self):
+        """Counts the evaluations by result without walking the outcomes
+
+        Returns
+        -------
+        dict
+            The same summary as aggregate_outcomes()
+        """
+        summary_dict = {'number_evaluations': len(self.result_code) - self.result_code.count(ResultCode.LIST)}
+        for code, key in SUMMARY_KEYS.items():
+            summary_dict[key] = self.result_code.count(code)
+
+        return summary_dict
+
+    def to_list(self):
+        """Returns the outcomes as a list of plain dictionaries"""
+        return [view.to_dict() for view in self]
+
+
+class OutcomeView(Mapping):
+    """Read-only dictionary view of a row in an OutcomeStore"""
+    __slots__ = ('_store', '_row', '_keys')
+
+    def __init__(self, store, row, top_level = False):
+        self._store = store
+        self._row = row
+
+        keys = []
+        if top_level:
+            rule_id, description, rmr_context = store._rules[store.rule_index[row]]
+            if rule_id:
+                keys.append('id')
+            if description:
+                keys.append('description')
+            if rmr_context:
+                keys.append('rmr_context')
+        keys.append('result')
+        if store.name_index[row] != _NO_NAME:
+            keys.append('name')
+        self._keys = keys
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        store = self._store
+        row = self._row
+
+        if key == 'result':
+            code = store.result_code[row]
+            if code == ResultCode.LIST:
+                return OutcomeListView(store, row)
+            return ResultCode(code).name
+        if key == 'name':
+            return store._names[store.name_index[row]]
+
+        rule_id, description, rmr_context = store._rules[store.rule_index[row]]
+        return {'id': rule_id, 'description': description, 'rmr_context': rmr_context}[key]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def to_dict(self):
+        """Returns the outcome as a plain dictionary"""
+        outcome = {key: self[key] for key in self._keys}
+        if isinstance(outcome['result'], OutcomeListView):
+            outcome['result'] = outcome['result'].to_list()
+
+        return outcome
+
+
+class OutcomeListView(Sequence):
+    """Read-only list view of the item outcomes of a list-type outcome"""
+    __slots__ = ('_store', '_rows')
+
+    def __init__(self, store, row):
+        self._store = store
+        rows = []
+        child = row + 1
+        end = store._subtree_end[row]
+        while child < end:
+            rows.append(child)
+            child = store._subtree_end[child]
+        self._rows = rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._rows)))]
+
+        return OutcomeView(self._store, self._rows[index])
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, OutcomeListView)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self.to_list())
+
+    def to_list(self):
+        """Returns the item outcomes as a list of plain dictionaries"""
+        return [view.to_dict() for view in self]
@@ -1,8 +1,16 @@
-from jsonpointer import resolve_pointer
+from collections.abc import Iterator, Sequence
+from time import perf_counter
 
 from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.utils.instrumentation import call_untimed, get_active_memory_tracker, get_active_timings, resolve_pointer
 from rct229.utils.match_lists import match_lists
 
+def _is_list(context):
+    """Checks for a list context, including read-only sequences such as lazy
+    binary RMR arrays
+    """
+    return isinstance(context, Sequence) and not isinstance(context, str)
+
 class RuleDefinitionBase:
     """Baseclass for all Rule Definitions.
     """
@@ -68,6 +76,59 @@ class RuleDefinitionBase:
                     a list-type rule
             }
         """
+        return self._evaluate(rmrs, data, lazy = False)
+
+    def evaluate_lazily(self, rmrs, data = None):
+        """ Generates the outcome dictionary for the rule without evaluating
+        the items of a list-type rule up front
+
+        This follows the same workflow as evaluate(), except that the result
+        of a list-type rule is an iterator that evaluates each list item as
+        it is consumed, so item outcomes can be streamed instead of held in
+        memory.
+
+        This method should NOT be overridden.
+
+        Parameters
+        ----------
+        rmrs : RMR trio or a context trio
+        data : Any data object (optional). See evaluate().
+
+        Returns
+        -------
+        dict
+            The outcome dictionary described in evaluate(), except that the
+            result of a list-type rule is an iterator of item outcomes
+        """
+        return self._evaluate(rmrs, data, lazy = True)
+
+    def _evaluate(self, rmrs, data, lazy):
+        """Implements evaluate() and evaluate_lazily()"""
+        timings = get_active_timings()
+        # Memory is tracked per rule id, so nested rules count toward their parent
+        memory_tracker = get_active_memory_tracker() if self.id else None
+        if timings is None and memory_tracker is None:
+            return self._evaluate_stages(rmrs, data, lazy, call_untimed)
+        if memory_tracker is not None:
+            return memory_tracker.call('evaluate', self.id, self._evaluate_timed, rmrs, data, lazy, timings)
+
+        return self._evaluate_timed(rmrs, data, lazy, timings)
+
+    def _evaluate_timed(self, rmrs, data, lazy, timings):
+        """Runs _evaluate_stages() under the given Timings, if any"""
+        if timings is None:
+            return self._evaluate_stages(rmrs, data, lazy, call_untimed)
+
+        timings.enter_rule(self)
+        try:
+            return self._evaluate_stages(rmrs, data, lazy, timings.call)
+        finally:
+            timings.exit_rule()
+
+    def _evaluate_stages(self, rmrs, data, lazy, call):
+        """Runs the workflow of evaluate(), calling each stage through call
+        so that it can be timed
+        """
 
         # Initialize the outcome dictionary
         outcome = {}
@@ -79,19 +140,23 @@ class RuleDefinitionBase:
             outcome['rmr_context'] = self.rmr_context
 
         # context will be None if the context does not exist for any of the RMR used
-        context = self.get_context(rmrs, data)
+        context = call('get_context', self.get_context, rmrs, data)
         if context is not None:
 
             # Check if rule is applicable
-            if self.is_applicable(context, data):
+            if call('is_applicable', self.is_applicable, context, data):
 
                 # Determine if manual check is required
-                if self.manual_check_required(context, data):
+                if call('manual_check_required', self.manual_check_required, context, data):
                     outcome['result'] = 'MANUAL_CHECK_REQUIRED'
                 else:
                     # Evaluate the actual rule check
-                    result = self.rule_check(context, data)
-                    if isinstance(result, list):
+                    if lazy and isinstance(self, RuleDefinitionListBase):
+                        # The items are timed as they are consumed
+                        result = self.iter_rule_check(context, data)
+                    else:
+                        result = call('rule_check', self.rule_check, context, data)
+                    if isinstance(result, (list, Iterator)):
                         # The result is a list of outcomes
                         outcome['result'] = result
                     # Assume result type is bool
@@ -107,6 +172,22 @@ class RuleDefinitionBase:
 
         return outcome
 
+    def get_rmr_pointer(self):
+        """Returns rmr_context as a JSON pointer
+
+        Returns
+        -------
+        string
+            rmr_context with the leading '/' prepended as needed; the empty
+            string for the root of the RMR
+        """
+        # Prepend the leading '/' as needed. It is optional in rmr_context for
+        # improved readability
+        if self.rmr_context == '' or self.rmr_context.startswith('/'):
+            return self.rmr_context
+        else:
+            return '/' + self.rmr_context
+
     def _get_context(self, rmrs):
         """Get the context for each RMR
 
@@ -125,12 +206,7 @@ class RuleDefinitionBase:
             in self.rmrs_used is not set
         """
 
-        # Prepend the leading '/' as needed. It is optional in rmr_context for
-        # improved readability
-        if self.rmr_context == '' or self.rmr_context.startswith('/'):
-            pointer = self.rmr_context
-        else:
-            pointer = '/' + self.rmr_context
+        pointer = self.get_rmr_pointer()
 
         # Note: if there is no match for pointer, resolve_pointer returns None
         return UserBaselineProposedVals(
@@ -312,24 +388,74 @@ class RuleDefinitionListBase(RuleDefinitionBase):
             A list of rule outcomes. The each outcome in the list is augmented
             with a name field that is the name of the entry in the context list.
         """
+        return list(self.iter_rule_check(context, data))
+
+    def iter_rule_check(self, context, data = None):
+        """Generates the outcome for each entry in a list as it is evaluated
+
+        This is the iterator behind rule_check(). It should not be overridden.
+        Override create_context_list() instead.
+
+        Parameters
+        ----------
+        context : UserBaselineProposedVals
+            Object containing the contexts for the user, baseline, and proposed RMRs
+        data : An optional data object. It is ignored by this base implementation.
+
+        Yields
+        ------
+        dict
+            A rule outcome augmented with a name field that is the name of
+            the entry in the context list
+        """
         # Create the data to be passed to each_rule
-        data = self.create_data(context, data)
-        context_list = self.create_context_list(context, data)
-        outcomes = []
+        timings = get_active_timings()
+        if timings is None:
+            data = self.create_data(context, data)
+            context_list = self.create_context_list(context, data)
+        else:
+            # A lazy list is consumed after evaluate_lazily() has returned, so
+            # the rule is entered again
+            timings.enter_rule(self)
+            try:
+                data = timings.call('create_data', self.create_data, context, data)
+                context_list = timings.call('create_context_list', self.create_context_list, context, data)
+            finally:
+                timings.exit_rule()
 
         for ubp in context_list:
+            memory_tracker = get_active_memory_tracker() if self.id else None
+            if memory_tracker is None:
+                yield self._evaluate_item(ubp, data)
+            else:
+                yield memory_tracker.call('evaluate_item', self.id, self._evaluate_item, ubp, data)
+
+    def _evaluate_item(self, ubp, data):
+        """Evaluates each_rule for one context trio of the context list"""
+        timings = get_active_timings()
+        if timings is None:
             item_outcome = self.each_rule.evaluate(ubp, data)
+        else:
+            timings.enter_rule(self)
+            start = perf_counter()
+            try:
+                item_outcome = self.each_rule.evaluate(ubp, data)
+            finally:
+                item_seconds = perf_counter() - start
+                timings.exit_rule()
+
+        # Set the name for item_outcome
+        if ubp.user and ubp.user['name']:
+            item_outcome['name'] = ubp.user['name']
+        elif ubp.baseline and ubp.baseline['name']:
+            item_outcome['name'] = ubp.baseline['name']
+        elif ubp.proposed and ubp.proposed['name']:
+            item_outcome['name'] = ubp.proposed['name']
 
-            # Set the name for item_outcome
-            if ubp.user and ubp.user['name']:
-                item_outcome['name'] = ubp.user['name']
-            elif ubp.baseline and ubp.baseline['name']:
-                item_outcome['name'] = ubp.baseline['name']
-            elif ubp.proposed and ubp.proposed['name']:
-                item_outcome['name'] = ubp.proposed['name']
+        if timings is not None:
+            timings.record_item(self, item_outcome.get('name'), item_seconds)
 
-            outcomes.append(item_outcome)
-        return outcomes
+        return item_outcome
 
 
 class RuleDefinitionListIndexedBase(RuleDefinitionListBase):
@@ -381,9 +507,9 @@ class RuleDefinitionListIndexedBase(RuleDefinitionListBase):
 
         # This implementation assumes the used contexts are lists
         if (
-            (rmrs_used.user and not isinstance(context.user, list)) or
-            (rmrs_used.baseline and not isinstance(context.baseline, list)) or
-            (rmrs_used.proposed and not isinstance(context.proposed, list))):
+            (rmrs_used.user and not _is_list(context.user)) or
+            (rmrs_used.baseline and not _is_list(context.baseline)) or
+            (rmrs_used.proposed and not _is_list(context.proposed))):
             raise ValueError(CONTEXT_NOT_LIST)
 
         user_list = None
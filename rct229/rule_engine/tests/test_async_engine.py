@@ -0,0 +1,73 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from rct229.rule_engine.async_engine import evaluate_rules_async, evaluate_rules_async_iter
+from rct229.rule_engine.engine import evaluate_rules
+from rct229.rule_engine.rule_base import RuleDefinitionBase
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.rules.section15 import Section15Rule1, Section15Rule3
+
+test_rmrs = UserBaselineProposedVals(
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    {'transformers': [{'name': 'T1'}]}
+)
+
+class BlockingRule(RuleDefinitionBase):
+    """Signals started when it is evaluated, then waits for release"""
+    def __init__(self, id):
+        super(BlockingRule, self).__init__(id = id, rmrs_used = UserBaselineProposedVals(False, False, False))
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def rule_check(self, context, data = None):
+        self.started.set()
+        self.release.wait(5)
+        return True
+
+def test_evaluate_rules_async_matches_evaluate_rules():
+    rules_list = [Section15Rule1(), Section15Rule3()]
+    with ThreadPoolExecutor(max_workers = 1) as executor:
+        report = asyncio.run(evaluate_rules_async(rules_list, test_rmrs, executor = executor))
+    assert report == evaluate_rules(rules_list, test_rmrs)
+
+def test_evaluate_rules_async_iter_yields_each_outcome():
+    async def collect():
+        invalid_rmrs, outcomes = await evaluate_rules_async_iter([Section15Rule1(), Section15Rule3()], test_rmrs, summarised = True)
+        return invalid_rmrs, [outcome async for outcome in outcomes]
+
+    invalid_rmrs, outcomes = asyncio.run(collect())
+    assert invalid_rmrs == {}
+    assert outcomes[0]['result'] == 'PASSED'
+    assert outcomes[1]['result_counts'] == {'PASSED': 1, 'FAILED': 1}
+
+def test_evaluate_rules_async_iter_with_invalid_rmr():
+    async def collect():
+        rmrs = UserBaselineProposedVals({'transformers': 'none'}, {'transformers': []}, {'transformers': []})
+        invalid_rmrs, outcomes = await evaluate_rules_async_iter([Section15Rule1()], rmrs)
+        return invalid_rmrs, [outcome async for outcome in outcomes]
+
+    invalid_rmrs, outcomes = asyncio.run(collect())
+    assert 'User' in invalid_rmrs
+    assert outcomes == []
+
+def test_evaluate_rules_async_cancelled_between_rules():
+    first_rule = BlockingRule('1')
+    second_rule = BlockingRule('2')
+    second_rule.release.set()
+
+    async def cancel_during_first_rule():
+        task = asyncio.ensure_future(evaluate_rules_async([first_rule, second_rule], test_rmrs))
+        while not first_rule.started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        first_rule.release.set()
+        try:
+            await task
+        except asyncio.CancelledError:
+            return True
+        return False
+
+    assert asyncio.run(cancel_during_first_rule())
+    assert not second_rule.started.is_set()
@@ -1,10 +1,70 @@
 #from rct229.rule_engine.engine import get_available_rules
 import inspect
 import rct229.rules as rules
+from types import GeneratorType
+from rct229.reports.utils import aggregate_outcomes
+from rct229.rule_engine.engine import evaluate_rules, evaluate_rules_iter, summarise_outcome
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.rules.section15 import Section15Rule1, Section15Rule3
 
 # content of test_assert1.py
 def test_get_available_rules():
     # test to check the number of available rules
     available_rules = rules.__getrules__()
 
-    assert len(available_rules) == 6
\ No newline at end of file
+    assert len(available_rules) == 6
+
+test_rmrs = UserBaselineProposedVals(
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    {'transformers': [{'name': 'T1'}]}
+)
+
+def test_evaluate_rules_iter_streams_list_items():
+    invalid_rmrs, outcomes = evaluate_rules_iter([Section15Rule1(), Section15Rule3()], test_rmrs)
+    assert invalid_rmrs == {}
+    outcomes = list(outcomes)
+    assert outcomes[0]['result'] == 'PASSED'
+    assert isinstance(outcomes[1]['result'], GeneratorType)
+    assert list(outcomes[1]['result']) == [
+        {'result': 'PASSED', 'name': 'T1'},
+        {'result': 'FAILED', 'name': 'T2'}
+    ]
+
+def test_evaluate_rules_iter_matches_evaluate_rules():
+    rules_list = [Section15Rule1(), Section15Rule3()]
+    invalid_rmrs, outcomes = evaluate_rules_iter(rules_list, test_rmrs)
+    streamed = [
+        dict(outcome, result = outcome['result'] if isinstance(outcome['result'], str) else list(outcome['result']))
+        for outcome in outcomes
+    ]
+    assert streamed == evaluate_rules(rules_list, test_rmrs)['outcomes']
+
+def test_evaluate_rules_iter_with_invalid_rmr():
+    rmrs = UserBaselineProposedVals({'transformers': 'none'}, {'transformers': []}, {'transformers': []})
+    invalid_rmrs, outcomes = evaluate_rules_iter([Section15Rule1()], rmrs)
+    assert 'User' in invalid_rmrs
+    assert list(outcomes) == []
+
+def test_summarise_outcome_keeps_non_passing_items():
+    outcome = summarise_outcome({'id': '1', 'result': iter([
+        {'result': 'PASSED', 'name': 'T1'},
+        {'result': 'FAILED', 'name': 'T2'},
+        {'result': [{'result': 'PASSED', 'name': 'T3a'}, {'result': 'NA', 'name': 'T3b'}], 'name': 'T3'},
+        {'result': [{'result': 'PASSED', 'name': 'T4a'}], 'name': 'T4'}
+    ])})
+    assert outcome == {
+        'id': '1',
+        'result': [
+            {'result': 'FAILED', 'name': 'T2'},
+            {'result': [{'result': 'NA', 'name': 'T3b'}], 'name': 'T3', 'result_counts': {'PASSED': 1, 'NA': 1}}
+        ],
+        'result_counts': {'PASSED': 3, 'FAILED': 1, 'NA': 1}
+    }
+
+def test_evaluate_rules_summarised_aggregates_like_full_report():
+    rules_list = [Section15Rule1(), Section15Rule3()]
+    report = evaluate_rules(rules_list, test_rmrs, summarised = True)
+    assert report['outcomes'][1]['result'] == [{'result': 'FAILED', 'name': 'T2'}]
+    assert report['outcomes'][1]['result_counts'] == {'PASSED': 1, 'FAILED': 1}
+    assert aggregate_outcomes(report['outcomes']) == aggregate_outcomes(evaluate_rules(rules_list, test_rmrs)['outcomes'])
@@ -0,0 +1,78 @@
+import gzip
+import json
+import pytest
+
+from rct229.rule_engine.engine import get_all_rules, select_rules
+from rct229.rule_engine.evaluation_plan import estimate_cost, plan_evaluation
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.rules.section15 import Section15Rule1, Section15Rule3
+
+test_rmrs = UserBaselineProposedVals(
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}], 'schedules': []},
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    {'transformers': [{'name': 'T1'}]}
+)
+
+calibration = {'results': [
+    {'case': 'deserialize_rmr_file', 'units': 100, 'min_seconds': 1.0, 'peak_bytes': 1000},
+    {'case': 'deserialize_rmr_file', 'units': 10, 'min_seconds': 5.0, 'peak_bytes': 1000},
+    {'case': 'validate_rmr', 'units': 100, 'min_seconds': 2.0, 'peak_bytes': 0},
+    {'case': 'evaluate_all_rules', 'units': 100, 'min_seconds': 5.0, 'peak_bytes': 0}
+]}
+
+
+@pytest.fixture
+def rmr_paths(tmp_path):
+    paths = []
+    for name in ['user', 'baseline', 'proposed']:
+        path = str(tmp_path / f'{name}.json.gz')
+        with gzip.open(path, 'wt') as f:
+            json.dump(getattr(test_rmrs, name), f)
+        paths.append(path)
+
+    return UserBaselineProposedVals(*paths)
+
+def test__select_rules():
+    rules_list = [Section15Rule1(), Section15Rule3()]
+    assert select_rules(rules_list, ['15-3']) == rules_list[1:]
+    with pytest.raises(ValueError):
+        select_rules(rules_list, ['15-3', '99-1'])
+
+def test__plan_evaluation(rmr_paths):
+    plan = plan_evaluation([Section15Rule1(), Section15Rule3()], rmr_paths)
+    assert [(rule['id'], rule['rmrs_used'], rule['list_rule']) for rule in plan['rules']] == [
+        ('15-1', ['user', 'baseline'], False),
+        ('15-3', ['user', 'proposed'], True)
+    ]
+    assert plan['rmrs']['user']['pointers'] == ['/transformers']
+    assert plan['rmrs']['user']['bytes'] == len(json.dumps(test_rmrs.user))
+    assert plan['contexts'] == [
+        {'rmr_context': '/transformers', 'sizes': {'user': 2, 'baseline': 2, 'proposed': 1}}
+    ]
+
+def test__plan_evaluation__skips_unused_rmrs(rmr_paths):
+    plan = plan_evaluation([Section15Rule1()], rmr_paths)
+    assert list(plan['rmrs']) == ['user', 'baseline']
+
+def test__estimate_cost(rmr_paths):
+    plan = plan_evaluation([Section15Rule1(), Section15Rule3()], rmr_paths)
+    rmr_bytes = sum(rmr['bytes'] for rmr in plan['rmrs'].values())
+    estimate = estimate_cost(plan, calibration)
+    # Rates come from the largest model of each case
+    assert estimate['load_seconds'] == pytest.approx(rmr_bytes / 100)
+    assert estimate['validate_seconds'] == pytest.approx(rmr_bytes * 2 / 100)
+    # All rules take (5 - 2) / 100 s per byte of the trio, shared by the
+    # RMRs each reads
+    rmrs_read = sum(len([name for name in ['user', 'baseline', 'proposed'] if getattr(rule.rmrs_used, name)]) for rule in get_all_rules())
+    rule_rate = 0.03 * 3 / rmrs_read
+    assert estimate['rules'] == {
+        '15-1': pytest.approx(rule_rate * (plan['rmrs']['user']['bytes'] + plan['rmrs']['baseline']['bytes'])),
+        '15-3': pytest.approx(rule_rate * (plan['rmrs']['user']['bytes'] + plan['rmrs']['proposed']['bytes']))
+    }
+    assert estimate['total_seconds'] == pytest.approx(rmr_bytes * 3 / 100 + estimate['rules_seconds'])
+    assert estimate['peak_bytes'] == rmr_bytes * 10
+
+def test__estimate_cost__missing_case(rmr_paths):
+    plan = plan_evaluation([Section15Rule1()], rmr_paths)
+    with pytest.raises(ValueError):
+        estimate_cost(plan, {'results': calibration['results'][:2]})
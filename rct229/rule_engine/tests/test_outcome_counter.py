@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+from rct229.reports.utils import aggregate_outcomes
+from rct229.rule_engine.engine import evaluate_rules, evaluate_rules_iter
+from rct229.rule_engine.outcome_counter import get_rule_section, OutcomeCounter
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.rules.section15 import Section15Rule1, Section15Rule3
+
+test_rmrs = UserBaselineProposedVals(
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    {'transformers': [{'name': 'T1'}]}
+)
+
+def test__get_rule_section():
+    assert get_rule_section('15-3') == '15'
+    assert get_rule_section(None) is None
+
+def test__outcome_counter__counts_lazy_items_as_consumed():
+    counter = OutcomeCounter()
+    outcome = counter.track({'id': '15-3', 'result': iter([{'result': 'PASSED'}, {'result': 'FAILED'}])})
+    assert counter.totals['number_evaluations'] == 0
+    next(outcome['result'])
+    assert counter.totals['number_passed'] == 1
+    next(outcome['result'])
+    assert counter.by_rule['15-3']['number_failed'] == 1
+    assert counter.by_section['15']['number_evaluations'] == 2
+
+def test__outcome_counter__to_dict_while_counting_from_another_thread():
+    counter = OutcomeCounter()
+    done = threading.Event()
+
+    def count_new_rules():
+        for index in range(20000):
+            counter.count(f'{index % 500}-{index}', 'PASSED')
+        done.set()
+
+    thread = threading.Thread(target = count_new_rules)
+    thread.start()
+    while not done.is_set():
+        summary = counter.to_dict()
+        assert summary['number_evaluations'] == sum(counts['number_evaluations'] for counts in summary['by_rule'].values())
+    thread.join()
+    assert counter.to_dict()['number_evaluations'] == 20000
+
+def test__outcome_counter__unknown_result():
+    with pytest.raises(ValueError):
+        OutcomeCounter().track({'id': '1', 'result': 'MAYBE'})
+
+@pytest.mark.parametrize('columnar,summarised', [(False, False), (True, False), (False, True)])
+def test__evaluate_rules__summary_matches_aggregate_outcomes(columnar, summarised):
+    rules_list = [Section15Rule1(), Section15Rule3()]
+    summary = evaluate_rules(rules_list, test_rmrs, columnar = columnar, summarised = summarised)['summary']
+    outcomes = evaluate_rules(rules_list, test_rmrs)['outcomes']
+    assert {key: value for key, value in summary.items() if key.startswith('number_')} == aggregate_outcomes(outcomes)
+    assert summary['by_rule']['15-3'] == aggregate_outcomes(outcomes[1:])
+    assert summary['by_section']['15']['number_evaluations'] == 3
+
+def test__evaluate_rules_iter__counter():
+    counter = OutcomeCounter()
+    invalid_rmrs, outcomes = evaluate_rules_iter([Section15Rule1(), Section15Rule3()], test_rmrs, counter = counter)
+    for outcome in outcomes:
+        if not isinstance(outcome['result'], str):
+            list(outcome['result'])
+    assert counter.rules_evaluated == 2
+    assert counter.totals['number_evaluations'] == 3
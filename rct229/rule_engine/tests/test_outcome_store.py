@@ -0,0 +1,65 @@
+import json
+import pytest
+
+from rct229.reports.project_report import write_json_report
+from rct229.reports.utils import aggregate_outcomes
+from rct229.rule_engine.engine import evaluate_rules
+from rct229.rule_engine.outcome_store import OutcomeStore, ResultCode
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.rules.section15 import Section15Rule1, Section15Rule3
+
+test_rmrs = UserBaselineProposedVals(
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    {'transformers': [{'name': 'T1'}]}
+)
+
+test_outcomes = [
+    {'id': '1', 'description': 'A rule', 'rmr_context': 'transformers', 'result': 'PASSED'},
+    {'id': '2', 'result': [
+        {'result': 'FAILED', 'name': 'T1'},
+        {'result': [{'result': 'NA', 'name': 'T1a'}], 'name': 'T2'},
+        {'result': 'MANUAL_CHECK_REQUIRED', 'name': 'T1'}
+    ]},
+    {'id': '3', 'result': 'MISSING_CONTEXT'}
+]
+
+def _store(outcomes):
+    store = OutcomeStore()
+    for outcome in outcomes:
+        store.add_outcome(outcome)
+    return store
+
+def test__outcome_store__views_match_outcomes():
+    store = _store(test_outcomes)
+    assert len(store) == 3
+    assert list(store) == test_outcomes
+    assert store[1]['result'][1]['result'][0]['name'] == 'T1a'
+    assert store.to_list() == test_outcomes
+
+def test__outcome_store__interns_names():
+    store = _store(test_outcomes)
+    assert len(store._names) == 3
+    assert list(store.result_code) == [
+        ResultCode.PASSED, ResultCode.LIST, ResultCode.FAILED, ResultCode.LIST,
+        ResultCode.NA, ResultCode.MANUAL_CHECK_REQUIRED, ResultCode.MISSING_CONTEXT
+    ]
+
+def test__outcome_store__summary_matches_aggregate_outcomes():
+    assert aggregate_outcomes(_store(test_outcomes)) == aggregate_outcomes(test_outcomes)
+
+def test__outcome_store__unknown_result():
+    with pytest.raises(ValueError):
+        _store([{'id': '1', 'result': 'MAYBE'}])
+
+def test__evaluate_rules__columnar_matches_lists():
+    rules_list = [Section15Rule1(), Section15Rule3()]
+    report = evaluate_rules(rules_list, test_rmrs, columnar = True)
+    assert isinstance(report['outcomes'], OutcomeStore)
+    assert list(report['outcomes']) == evaluate_rules(rules_list, test_rmrs)['outcomes']
+
+def test__write_json_report__outcome_store(tmp_path):
+    path = str(tmp_path / 'report.json')
+    write_json_report({'invalid_rmrs': {}, 'outcomes': _store(test_outcomes)}, path)
+    with open(path) as f:
+        assert json.load(f)['outcomes'] == test_outcomes
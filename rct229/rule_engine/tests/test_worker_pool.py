@@ -0,0 +1,46 @@
+import json
+import os
+
+from rct229.rule_engine.engine import evaluate_rules, get_all_rules
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.rule_engine.worker_pool import evaluate_rmr_files, get_warm_state, WarmWorkerPool
+from rct229.utils.rmr_generator import write_rmr_trio
+
+def _create_state(value):
+    return {'value': value, 'pid': os.getpid()}
+
+def _read_state(_):
+    return get_warm_state(), os.getpid()
+
+def test_worker_pool_shares_warm_state():
+    with WarmWorkerPool(2, initializer = _create_state, initargs = ('warm',)) as pool:
+        results = pool.map(_read_state, range(4))
+        metrics = pool.metrics()
+    for state, pid in results:
+        assert state['value'] == 'warm'
+        if metrics['start_method'] == 'fork':
+            # Created once in this process, not in the worker
+            assert state['pid'] == os.getpid()
+            assert pid != os.getpid()
+    assert metrics['tasks'] == 4
+    assert metrics['startup_seconds'] >= metrics['warm_seconds']
+    assert metrics['mean_task_overhead_seconds'] >= 0
+
+def test_worker_pool_recycles_workers():
+    with WarmWorkerPool(1, max_tasks_per_worker = 2, initializer = _create_state, initargs = (None,)) as pool:
+        pids = set(pid for _, pid in pool.map(_read_state, range(4)))
+        metrics = pool.metrics()
+    assert len(pids) == 2
+    assert metrics['workers_started'] == 2
+
+def test_evaluate_rmr_files_matches_evaluate_rules(tmp_path):
+    paths = write_rmr_trio(str(tmp_path), {'zones': 1, 'transformers': 2, 'schedules': 0})
+    rmrs = []
+    for path in paths:
+        with open(path) as f:
+            rmrs.append(json.load(f))
+
+    with WarmWorkerPool(1) as pool:
+        report = pool.submit(evaluate_rmr_files, paths).result()
+    assert report['invalid_rmrs'] == {}
+    assert report == evaluate_rules(get_all_rules(), UserBaselineProposedVals(*rmrs))
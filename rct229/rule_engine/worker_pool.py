@@ -0,0 +1,218 @@
+from concurrent.futures import Future
+import multiprocessing
+import os
+import threading
+from time import perf_counter
+
+from rct229.rule_engine.engine import evaluate_rules, warm_up
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.utils.file import deserialize_rmr_file
+
+# Workers are replaced after this many tasks, bounding their memory growth
+DEFAULT_MAX_TASKS_PER_WORKER = 100
+
+# The process-wide state returned by the pool initializer, see get_warm_state()
+_warmed = False
+_warm_state = None
+
+# The seconds this worker spent creating the warm state; near zero when the
+# state was inherited from the parent
+_worker_init_seconds = 0.0
+
+
+def get_warm_state():
+    """Returns what the initializer of the pool running this process
+    returned, e.g. the rule instances created by warm_up()
+    """
+    return _warm_state
+
+
+def _warm(initializer, initargs):
+    global _warmed, _warm_state
+    _warm_state = initializer(*initargs)
+    _warmed = True
+
+
+def _init_worker(initializer, initargs):
+    global _worker_init_seconds
+    start = perf_counter()
+    # Forked workers inherit the state created by the parent
+    if not _warmed:
+        _warm(initializer, initargs)
+    _worker_init_seconds = perf_counter() - start
+
+
+def _run_task(func, args):
+    start = perf_counter()
+    result = func(*args)
+
+    return os.getpid(), _worker_init_seconds, perf_counter() - start, result
+
+
+class WarmWorkerPool:
+    """A pool of worker processes that start with the process-wide state
+    already created
+
+    The initializer runs once in this process, before any worker starts,
+    and the workers are forked from it so they inherit its result along
+    with the schema validator, enumerations, and data tables it loaded.
+    Where fork is unavailable the workers are spawned and each runs the
+    initializer itself. Workers are replaced after max_tasks_per_worker
+    tasks.
+
+    Parameters
+    ----------
+    workers : int
+        The number of worker processes; one per CPU by default
+    max_tasks_per_worker : int
+        The number of tasks after which a worker is replaced; None to keep
+        workers for the life of the pool
+    initializer : callable
+        Creates the process-wide state; its result is available to tasks
+        through get_warm_state(). Defaults to warm_up(), whose result is
+        the rule instances.
+    initargs : tuple
+        Arguments of the initializer
+    """
+
+    def __init__(self, workers = None, max_tasks_per_worker = DEFAULT_MAX_TASKS_PER_WORKER, initializer = warm_up, initargs = ()):
+        start = perf_counter()
+        _warm(initializer, initargs)
+        self.warm_seconds = perf_counter() - start
+
+        start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.workers = workers or os.cpu_count() or 1
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._pool = multiprocessing.get_context(start_method).Pool(
+            self.workers,
+            initializer = _init_worker,
+            initargs = (initializer, initargs),
+            maxtasksperchild = max_tasks_per_worker
+        )
+        self.start_method = start_method
+        self.startup_seconds = perf_counter() - start
+
+        self._lock = threading.Lock()
+        self._tasks = 0
+        self._task_seconds = 0.0
+        self._overhead_seconds = 0.0
+        self._worker_init_seconds = {}
+
+    def _record(self, pid, init_seconds, task_seconds, round_trip_seconds):
+        with self._lock:
+            self._tasks += 1
+            self._task_seconds += task_seconds
+            self._overhead_seconds += round_trip_seconds - task_seconds
+            self._worker_init_seconds[pid] = init_seconds
+
+    def submit(self, func, *args):
+        """Runs func(*args) in a worker
+
+        func and its arguments and result must be picklable, so func must
+        be a module-level function.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            The future result of the call
+        """
+        future = Future()
+        submitted = perf_counter()
+
+        def done(value):
+            pid, init_seconds, task_seconds, result = value
+            self._record(pid, init_seconds, task_seconds, perf_counter() - submitted)
+            future.set_result(result)
+
+        self._pool.apply_async(_run_task, (func, args), callback = done, error_callback = future.set_exception)
+
+        return future
+
+    def map(self, func, iterable):
+        """Runs func on each item in the workers, returning the results in order"""
+        futures = [self.submit(func, item) for item in iterable]
+
+        return [future.result() for future in futures]
+
+    def metrics(self):
+        """Returns measurements of the pool
+
+        Returns
+        -------
+        dict
+            {
+                start_method: string - 'fork' or 'spawn'
+                workers: int - The number of worker processes
+                max_tasks_per_worker: int - See WarmWorkerPool
+                warm_seconds: float - The time the initializer took in this process
+                startup_seconds: float - The time to create the pool,
+                    including warm_seconds
+                workers_started: int - The workers that have run a task,
+                    including those started to replace recycled workers
+                mean_worker_init_seconds: float - The mean time those
+                    workers took to initialize
+                tasks: int - The tasks completed
+                task_seconds: float - Their total time in the workers
+                mean_task_overhead_seconds: float - The mean time per task
+                    spent outside the task: pickling, transfer, and waiting
+                    for a free worker when all are busy
+            }
+        """
+        with self._lock:
+            init_seconds = list(self._worker_init_seconds.values())
+            return {
+                'start_method': self.start_method,
+                'workers': self.workers,
+                'max_tasks_per_worker': self.max_tasks_per_worker,
+                'warm_seconds': self.warm_seconds,
+                'startup_seconds': self.startup_seconds,
+                'workers_started': len(init_seconds),
+                'mean_worker_init_seconds': sum(init_seconds) / len(init_seconds) if init_seconds else None,
+                'tasks': self._tasks,
+                'task_seconds': self._task_seconds,
+                'mean_task_overhead_seconds': self._overhead_seconds / self._tasks if self._tasks else None
+            }
+
+    def close(self):
+        """Waits for the submitted tasks, then stops the workers"""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._pool.terminate()
+            self._pool.join()
+
+
+def evaluate_rmr_files(rmr_paths, summarised = False):
+    """Evaluates the rules created by warm_up() against an RMR trio loaded
+    from files; a task for a WarmWorkerPool with the default initializer
+
+    Parameters
+    ----------
+    rmr_paths : list of string
+        The paths of the user, baseline, and proposed RMR files; None for
+        an RMR that is not given
+    summarised : bool
+        If True, the outcome of each list-type rule keeps only per-result
+        counts and its non-passing items
+
+    Returns
+    -------
+    dict
+        The report described in evaluate_rules()
+    """
+    rmrs = []
+    for path in rmr_paths:
+        if path is None:
+            rmrs.append(None)
+            continue
+        with open(path, 'rb') as f:
+            rmrs.append(deserialize_rmr_file(f))
+
+    return evaluate_rules(get_warm_state(), UserBaselineProposedVals(*rmrs), summarised = summarised)
@@ -1,8 +1,64 @@
 import json
 import os
-from rct229.rules.section15 import *
+import rct229.rules as rules
 from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
 from rct229.rule_engine.engine import evaluate_rule
+from rct229.utils.json_patch import apply_patch
+from rct229.utils.structural_sharing import SubtreeInterner
+
+# Directory holding the ruletest JSONs
+RULETEST_JSONS_DIR = os.path.join(os.path.dirname(__file__), 'ruletest_jsons')
+
+# Directory holding the RMR templates that test cases patch
+RULETEST_TEMPLATES_DIR = os.path.join(RULETEST_JSONS_DIR, 'templates')
+
+# RMR templates by name; loaded on first use
+_rmr_templates = {}
+
+# Rule definition classes by class name, e.g. Section15Rule1; loaded on first use
+_rule_definitions = None
+
+
+def get_rule_definitions():
+    """Returns the available rule definition classes by class name
+
+    The rule modules are imported on the first call only; later calls, and
+    processes forked after it, reuse the classes.
+    """
+    global _rule_definitions
+    if _rule_definitions is None:
+        _rule_definitions = dict(rules.__getrules__())
+
+    return _rule_definitions
+
+
+def load_rmr_template(template):
+    """Returns a shared, immutable RMR template
+
+    Templates named by a string are loaded from RULETEST_TEMPLATES_DIR once
+    per process and reused by every test case naming them.
+
+    Parameters
+    ----------
+    template : str or dict
+
+        The name of a template JSON in RULETEST_TEMPLATES_DIR, with or without its .json extension, or the template
+        RMR itself
+
+    Returns
+    -------
+    dict : The template RMR; a named template is made of FrozenDict and FrozenList objects, so that no test case
+        can modify it
+    """
+    if not isinstance(template, str):
+        return template
+
+    name = template[:-len('.json')] if template.endswith('.json') else template
+    if name not in _rmr_templates:
+        with open(os.path.join(RULETEST_TEMPLATES_DIR, name + '.json')) as f:
+            _rmr_templates[name] = json.load(f, object_pairs_hook = SubtreeInterner().object_pairs_hook)
+
+    return _rmr_templates[name]
 
 
 # Generates the RMR triplet dictionaries from a test_dictionary's "rmr_transformation" element.
@@ -10,6 +66,11 @@ from rct229.rule_engine.engine import evaluate_rule
 def generate_test_rmrs(test_dict):
     """Generates the RMR triplet dictionaries from a test_dictionary's "rmr_transformation" element.
 
+    Without an 'rmr_template', each RMR is given in full by 'rmr_transformations'. With an 'rmr_template', each RMR
+    in 'rmr_transformations' is a JSON patch (a list of operations such as
+    {"op": "replace", "path": "/transformers/0/name", "value": "T1"}) applied to the template. The patch is applied
+    as a copy-on-write overlay, so the RMR shares everything the patch does not change with the template.
+
     Parameters
     ----------
     test_dict : dict
@@ -25,7 +86,8 @@ def generate_test_rmrs(test_dict):
         - baseline_rmr (dictionary): Baseline RMR dictionary built from RMR Transformation definition
         - proposed_rmr (dictionary): Proposed RMR dictionary built from RMR Transformation definition
 
-        Returns the three RMR triplets. Order is user, baseline, proposed
+        Returns the three RMR triplets. Order is user, baseline, proposed. An RMR missing from
+        'rmr_transformations' is None.
     """
 
     # Read in transformations dictionary. This dictates how RMRs are built.
@@ -34,10 +96,13 @@ def generate_test_rmrs(test_dict):
     # If RMRs are based on a template
     if 'rmr_template' in test_dict:
 
-        template = test_dict['rmr_template']
+        template = load_rmr_template(test_dict['rmr_template'])
 
-        # TODO figure out how to handle templates, none needed yet
-        return None, None, None
+        # Overlay each RMR's patch on the shared template
+        return tuple(
+            apply_patch(template, rmr_transformations_dict[rmr]) if rmr in rmr_transformations_dict else None
+            for rmr in ['user', 'baseline', 'proposed']
+        )
 
     else:
 
@@ -139,109 +204,122 @@ def process_test_result(test_result, test_dict, test_id):
 
     return outcome_text, received_expected_outcome
 
-def run_section_tests(test_json_name):
-    """Runs all tests found in a given test JSON and prints results to console. Returns true/false describing whether
-    or not all tests in the JSON result in the expected outcome.
+def run_test_case(test_id, test_dict):
+    """Runs a single test case
 
     Parameters
     ----------
-    test_json_name : string
+    test_id : str
+
+        String describing the test's section, rule, and test case ID (e.g. rule-15-1a)
 
-        Name of test JSON in 'test_jsons' directory. (e.g., transformer_tests.json)
+    test_dict : dict
+
+        Python dictionary describing the test, as found in a test JSON
 
     Returns
     -------
-    all_tests_successful : bool
+    tuple : a tuple containing:
+        - outcome_texts (list of str): Strings describing the outcome of the test
+        - received_expected_outcome (bool): Boolean describing if the test resulted in the expected outcome
 
-        Boolean describing if all tests in the JSON result in the expected outcome.
+    Raises
+    ------
+    NotImplementedError
+        If the rule under test does not exist
     """
+    RULE_NOT_IMPLEMENTED_MSG = 'is not implemented'
 
-    # Create path to test JSON (e.g. 'transformer_tests.json')
-    test_json_path = os.path.join('ruletest_jsons', test_json_name)
+    # Generate RMR dictionaries for testing
+    user_rmr, baseline_rmr, proposed_rmr = generate_test_rmrs(test_dict)
+    rmr_trio = UserBaselineProposedVals(user_rmr, baseline_rmr, proposed_rmr)
 
-    title_text = f'TESTS RESULTS FOR: {test_json_name}'.center(50)
-    test_result_strings = ['-----------------------------------------------------------------------------------------',
-                           f'--------------------{title_text}-------------------',
-                           '-----------------------------------------------------------------------------------------',
-                           '']
+    # Identify Section and rule
+    section = test_dict['Section']
+    rule = test_dict['Rule']
 
-    # List capturing all outcomes of the test_json being passed in
-    test_results = []
+    # Construction function name for Section and rule
+    function_name = f'Section{section}Rule{rule}'
 
-    # Open
-    with open(test_json_path) as f:
-        test_list_dictionary = json.load(f)
+    # Pull in rule
+    rule_definitions = get_rule_definitions()
+    if function_name not in rule_definitions:
+        raise NotImplementedError(f'{function_name} {RULE_NOT_IMPLEMENTED_MSG}')
+    rule = rule_definitions[function_name]()
 
-    # Cycle through tests in test JSON and run each individually
-    for test_id in test_list_dictionary:
+    # Evaluate rule and check for invalid RMRs
+    evaluation_dict = evaluate_rule(rule, rmr_trio)
+    invalid_rmrs_dict = evaluation_dict['invalid_rmrs']
 
-        # Load next test dictionary from test list
-        test_dict = test_list_dictionary[test_id]
+    # If invalid RMRs exist, fail this rule and return failed messages
+    if len(invalid_rmrs_dict)!= 0:
 
-        # Generate RMR dictionaries for testing
-        user_rmr, baseline_rmr, proposed_rmr = generate_test_rmrs(test_dict)
-        rmr_trio = UserBaselineProposedVals(user_rmr, baseline_rmr, proposed_rmr)
+        # Find which RMRs were invalid
+        outcome_texts = [
+            f'INVALID SCHEMA: Test {test_id}: {invalid_rmr} RMR: {invalid_rmr_message}'
+            for invalid_rmr, invalid_rmr_message in invalid_rmrs_dict.items()
+        ]
 
-        # Identify Section and rule
-        section = test_dict['Section']
-        rule = test_dict['Rule']
+        return outcome_texts, False
 
-        # Construction function name for Section and rule
-        function_name = f'Section{section}Rule{rule}'
+    outcome_result = evaluation_dict['outcomes'][0]['result']
 
-        # Pull in rule
-        rule = globals()[function_name]()
+    # If outcome result is a list of results (i.e. many elements get tested), check each against expected result
+    if isinstance(outcome_result, list):
 
-        # Evaluate rule and check for invalid RMRs
-        evaluation_dict = evaluate_rule(rule, rmr_trio)
-        invalid_rmrs_dict = evaluation_dict['invalid_rmrs']
+        # Checks that ALL tests pass in the list. If any fail, the test fails
+        test_result = all(evaluate_outcome(outcome['result']) for outcome in outcome_result)
 
-        # If invalid RMRs exist, fail this rule and append failed message
-        if len(invalid_rmrs_dict)!= 0:
+    # If a single result, check the result
+    else:
 
-            # Find which RMRs were invalid and add them to test_result_strings
-            for invalid_rmr, invalid_rmr_message in invalid_rmrs_dict.items():
+        test_result = evaluate_outcome(outcome_result)
 
-                outcome_text = f'INVALID SCHEMA: Test {test_id}: {invalid_rmr} RMR: {invalid_rmr_message}'
-                test_result_strings.append(outcome_text)
+    # Write outcome text based on overall pass/fail and determine if the ruletest behaved as expected
+    outcome_text, received_expected_outcome = process_test_result(test_result, test_dict, test_id)
 
-            # Append failed message to rule
-            test_results.append(False)
+    return [outcome_text], received_expected_outcome
 
-        # If RMRs are valid, check their outcomes
-        else:
+def run_section_tests(test_json_name):
+    """Runs all tests found in a given test JSON and prints results to console. Returns true/false describing whether
+    or not all tests in the JSON result in the expected outcome.
+
+    Parameters
+    ----------
+    test_json_name : string
 
-            outcome_result = evaluation_dict['outcomes'][0]['result']
+        Name of test JSON in 'ruletest_jsons' directory. (e.g., transformer_tests.json)
 
-            # If outcome result is a list of results (i.e. many elements get tested), check each against expected result
-            if isinstance(outcome_result, list):
+    Returns
+    -------
+    all_tests_successful : bool
 
-                # Create list for collecting results of every test in list
-                test_results = []
+        Boolean describing if all tests in the JSON result in the expected outcome.
+    """
 
-                # Iterate through each outcome in outcome results
-                for outcome in outcome_result:
-                    # Append test result for this outcome
-                    test_results.append(evaluate_outcome(outcome['result']))
+    # Create path to test JSON (e.g. 'transformer_tests.json')
+    test_json_path = os.path.join(RULETEST_JSONS_DIR, test_json_name)
 
-                # Checks that ALL tests pass in test_results. If any fail, the test fails
-                test_result = all(result for result in test_results)
+    title_text = f'TESTS RESULTS FOR: {test_json_name}'.center(50)
+    test_result_strings = ['-----------------------------------------------------------------------------------------',
+                           f'--------------------{title_text}-------------------',
+                           '-----------------------------------------------------------------------------------------',
+                           '']
 
-                # Write outcome text based on overall pass/fail string based on set of test and determine if the ruletest
-                # behaved as expected
-                outcome_text, received_expected_outcome = process_test_result(test_result, test_dict, test_id)
+    # List capturing all outcomes of the test_json being passed in
+    test_results = []
 
-                # Append results
-                test_result_strings.append(outcome_text)
-                test_results.append(received_expected_outcome)
+    # Open
+    with open(test_json_path) as f:
+        test_list_dictionary = json.load(f)
 
-            # If a single result, check the result
-            else:
+    # Cycle through tests in test JSON and run each individually
+    for test_id in test_list_dictionary:
 
-                test_result = evaluate_outcome(outcome_result)
-                outcome_text, received_expected_outcome = process_test_result(test_result, test_dict, test_id)
-                test_result_strings.append(outcome_text)
-                test_results.append(received_expected_outcome)
+        # Load next test dictionary from test list and run it
+        outcome_texts, received_expected_outcome = run_test_case(test_id, test_list_dictionary[test_id])
+        test_result_strings.extend(outcome_texts)
+        test_results.append(received_expected_outcome)
 
 
     # Print results to console
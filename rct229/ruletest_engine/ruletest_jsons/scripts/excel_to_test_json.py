@@ -1,106 +1,283 @@
-import pandas as pd
+import argparse
+import glob
+import hashlib
 import json
-import math
 import os
 
+import pandas as pd
+
 from rct229.ruletest_engine.ruletest_jsons.scripts.json_generation_utilities import *
 
 
-#---------------------------------------USER INPUTS---------------------------------------
+file_dir = os.path.dirname(__file__)
 
-spreadsheet_name = 'transformer_tests_draft.xlsx'
-json_name = 'transformer_tests.json'
-sheet_name = 'TCDs'
+# Directory of the test spreadsheets and of the test JSONs generated from them
+SPREADSHEETS_DIR = os.path.join(file_dir, '..', 'ruletest_spreadsheets')
+JSONS_DIR = os.path.join(file_dir, '..')
 
-#--------------------------------------SCRIPT STARTS--------------------------------------
+# Hashes of the spreadsheets and sheets converted by earlier runs, used to skip unchanged ones
+CACHE_FILE_PATH = os.path.join(SPREADSHEETS_DIR, '.conversion_cache.json')
 
-file_dir = os.path.dirname(__file__)
+# Spreadsheet name suffix dropped from the test JSON name (e.g. transformer_tests_draft.xlsx -> transformer_tests.json)
+DRAFT_SUFFIX = '_draft'
 
-# Define test spreadsheet path
-spreadsheet_dir = 'ruletest_spreadsheets'
-spreadsheet_path = os.path.join(file_dir, '..', spreadsheet_dir, spreadsheet_name)
 
-# Define output json file path
-json_file_path =  os.path.join(file_dir, '..', json_name)
+def file_hash(path):
+    """ Returns the SHA-256 hex digest of a file's contents """
 
-# Pull out TCDs from spreadsheet
-master_df = pd.read_excel(spreadsheet_path, sheet_name= sheet_name)
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha.update(chunk)
 
-# Get headers to begin separating dictionary 'keys' from 'values'
-headers = master_df.columns
+    return sha.hexdigest()
 
-# Initialize the key headers
-keys = []
 
-# If header has substring 'key', consider it a key
-for header in headers:
-    if 'key' in header:
-        keys.append(header)
+def sheet_hash(sheet_df):
+    """ Returns the SHA-256 hex digest of a sheet's headers and cell values """
 
-# Copy columns from the spreadsheet that correspond to keys
-keys_df = master_df[keys].copy()
+    content = [list(map(str, sheet_df.columns))] + sheet_df.astype(str).values.tolist()
 
-# Get value columns (i.e. not key columns) from spreadsheet
-rules_df = master_df.drop(keys, axis=1)
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
 
-# Initiailize dictionary for JSON
-json_dict = {}
 
+def json_name_for(spreadsheet_path):
+    """ Returns the test JSON name for a spreadsheet (e.g. transformer_tests_draft.xlsx -> transformer_tests.json) """
 
-# Iterate column by column through values_df
-for (rule_name, columnData) in rules_df.iteritems():
+    stem = os.path.splitext(os.path.basename(spreadsheet_path))[0]
+    if stem.endswith(DRAFT_SUFFIX):
+        stem = stem[:-len(DRAFT_SUFFIX)]
 
-    # List of this rule's column data
-    rule_value_list = columnData.values
+    return stem + '.json'
 
-    # If rule doesnt exist in dictionary
-    if rule_name not in json_dict:
 
-        # Iterate through both keys and rule values
-        for row_i in range(rule_value_list.size):
+def get_key_headers(sheet_df):
+    """ Returns the headers of a sheet's key columns, i.e. those with substring 'key' """
 
-            # row_value is the value set to the JSON path generated by the key list
-            row_value = rule_value_list[row_i]
+    return [header for header in sheet_df.columns if isinstance(header, str) and 'key' in header]
 
-            # Skip empty rows
-            if not isinstance(row_value, str):
-                if math.isnan(row_value):
-                    continue
 
-            # Initialize this row's list of keys (e.g. ['rule-15-1a', 'rmr_transformations', 'user', 'transformer'])
-            key_list = [rule_name]
+def build_key_lists(keys_df):
+    """ Returns the list of keys of each row, with JSON_PATH shorthand expanded
+    (e.g. ['rmr_transformations', 'user', 'buildings', 'building_segments', ..., 'spaces', 'floor_area'])
+
+    Parameters
+    ----------
+    keys_df : DataFrame
+        The key columns of a sheet
+
+    Returns
+    -------
+    key_lists: list
+
+        A list of keys for each row of the sheet
+    """
+
+    key_lists = []
+    for row in keys_df.itertuples(index=False):
+        key_list = []
+        for key_value in row:
+            if isinstance(key_value, str):
+
+                # If the key includes a JSON_PATH, inject elements based on the shorthand JSON_PATH enumeration
+                # (e.g., JSON_PATH:spaces = ["buildings","building_segments","thermal_blocks","zones","spaces"])
+                if 'JSON_PATH' in key_value:
+                    inject_json_path_from_enumeration(key_list, key_value)
+                else:
+                    key_list.append(key_value)
+
+        key_lists.append(key_list)
+
+    return key_lists
+
+
+def clean_column(column_data):
+    """ Returns the cleaned values of a rule column as Python objects, with None for empty cells.
+    Numeric columns are converted in bulk; only the cells of other columns are cleaned one by one.
+
+    Parameters
+    ----------
+    column_data : Series
+        A rule's column of a sheet
+
+    Returns
+    -------
+    values: list
+
+        The cleaned value of each row, or None for an empty row
+    """
+
+    empty = column_data.isna().tolist()
+
+    if pd.api.types.is_bool_dtype(column_data):
+        values = column_data.tolist()
+    elif pd.api.types.is_integer_dtype(column_data):
+        values = column_data.astype('int64').tolist()
+    elif pd.api.types.is_float_dtype(column_data):
+        # Empty cells are filled only so that every value is a number; they are dropped below
+        values = [int(value) if value.is_integer() else value for value in column_data.fillna(0).tolist()]
+    else:
+        values = [clean_value(value) for value in column_data.tolist()]
+
+    return [None if is_empty else value for value, is_empty in zip(values, empty)]
+
+
+def convert_sheet(sheet_df, json_dict):
+    """ Adds the test cases described by a sheet of test case descriptions to a test JSON dictionary
 
-            for key in keys:
-                key_value = keys_df[key][row_i]
-                if isinstance(key_value, str):
+    Parameters
+    ----------
+    sheet_df : DataFrame
+        A sheet with key columns, whose headers include 'key', and a column for each rule
+    json_dict : dict
+        Test JSON dictionary to which the sheet's test cases are added
+    """
 
-                    # If the key includes a JSON_PATH, parse for the short hand enumeration name and adjust the key list
-                    if 'JSON_PATH' in key_value:
-                        # Inject elements to key_list based on shorthand JSON_PATH enumeration
-                        # (e.g., JSON_PATH:spaces = ["buildings","building_segments","thermal_blocks","zones","spaces"])
-                        inject_json_path_from_enumeration(key_list, key_value)
+    keys = get_key_headers(sheet_df)
 
-                    else:
-                        key_list.append(key_value)
+    # Key lists are shared by every rule column, so they are built once per sheet
+    key_lists = build_key_lists(sheet_df[keys])
+
+    # Get value columns (i.e. not key columns) from spreadsheet
+    rules_df = sheet_df.drop(keys, axis=1)
+
+    for rule_name, column_data in rules_df.items():
+
+        # Rules are only described once; later sheets and columns with the same rule are ignored
+        if rule_name in json_dict:
+            continue
+
+        for key_list, row_value in zip(key_lists, clean_column(column_data)):
+
+            # Skip empty rows
+            if row_value is None:
+                continue
+
+            # Initialize this row's list of keys (e.g. ['rule-15-1a', 'rmr_transformations', 'user', 'transformer'])
+            key_list = [rule_name] + key_list
 
             # If the final key is DICT_LIST, add the row key:value_list pair to list of dictionaries at this value
             if key_list[-1] == 'DICT_LIST':
-
                 add_to_dictionary_list(json_dict, key_list, row_value)
             else:
                 # Set nested dictionary
                 nested_dict(json_dict, key_list, row_value)
 
 
+def load_cache():
+    """ Returns the hashes recorded by earlier runs, or an empty cache if there are none """
+
+    try:
+        with open(CACHE_FILE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    with open(CACHE_FILE_PATH, 'w') as f:
+        json.dump(cache, f, indent=4, sort_keys=True)
+
+
+def convert_spreadsheet(spreadsheet_path, json_dir=JSONS_DIR, cache=None, force=False):
+    """ Converts every sheet of test case descriptions in a spreadsheet to a single test JSON.
+
+    A spreadsheet whose file hash is recorded in the cache is skipped without being read, as long as its test JSON
+    exists. Otherwise its sheets are read and hashed, and the test JSON is only written if a sheet changed.
+    Sheets without key columns (e.g. lookup tables) are ignored.
+
+    Parameters
+    ----------
+    spreadsheet_path : str
+        Path of the test spreadsheet
+    json_dir : str
+        Directory to which the test JSON is written
+    cache : dict
+        Hashes recorded by earlier runs by spreadsheet name, updated in place
+    force : bool
+        Convert the spreadsheet even if it is unchanged
+
+    Returns
+    -------
+    json_path: str
+
+        Path of the test JSON written, or None if the spreadsheet was unchanged
+    """
+
+    cache = {} if cache is None else cache
+    spreadsheet_name = os.path.basename(spreadsheet_path)
+    json_path = os.path.join(json_dir, json_name_for(spreadsheet_path))
+    entry = cache.get(spreadsheet_name, {})
+    unchanged = not force and os.path.exists(json_path)
+
+    spreadsheet_hash = file_hash(spreadsheet_path)
+    if unchanged and entry.get('file') == spreadsheet_hash:
+        return None
+
+    # Pull out every sheet of the spreadsheet at once, keeping only sheets with key columns
+    sheets = {
+        sheet_name: sheet_df
+        for sheet_name, sheet_df in pd.read_excel(spreadsheet_path, sheet_name=None).items()
+        if get_key_headers(sheet_df)
+    }
+    sheet_hashes = {sheet_name: sheet_hash(sheet_df) for sheet_name, sheet_df in sheets.items()}
+    cache[spreadsheet_name] = {'file': spreadsheet_hash, 'sheets': sheet_hashes}
+
+    # Saving a spreadsheet can change its file without changing any cell
+    if unchanged and entry.get('sheets') == sheet_hashes:
+        return None
+
+    # Initialize dictionary for JSON
+    json_dict = {}
+    for sheet_df in sheets.values():
+        convert_sheet(sheet_df, json_dict)
+
+    with open(json_path, 'w') as json_file:
+        json_file.write(json.dumps(json_dict, indent=4))
+
+    return json_path
+
 
+def convert_spreadsheets(spreadsheet_paths=None, json_dir=JSONS_DIR, force=False):
+    """ Converts test spreadsheets to test JSONs, skipping those unchanged since the last run
 
-# Dump JSON to string for writing
-json_string = json.dumps(json_dict, indent=4)
+    Parameters
+    ----------
+    spreadsheet_paths : list
+        Paths of the test spreadsheets; defaults to every spreadsheet in ruletest_spreadsheets
+    json_dir : str
+        Directory to which the test JSONs are written
+    force : bool
+        Convert every spreadsheet even if it is unchanged
 
-# Write JSON string to file
-with open(json_file_path, 'w') as json_file:
-    json_file.write(json_string)
-    print("JSON complete and written to file: " + json_name)
+    Returns
+    -------
+    json_paths: list
 
+        Paths of the test JSONs written
+    """
 
+    if spreadsheet_paths is None:
+        spreadsheet_paths = sorted(glob.glob(os.path.join(SPREADSHEETS_DIR, '*.xlsx')))
 
+    cache = load_cache()
+    json_paths = []
+    for spreadsheet_path in spreadsheet_paths:
+        json_path = convert_spreadsheet(spreadsheet_path, json_dir, cache, force)
+        if json_path is None:
+            print("Unchanged, skipped: " + os.path.basename(spreadsheet_path))
+        else:
+            print("JSON complete and written to file: " + os.path.basename(json_path))
+            json_paths.append(json_path)
+    save_cache(cache)
+
+    return json_paths
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate test JSONs from the ruletest spreadsheets.')
+    parser.add_argument('spreadsheets', nargs='*', metavar='SPREADSHEET', help='Spreadsheet paths; defaults to every spreadsheet in ruletest_spreadsheets.')
+    parser.add_argument('-f', '--force', action='store_true', help='Convert spreadsheets even if they are unchanged since the last run.')
+    args = parser.parse_args()
+
+    convert_spreadsheets(args.spreadsheets or None, force=args.force)
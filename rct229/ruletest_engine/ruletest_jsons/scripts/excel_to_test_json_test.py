@@ -0,0 +1,44 @@
+import math
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from excel_to_test_json import build_key_lists, clean_column
+
+
+# Testing build_key_lists()
+def test__build_key_lists__skips_empty_keys():
+    keys_df = pd.DataFrame({
+        'key1': ['rmr_transformations', 'rmr_transformations'],
+        'key2': ['user', 'proposed'],
+        'key3': ['transformers', math.nan]
+    })
+    assert build_key_lists(keys_df) == [
+        ['rmr_transformations', 'user', 'transformers'],
+        ['rmr_transformations', 'proposed']
+    ]
+
+def test__build_key_lists__expands_json_path():
+    keys_df = pd.DataFrame({'key1': ['user'], 'key2': ['JSON_PATH:spaces'], 'key3': ['floor_area']})
+    assert build_key_lists(keys_df) == [
+        ['user', 'buildings', 'building_segments', 'thermal_blocks', 'zones', 'spaces', 'floor_area']
+    ]
+
+
+# Testing clean_column()
+def test__clean_column__float_column():
+    values = clean_column(pd.Series([15.0, 0.98, math.nan]))
+    assert values == [15, 0.98, None]
+    assert type(values[0]) is int
+
+def test__clean_column__integer_column():
+    values = clean_column(pd.Series([1, 2]))
+    assert values == [1, 2]
+    assert all(type(value) is int for value in values)
+
+def test__clean_column__bool_column():
+    assert clean_column(pd.Series([True, False])) == [True, False]
+
+def test__clean_column__mixed_column():
+    assert clean_column(pd.Series(['T1', '0.5', 3, math.nan, 'id:1,2'], dtype = object)) == ['T1', 0.5, 3, None, 'id:1,2']
@@ -1,5 +1,16 @@
 import os
 import json
+import re
+
+JSON_PATH_ENUMS_FILE_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'json_pointer_enumerations.json')
+
+# Numeric strings in spreadsheet cells, e.g. '15', '-2', '0.97', '1e-3'
+INT_PATTERN = re.compile(r'^\s*[-+]?\d+\s*$')
+FLOAT_PATTERN = re.compile(r'^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$')
+
+# Shorthand JSON path enumerations, loaded once; see load_json_path_enumerations()
+_json_path_enums = None
+
 
 def nested_dict(dic, keys, value):
     """ Used to set nested python dictionary strings (Source: https://stackoverflow.com/a/13688108). Useful for setting
@@ -47,6 +58,25 @@ def nested_get(dic, keys):
         dic = dic[key]
     return dic
 
+def load_json_path_enumerations():
+    """ Returns the shorthand JSON path enumerations found in json_pointer_enumerations.json, which are loaded once
+    and shared by every later call.
+    (e.g., path_enum_dict['spaces'] = 'buildings/building_segments/thermal_blocks/zones/spaces')
+
+    Returns
+    -------
+    path_enum_dict: dict
+
+        Dictionary mapping shorthand names to JSON paths
+    """
+
+    global _json_path_enums
+    if _json_path_enums is None:
+        with open(JSON_PATH_ENUMS_FILE_PATH) as f:
+            _json_path_enums = json.load(f)
+
+    return _json_path_enums
+
 def inject_json_path_from_enumeration(key_list, json_path_ref_string):
 
     """ A few JSON paths are shorthanded with an enumeration. This function appends the key_list with the list of keys
@@ -63,23 +93,13 @@ def inject_json_path_from_enumeration(key_list, json_path_ref_string):
         String describing which enumeration to use. E.g., "JSON_PATH:spaces"
      """
 
-
-    # JSON path enumerations. Used to simplify JSON path references in test spreadsheets
-    file_dir = os.path.dirname(__file__)
-    json_path_enums_file_path = os.path.join(file_dir, 'resources', 'json_pointer_enumerations.json')
-
-    with open(json_path_enums_file_path) as f:
-        # Construct dictionary to map shorthand names for JSON Paths
-        # (e.g., path_enum_dict['spaces] = 'buildings/building_segments/thermal_blocks/zones/spaces')
-        path_enum_dict = json.load(f)
-
     # Pull out enumeration key from json_path_ref_string
     json_path_enumeration = json_path_ref_string.split(':')[1].strip()
 
     # Split enumeration path into a list and append it to existing key_list
     # (e.g. 'buildings/building_segments/thermal_blocks/zones/spaces' ->
     #       ['buildings', 'building_segments', 'thermal_blocks', 'zones', 'spaces']
-    enumeration_list = path_enum_dict[json_path_enumeration].split('/')
+    enumeration_list = load_json_path_enumerations()[json_path_enumeration].split('/')
 
     # Inject enumeration list into keylist
     key_list.extend(enumeration_list)
@@ -136,30 +156,25 @@ def add_to_dictionary_list(json_dict, key_list, dict_string):
 
 
 def clean_value(value):
-    """ Used to change strings to numerics, if possible.
+    """ Used to change strings to numerics, if possible. Whole numbers become integers and other numbers floats;
+    booleans, dictionaries, lists, and non-numeric strings are returned as is.
 
         Parameters
         ----------
-        value : str
-            String to be cleaned
+        value : str, int, float, bool, dict, or list
+            Value to be cleaned
 
         """
 
-    # Set value directly if not convertible to a numeric
-    if isinstance(value, dict) or isinstance(value, list):
+    if isinstance(value, str):
+        if INT_PATTERN.match(value):
+            return int(value)
+        if FLOAT_PATTERN.match(value):
+            return float(value)
         return value
-    else:
-        # Set value as integer or float if convertible
-        try:
-            value = int(value)
-            return value
-        except ValueError:
-            try:
-                value = float(value)
-                return value
-            except ValueError:
-                return value
-
-
 
+    # Spreadsheet readers give whole numbers in float columns as floats (e.g. 15.0)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
 
+    return value
@@ -0,0 +1,24 @@
+import pytest
+
+from json_generation_utilities import clean_value
+
+
+# Testing clean_value()
+@pytest.mark.parametrize('value, expected', [
+    ('15', 15),
+    (' -2 ', -2),
+    ('0.97', 0.97),
+    ('.5', 0.5),
+    ('1e-3', 0.001),
+    (15.0, 15),
+    (0.98, 0.98),
+    (3, 3)
+])
+def test__clean_value__numbers(value, expected):
+    cleaned = clean_value(value)
+    assert cleaned == expected
+    assert type(cleaned) is type(expected)
+
+@pytest.mark.parametrize('value', ['T1', 'ONE_PHASE', '1,2,3', '', True, False, {'a': 1}, [1, 2]])
+def test__clean_value__keeps_other_values(value):
+    assert clean_value(value) is value
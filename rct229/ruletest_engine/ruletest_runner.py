@@ -0,0 +1,212 @@
+import glob
+import json
+import math
+import os
+from time import perf_counter
+import xml.etree.ElementTree as ET
+
+from rct229.rule_engine.worker_pool import WarmWorkerPool
+from rct229.ruletest_engine.ruletest_engine import get_rule_definitions, load_rmr_template, RULETEST_JSONS_DIR, run_test_case
+from rct229.schema.validate import get_validator
+
+PASSED = 'passed'
+FAILED = 'failed'
+ERROR = 'error'
+SKIPPED = 'skipped'
+
+# Test cases are run in-process unless there are at least this many per worker
+MIN_CASES_PER_WORKER = 50
+
+# Chunks of test cases handed to each worker, to amortize inter-process overhead
+CHUNKS_PER_WORKER = 4
+
+
+def discover_ruletest_files(directory = RULETEST_JSONS_DIR):
+    """Returns the paths of the test JSONs in a directory, sorted by name"""
+    return sorted(glob.glob(os.path.join(directory, '*.json')))
+
+
+def load_test_cases(paths):
+    """Loads the test cases of test JSONs
+
+    Parameters
+    ----------
+    paths : list of string
+        Paths of test JSONs
+
+    Returns
+    -------
+    tuple : a tuple containing:
+        - test_cases (list of tuple): (file name, test id, test dict) for each test case
+        - errors (list of dict): A result, see run_ruletests(), for each test JSON that could not be read
+    """
+    test_cases = []
+    errors = []
+    for path in paths:
+        file_name = os.path.basename(path)
+        try:
+            with open(path) as f:
+                test_list_dictionary = json.load(f)
+        except ValueError as err:
+            errors.append(_result(file_name, None, ERROR, 0.0, f'Invalid test JSON: {err}'))
+            continue
+        test_cases.extend((file_name, test_id, test_dict) for test_id, test_dict in test_list_dictionary.items())
+
+    return test_cases, errors
+
+
+def _result(file_name, test_id, status, duration, message):
+    return {'file': file_name, 'id': test_id, 'status': status, 'duration': duration, 'message': message}
+
+
+def _warm(template_names = ()):
+    """Creates the process-wide state shared by the test cases"""
+    get_validator()
+    get_rule_definitions()
+    for name in template_names:
+        try:
+            load_rmr_template(name)
+        except (OSError, ValueError):
+            # Reported by the test cases using the template
+            pass
+
+
+def _run_test_cases(test_cases):
+    """Runs test cases, returning a result for each"""
+    results = []
+    for file_name, test_id, test_dict in test_cases:
+        start = perf_counter()
+        try:
+            outcome_texts, received_expected_outcome = run_test_case(test_id, test_dict)
+            status = PASSED if received_expected_outcome else FAILED
+            message = '\n'.join(outcome_texts)
+        except NotImplementedError as err:
+            status, message = SKIPPED, str(err)
+        except Exception as err:
+            status, message = ERROR, f'{type(err).__name__}: {err}'
+        results.append(_result(file_name, test_id, status, perf_counter() - start, message))
+
+    return results
+
+
+def run_ruletests(paths = None, workers = None, metrics = None):
+    """Runs the test cases of test JSONs across a pool of processes
+
+    The schema validator, rule definitions, and RMR templates are created
+    once in this process before the pool starts, and the workers are
+    forked from it so they start warm; see WarmWorkerPool.
+
+    Parameters
+    ----------
+    paths : list of string
+        Paths of test JSONs; defaults to all test JSONs in RULETEST_JSONS_DIR
+    workers : int
+        The number of worker processes; by default one per CPU, but no
+        more than one per MIN_CASES_PER_WORKER test cases. With one worker
+        the test cases run in this process.
+    metrics : dict
+        Optional dictionary updated with the pool metrics, see
+        WarmWorkerPool.metrics(), when a pool is used
+
+    Returns
+    -------
+    list of dict
+        {file, id, status, duration, message} for each test case, in the
+        order of the test JSONs, where status is 'passed' if the test
+        resulted in its expected outcome, 'failed' if not, 'skipped' if its
+        rule is not implemented, or 'error' if it raised an exception.
+        A test JSON that cannot be read has an 'error' result with id None.
+    """
+    if paths is None:
+        paths = discover_ruletest_files()
+    test_cases, results = load_test_cases(paths)
+
+    if workers is None:
+        workers = min(os.cpu_count() or 1, math.ceil(len(test_cases) / MIN_CASES_PER_WORKER))
+    workers = max(1, workers)
+
+    # Templates loaded here are shared with forked workers rather than loaded by each
+    template_names = set(
+        test_dict['rmr_template'] for _, _, test_dict in test_cases
+        if isinstance(test_dict.get('rmr_template'), str)
+    )
+    if workers == 1:
+        _warm(template_names)
+        return results + _run_test_cases(test_cases)
+
+    chunk_size = max(1, math.ceil(len(test_cases) / (workers * CHUNKS_PER_WORKER)))
+    chunks = [test_cases[index:index + chunk_size] for index in range(0, len(test_cases), chunk_size)]
+    # Each worker runs a few chunks only, so it is never recycled
+    with WarmWorkerPool(workers, max_tasks_per_worker = None, initializer = _warm, initargs = (template_names,)) as pool:
+        for chunk_results in pool.map(_run_test_cases, chunks):
+            results.extend(chunk_results)
+        if metrics is not None:
+            metrics.update(pool.metrics())
+
+    return results
+
+
+def summarize_results(results):
+    """Returns the number of test cases with each status and their total duration"""
+    summary = {'tests': len(results), PASSED: 0, FAILED: 0, ERROR: 0, SKIPPED: 0}
+    for result in results:
+        summary[result['status']] += 1
+    summary['duration'] = sum(result['duration'] for result in results)
+
+    return summary
+
+
+def write_json_results(results, stream):
+    """Writes test results as JSON with a summary, see summarize_results()"""
+    json.dump({'summary': summarize_results(results), 'results': results}, stream, indent = 4)
+
+
+def write_junit_xml(results, stream, name = 'ruletests'):
+    """Writes test results as JUnit XML, with a test suite for each test JSON
+
+    Parameters
+    ----------
+    results : list of dict
+        Test results as returned by run_ruletests()
+    stream : file
+        A file open for binary writing
+    name : string
+        The name of the test suites element
+    """
+    suites = {}
+    for result in results:
+        suites.setdefault(result['file'], []).append(result)
+
+    summary = summarize_results(results)
+    root = ET.Element('testsuites', {
+        'name': name,
+        'tests': str(summary['tests']),
+        'failures': str(summary[FAILED]),
+        'errors': str(summary[ERROR]),
+        'skipped': str(summary[SKIPPED]),
+        'time': f"{summary['duration']:.6f}"
+    })
+    for file_name, suite_results in suites.items():
+        suite_summary = summarize_results(suite_results)
+        suite = ET.SubElement(root, 'testsuite', {
+            'name': file_name,
+            'tests': str(suite_summary['tests']),
+            'failures': str(suite_summary[FAILED]),
+            'errors': str(suite_summary[ERROR]),
+            'skipped': str(suite_summary[SKIPPED]),
+            'time': f"{suite_summary['duration']:.6f}"
+        })
+        for result in suite_results:
+            case = ET.SubElement(suite, 'testcase', {
+                'classname': os.path.splitext(file_name)[0],
+                'name': result['id'] or file_name,
+                'time': f"{result['duration']:.6f}"
+            })
+            if result['status'] == FAILED:
+                ET.SubElement(case, 'failure', {'message': result['message'].split('\n')[0]}).text = result['message']
+            elif result['status'] == ERROR:
+                ET.SubElement(case, 'error', {'message': result['message']})
+            elif result['status'] == SKIPPED:
+                ET.SubElement(case, 'skipped', {'message': result['message']})
+
+    ET.ElementTree(root).write(stream, encoding = 'utf-8', xml_declaration = True)
@@ -1,3 +1,54 @@
-from rct229.ruletest_engine.ruletest_engine import *
+import argparse
+import contextlib
+import os
+import sys
 
-run_transformer_tests()
\ No newline at end of file
+from rct229.ruletest_engine.ruletest_runner import (
+    discover_ruletest_files, ERROR, FAILED, PASSED, run_ruletests, SKIPPED,
+    summarize_results, write_json_results, write_junit_xml
+)
+from rct229.ruletest_engine.ruletest_engine import RULETEST_JSONS_DIR
+from rct229.utils.profiling import Profiler
+
+parser = argparse.ArgumentParser(description = 'Run the rule tests.')
+parser.add_argument('test_jsons', nargs = '*', metavar = 'TEST_JSON', help = 'Test JSON names or paths; defaults to all test JSONs in ruletest_jsons.')
+parser.add_argument('-j', '--workers', type = int, help = 'Number of worker processes; defaults to one per CPU, fewer for small test sets.')
+parser.add_argument('--junit', metavar = 'PATH', help = 'Write the results as JUnit XML.')
+parser.add_argument('--json', metavar = 'PATH', help = 'Write the results as JSON.')
+parser.add_argument('-v', '--verbose', action = 'store_true', help = 'Print the outcome of every test, not only the unsuccessful ones.')
+parser.add_argument('--profile', metavar = 'PREFIX', help = 'Profile the rule tests in a single process, writing PREFIX.pstats and PREFIX.speedscope.json.')
+args = parser.parse_args()
+
+paths = [
+    path if os.path.isfile(path) else os.path.join(RULETEST_JSONS_DIR, path)
+    for path in args.test_jsons
+] or discover_ruletest_files()
+
+pool_metrics = {}
+with Profiler(args.profile, name = 'ruletests') if args.profile else contextlib.nullcontext():
+    results = run_ruletests(paths, workers = 1 if args.profile else args.workers, metrics = pool_metrics)
+
+for result in results:
+    if args.verbose or result['status'] != PASSED:
+        print(f"{result['status'].upper()}: {result['file']} {result['id'] or ''}".rstrip())
+        print(f"    {result['message']}")
+
+summary = summarize_results(results)
+print(
+    f"{summary['tests']} tests: {summary[PASSED]} passed, {summary[FAILED]} failed, "
+    f"{summary[ERROR]} errors, {summary[SKIPPED]} skipped in {summary['duration']:.3f} s"
+)
+if args.verbose and pool_metrics:
+    print(
+        f"{pool_metrics['workers']} {pool_metrics['start_method']} workers started in {pool_metrics['startup_seconds']:.3f} s, "
+        f"{pool_metrics['mean_task_overhead_seconds']:.4f} s overhead per task"
+    )
+
+if args.junit:
+    with open(args.junit, 'wb') as f:
+        write_junit_xml(results, f)
+if args.json:
+    with open(args.json, 'w') as f:
+        write_json_results(results, f)
+
+sys.exit(1 if summary[FAILED] or summary[ERROR] else 0)
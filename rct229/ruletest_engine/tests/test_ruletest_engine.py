@@ -1,5 +1,8 @@
 
-from rct229.ruletest_engine.ruletest_engine import run_transformer_tests
+import pytest
+
+from rct229.ruletest_engine.ruletest_engine import generate_test_rmrs, load_rmr_template, run_transformer_tests
+from rct229.schema.validate import validate_rmr
 
 
 # content of test_assert1.py
@@ -8,3 +11,24 @@ def test_run_transformer_tests():
     assert run_transformer_tests()
 
 
+
+
+def test_generate_test_rmrs_from_template():
+    test_dict = {
+        'rmr_template': 'full_building',
+        'rmr_transformations': {
+            'user': [],
+            'baseline': [{'op': 'remove', 'path': '/transformers/2'}]
+        }
+    }
+    user_rmr, baseline_rmr, proposed_rmr = generate_test_rmrs(test_dict)
+    template = load_rmr_template('full_building.json')
+    assert user_rmr is template
+    assert len(baseline_rmr['transformers']) == len(template['transformers']) - 1
+    assert baseline_rmr['buildings'] is template['buildings']
+    assert proposed_rmr is None
+    assert validate_rmr(baseline_rmr)['passed']
+
+def test_template_is_immutable():
+    with pytest.raises(TypeError):
+        load_rmr_template('full_building')['transformers'].append({'name': 'T'})
@@ -0,0 +1,78 @@
+import io
+import os
+import json
+import xml.etree.ElementTree as ET
+
+from rct229.ruletest_engine.ruletest_engine import RULETEST_JSONS_DIR
+from rct229.ruletest_engine.ruletest_runner import (
+    discover_ruletest_files, run_ruletests, summarize_results, write_json_results, write_junit_xml
+)
+
+test_json = {
+    'rule-15-1a': {
+        'Section': 15, 'Rule': 1, 'Test': 'a',
+        'description': 'Same number of transformers',
+        'rmr_transformations': {
+            'user': {'transformers': [{'name': 'T1'}]},
+            'baseline': {'transformers': [{'name': 'T1'}]}
+        },
+        'expected_rule_outcome': 'pass'
+    },
+    'rule-15-1b': {
+        'Section': 15, 'Rule': 1, 'Test': 'b',
+        'description': 'Wrongly expected to pass',
+        'rmr_transformations': {
+            'user': {'transformers': [{'name': 'T1'}]},
+            'baseline': {'transformers': []}
+        },
+        'expected_rule_outcome': 'pass'
+    },
+    'rule-99-1a': {
+        'Section': 99, 'Rule': 1, 'Test': 'a',
+        'description': 'Rule that does not exist',
+        'rmr_transformations': {},
+        'expected_rule_outcome': 'pass'
+    }
+}
+
+
+def _write_test_jsons(tmp_path):
+    good_path = tmp_path / 'good_tests.json'
+    good_path.write_text(json.dumps(test_json))
+    bad_path = tmp_path / 'bad_tests.json'
+    bad_path.write_text('{"rule-15-1a": ')
+
+    return [str(good_path), str(bad_path)]
+
+def test__discover_ruletest_files():
+    assert 'transformer_tests.json' in [os.path.basename(path) for path in discover_ruletest_files()]
+    assert all(path.startswith(RULETEST_JSONS_DIR) for path in discover_ruletest_files())
+
+def test__run_ruletests__statuses(tmp_path):
+    results = run_ruletests(_write_test_jsons(tmp_path), workers = 1)
+    assert [(result['file'], result['id'], result['status']) for result in results] == [
+        ('bad_tests.json', None, 'error'),
+        ('good_tests.json', 'rule-15-1a', 'passed'),
+        ('good_tests.json', 'rule-15-1b', 'failed'),
+        ('good_tests.json', 'rule-99-1a', 'skipped')
+    ]
+    assert all(result['duration'] >= 0 for result in results)
+
+def test__run_ruletests__worker_pool_matches_serial(tmp_path):
+    paths = _write_test_jsons(tmp_path)
+    strip = lambda results: [(result['id'], result['status'], result['message']) for result in results]
+    assert strip(run_ruletests(paths, workers = 2)) == strip(run_ruletests(paths, workers = 1))
+
+def test__write_results(tmp_path):
+    results = run_ruletests(_write_test_jsons(tmp_path), workers = 1)
+
+    stream = io.BytesIO()
+    write_junit_xml(results, stream)
+    root = ET.fromstring(stream.getvalue())
+    assert (root.get('tests'), root.get('failures'), root.get('errors'), root.get('skipped')) == ('4', '1', '1', '1')
+    assert [suite.get('name') for suite in root] == ['bad_tests.json', 'good_tests.json']
+    assert root.find("testsuite/testcase[@name='rule-15-1b']/failure") is not None
+
+    stream = io.StringIO()
+    write_json_results(results, stream)
+    assert json.loads(stream.getvalue())['summary'] == json.loads(json.dumps(summarize_results(results)))
@@ -1,8 +1,12 @@
+from collections.abc import Mapping, Sequence
 import json
 import jsonschema
 # from jsonschema import RefResolver
 # from jsonschema.validators import validator_for
 import os
+import threading
+
+from rct229.utils.instrumentation import instrumented
 
 file_dir = os.path.dirname(__file__)
 
@@ -12,12 +16,38 @@ SCHEMA_PATH = os.path.join(file_dir, SCHEMA_KEY)
 SCHEMA_ENUM_PATH = os.path.join(file_dir, SCHEMA_ENUM_KEY)
 
 
-def _schema_validate(rmr_obj):
-    """Validates an RMR against the schema
+def _is_array(checker, instance):
+    """Treats read-only sequences, such as ScheduleValues, as JSON arrays"""
+    return isinstance(instance, list) or (
+        isinstance(instance, Sequence) and not isinstance(instance, (str, bytes))
+    )
+
+
+def _is_object(checker, instance):
+    """Treats read-only mappings, such as lazy binary RMR objects, as JSON objects"""
+    return isinstance(instance, Mapping)
+
+
+# The schema validator, created on first use
+_validator = None
+
+# The validator's reference resolver keeps a stack of scopes while it
+# validates, so a validator must not be used by two threads at once
+_validator_lock = threading.Lock()
+
+
+def get_validator():
+    """Returns the RMR schema validator
+
+    The schema files are loaded and the validator created on the first call
+    only; later calls, and processes forked after it, reuse the validator.
 
     This code follows the outline given in
     https://stackoverflow.com/questions/53968770/how-to-set-up-local-file-references-in-python-jsonschema-document
     """
+    global _validator
+    if _validator is not None:
+        return _validator
 
     # Load the schema files
     with open(SCHEMA_PATH) as json_file:
@@ -34,11 +64,26 @@ def _schema_validate(rmr_obj):
 
     # Create a validator
     Validator = jsonschema.validators.validator_for(schema)
-    validator = Validator(schema, resolver = resolver)
+    Validator = jsonschema.validators.extend(
+        Validator,
+        type_checker = Validator.TYPE_CHECKER.redefine_many({
+            'array': _is_array,
+            'object': _is_object
+        })
+    )
+    _validator = Validator(schema, resolver = resolver)
+
+    return _validator
+
+
+def _schema_validate(rmr_obj):
+    """Validates an RMR against the schema"""
+    validator = get_validator()
 
     try:
         # Throws ValidationError on failure
-        validator.validate(rmr_obj)
+        with _validator_lock:
+            validator.validate(rmr_obj)
         return {
             "passed": True,
             "error": None
@@ -57,6 +102,7 @@ def _non_schema_validate(rmr_obj):
 
 
 
+@instrumented('validate_rmr', track_memory = True)
 def validate_rmr(rmr_obj):
     """Validate an RMR against the schema and other high-level checks"""
     # Validate against the schema
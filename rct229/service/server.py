@@ -0,0 +1,276 @@
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import socketserver
+import stat
+import threading
+from time import perf_counter
+import traceback
+
+from rct229.rule_engine.engine import evaluate_rules, select_rules, warm_up
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.utils.file import deserialize_rmr_file
+from rct229.utils.schedules import compact_schedules
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8229
+
+# The number of evaluation requests that may wait while another is evaluated
+DEFAULT_QUEUE_SIZE = 16
+
+RMR_NAMES = ['user', 'baseline', 'proposed']
+
+# Request bodies larger than this are refused
+MAX_BODY_BYTES = 1 << 30
+
+
+class ServiceBusy(Exception):
+    """Raised when an evaluation request arrives while the queue is full"""
+
+
+class BadRequest(ValueError):
+    """Raised for an evaluation request that cannot be evaluated"""
+
+
+class EvaluationService:
+    """Evaluates RMR trios against rules that are created once
+
+    The schema validator, enumerations, data tables, and rule instances are
+    created when the service is, so evaluations only pay for the RMRs.
+    Evaluations run one at a time on a dedicated thread, since they are
+    CPU bound; up to queue_size more requests wait their turn and any beyond
+    that are refused.
+
+    Parameters
+    ----------
+    queue_size : int
+        The number of requests that may wait while another is evaluated
+    """
+
+    def __init__(self, queue_size = DEFAULT_QUEUE_SIZE):
+        start = perf_counter()
+        self.rules_list = warm_up()
+        self.startup_seconds = perf_counter() - start
+        self.started = perf_counter()
+
+        self.queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(queue_size + 1)
+        self._executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = 'rct229-evaluation')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._refused = 0
+
+    def _load_rmrs(self, request):
+        """Returns the RMR trio of a request, given inline or as file paths"""
+        paths = request.get('paths')
+        if paths is not None:
+            if not isinstance(paths, dict):
+                raise BadRequest('paths must be an object of RMR file paths')
+            rmrs = []
+            for name in RMR_NAMES:
+                path = paths.get(name)
+                if path is None:
+                    rmrs.append(None)
+                    continue
+                try:
+                    with open(path, 'rb') as f:
+                        rmrs.append(deserialize_rmr_file(f))
+                except (OSError, ValueError) as err:
+                    raise BadRequest(f'The {name} RMR could not be loaded: {err}')
+        else:
+            rmrs = [request.get(name) for name in RMR_NAMES]
+
+        for name, rmr in zip(RMR_NAMES, rmrs):
+            if rmr is not None and not isinstance(rmr, dict):
+                raise BadRequest(f'The {name} RMR must be an object')
+
+        # Share packed storage for identical schedules across the RMR trio
+        compact_schedules(*rmrs)
+
+        return UserBaselineProposedVals(*rmrs)
+
+    def _evaluate(self, request):
+        rule_ids = request.get('rules')
+        try:
+            rules_list = self.rules_list if rule_ids is None else select_rules(self.rules_list, rule_ids)
+        except (TypeError, ValueError) as err:
+            raise BadRequest(str(err))
+        rmrs = self._load_rmrs(request)
+
+        start = perf_counter()
+        report = evaluate_rules(rules_list, rmrs, summarised = bool(request.get('summarised')))
+        report['seconds'] = perf_counter() - start
+
+        return report
+
+    def evaluate(self, request):
+        """Evaluates an RMR trio, waiting for its turn in the queue
+
+        Parameters
+        ----------
+        request : dict
+            {
+                user, baseline, proposed: dict - The RMRs; an RMR that is
+                    missing is None
+                paths: dict - Optional paths of the user, baseline, and
+                    proposed RMR files, loaded in place of inline RMRs
+                rules: [string] - Optional ids of the rules to evaluate;
+                    all rules by default
+                summarised: bool - Report only per-result counts and the
+                    non-passing items of list rules
+            }
+
+        Returns
+        -------
+        dict
+            The report returned by evaluate_rules(), with the seconds taken
+            by validation and evaluation added
+
+        Raises
+        ------
+        ServiceBusy
+            If the queue is full
+        BadRequest
+            If the request names unknown rules or its RMRs cannot be loaded
+        """
+        if not self._slots.acquire(blocking = False):
+            with self._lock:
+                self._refused += 1
+            raise ServiceBusy(f'The evaluation queue is full ({self.queue_size} requests waiting)')
+
+        with self._lock:
+            self._pending += 1
+        try:
+            return self._executor.submit(self._evaluate, request).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+            self._slots.release()
+
+    def status(self):
+        """Returns the state of the service for health checks"""
+        with self._lock:
+            return {
+                'status': 'ok',
+                'pid': os.getpid(),
+                'rules': len(self.rules_list),
+                'startup_seconds': self.startup_seconds,
+                'uptime_seconds': perf_counter() - self.started,
+                'queue_size': self.queue_size,
+                'pending': self._pending,
+                'completed': self._completed,
+                'refused': self._refused
+            }
+
+    def close(self):
+        self._executor.shutdown(wait = True)
+
+
+class EvaluationRequestHandler(BaseHTTPRequestHandler):
+    """Serves the endpoints of an EvaluationService:
+
+    - GET /health: the service status, see EvaluationService.status()
+    - POST /evaluate: a JSON evaluation request, see
+        EvaluationService.evaluate(), answered with the JSON report
+    """
+    server_version = 'rct229'
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'local'
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super(EvaluationRequestHandler, self).log_message(format, *args)
+
+    def _send_json(self, status, body):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, self.server.service.status())
+        else:
+            self._send_json(404, {'error': f'Unknown path: {self.path}'})
+
+    def do_POST(self):
+        if self.path != '/evaluate':
+            self._send_json(404, {'error': f'Unknown path: {self.path}'})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length < 0:
+                raise ValueError(f'Invalid Content-Length: {length}')
+            if length > MAX_BODY_BYTES:
+                self._send_json(413, {'error': 'The request body is too large'})
+                return
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict):
+                raise BadRequest('The request must be a JSON object')
+            report = self.server.service.evaluate(request)
+        except ServiceBusy as err:
+            self._send_json(503, {'error': str(err)})
+        except ValueError as err:
+            # Includes BadRequest, Content-Length, and JSON decoding errors
+            self._send_json(400, {'error': str(err)})
+        except Exception as err:
+            # An error in a rule or in loading must not drop the connection
+            self.log_error('Evaluation failed:\n%s', traceback.format_exc())
+            self._send_json(500, {'error': f'{type(err).__name__}: {err}'})
+        else:
+            self._send_json(200, report)
+
+
+class _ServiceMixIn:
+    daemon_threads = True
+
+    def __init__(self, address, service, quiet = False):
+        self.service = service
+        self.quiet = quiet
+        super(_ServiceMixIn, self).__init__(address, EvaluationRequestHandler)
+
+
+class EvaluationHTTPServer(_ServiceMixIn, ThreadingHTTPServer):
+    """Serves an EvaluationService over HTTP on a TCP address"""
+
+
+def _is_socket(path):
+    try:
+        return stat.S_ISSOCK(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+
+class EvaluationUnixServer(_ServiceMixIn, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves an EvaluationService over HTTP on a Unix socket"""
+
+    def server_bind(self):
+        # A socket left behind by an earlier server would refuse the bind
+        if _is_socket(self.server_address):
+            os.unlink(self.server_address)
+        super(EvaluationUnixServer, self).server_bind()
+
+    def server_close(self):
+        super(EvaluationUnixServer, self).server_close()
+        if _is_socket(self.server_address):
+            os.unlink(self.server_address)
+
+
+def create_server(service, host = DEFAULT_HOST, port = DEFAULT_PORT, socket_path = None, quiet = False):
+    """Creates a server for an EvaluationService, listening on a Unix socket
+    when socket_path is given and on host and port otherwise
+
+    Port 0 picks a free port; see server.server_address.
+    """
+    if socket_path:
+        return EvaluationUnixServer(socket_path, service, quiet)
+
+    return EvaluationHTTPServer((host, port), service, quiet)
@@ -0,0 +1,100 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from rct229.service.server import BadRequest, create_server, EvaluationService, ServiceBusy
+
+test_request = {
+    'user': {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    'baseline': {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    'proposed': {'transformers': [{'name': 'T1'}]},
+    'rules': ['15-1', '15-3']
+}
+
+
+@pytest.fixture(scope = 'module')
+def service():
+    service = EvaluationService(queue_size = 1)
+    yield service
+    service.close()
+
+
+# Testing EvaluationService
+def test__evaluation_service__evaluates_selected_rules(service):
+    report = service.evaluate(test_request)
+    assert report['invalid_rmrs'] == {}
+    assert [outcome['id'] for outcome in report['outcomes']] == ['15-1', '15-3']
+    assert report['outcomes'][0]['result'] == 'PASSED'
+    assert report['summary']['number_evaluations'] == 3
+    assert report['seconds'] > 0
+
+def test__evaluation_service__unknown_rule(service):
+    with pytest.raises(BadRequest):
+        service.evaluate(dict(test_request, rules = ['0-0']))
+
+def test__evaluation_service__refuses_requests_beyond_queue(service):
+    # Hold both the running and the queued slot
+    assert service._slots.acquire(blocking = False)
+    assert service._slots.acquire(blocking = False)
+    try:
+        with pytest.raises(ServiceBusy):
+            service.evaluate(test_request)
+    finally:
+        service._slots.release()
+        service._slots.release()
+    assert service.status()['refused'] == 1
+
+
+# Testing the HTTP server
+def test__create_server__serves_evaluations(service):
+    server = create_server(service, port = 0, quiet = True)
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    try:
+        connection = http.client.HTTPConnection(*server.server_address)
+        connection.request('POST', '/evaluate', json.dumps(test_request))
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())['outcomes'][0]['id'] == '15-1'
+
+        connection.request('POST', '/evaluate', 'not json')
+        response = connection.getresponse()
+        assert response.status == 400
+        response.read()
+
+        connection.request('GET', '/health')
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())['rules'] == len(service.rules_list)
+        connection.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test__create_server__reports_errors(service, monkeypatch):
+    def fail(request):
+        raise KeyError('capacity')
+
+    server = create_server(service, port = 0, quiet = True)
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    try:
+        connection = http.client.HTTPConnection(*server.server_address)
+        connection.request('POST', '/evaluate', '{}', headers = {'Content-Length': 'many'})
+        response = connection.getresponse()
+        assert response.status == 400
+        response.read()
+        connection.close()
+
+        monkeypatch.setattr(service, 'evaluate', fail)
+        connection = http.client.HTTPConnection(*server.server_address)
+        connection.request('POST', '/evaluate', json.dumps(test_request))
+        response = connection.getresponse()
+        assert response.status == 500
+        assert json.loads(response.read()) == {'error': "KeyError: 'capacity'"}
+        connection.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,355 @@
+from array import array
+from collections.abc import Mapping, Sequence
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+from rct229.utils.schedules import ScheduleValues
+
+# Binary RMR layout, all integers little-endian:
+#   header: MAGIC, 32-byte SHA-256 of the source JSON, u64 key table offset,
+#       u64 root node offset
+#   node: a one-byte tag followed by its payload
+#       NONE, TRUE, FALSE: no payload
+#       INT: i64; BIG_INT: u32 length + decimal digits; FLOAT: f64
+#       STRING: u32 length + UTF-8 bytes
+#       FLOAT_ARRAY: u32 count + count f64 values
+#       LIST: u32 count + count u64 child node offsets
+#       DICT: u32 count + count (u32 key index, u64 child node offset) pairs
+#   key table: u32 count + count (u32 length + UTF-8 bytes) interned keys
+MAGIC = b'RCT229B\x01'
+BINARY_RMR_SUFFIX = '.rmrb'
+
+_NONE = b'n'
+_TRUE = b't'
+_FALSE = b'f'
+_INT = b'i'
+_BIG_INT = b'I'
+_FLOAT = b'd'
+_STRING = b's'
+_FLOAT_ARRAY = b'D'
+_LIST = b'L'
+_DICT = b'O'
+
+_HEADER = struct.Struct('<8s32sQQ')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_DICT_ENTRY = struct.Struct('<IQ')
+
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+_READ_CHUNK_SIZE = 1 << 20
+
+NOT_BINARY_RMR_MSG = 'Not a binary RMR file'
+
+
+def file_sha256(path):
+    """Returns the SHA-256 digest of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    return digest.digest()
+
+
+class _Writer:
+    def __init__(self, f):
+        self._f = f
+        self._keys = {}
+
+    def _key_index(self, key):
+        return self._keys.setdefault(key, len(self._keys))
+
+    def write_node(self, obj):
+        """Writes a node after its children and returns the node's offset"""
+        f = self._f
+
+        if isinstance(obj, dict):
+            entries = [(self._key_index(key), self.write_node(value)) for key, value in obj.items()]
+            offset = f.tell()
+            f.write(_DICT + _U32.pack(len(entries)))
+            f.write(b''.join(_DICT_ENTRY.pack(key_index, child) for key_index, child in entries))
+            return offset
+
+        if isinstance(obj, (list, tuple, ScheduleValues)):
+            if obj and all(type(value) is float for value in obj):
+                values = array('d', obj)
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                offset = f.tell()
+                f.write(_FLOAT_ARRAY + _U32.pack(len(values)))
+                f.write(values.tobytes())
+                return offset
+            children = [self.write_node(value) for value in obj]
+            offset = f.tell()
+            f.write(_LIST + _U32.pack(len(children)))
+            f.write(b''.join(_U64.pack(child) for child in children))
+            return offset
+
+        offset = f.tell()
+        if obj is None:
+            f.write(_NONE)
+        elif obj is True:
+            f.write(_TRUE)
+        elif obj is False:
+            f.write(_FALSE)
+        elif isinstance(obj, int):
+            if _INT64_MIN <= obj <= _INT64_MAX:
+                f.write(_INT + _I64.pack(obj))
+            else:
+                digits = str(obj).encode()
+                f.write(_BIG_INT + _U32.pack(len(digits)) + digits)
+        elif isinstance(obj, float):
+            f.write(_FLOAT + _F64.pack(obj))
+        elif isinstance(obj, str):
+            encoded = obj.encode('utf-8')
+            f.write(_STRING + _U32.pack(len(encoded)) + encoded)
+        else:
+            raise TypeError(f'Cannot encode {type(obj).__name__} in a binary RMR')
+
+        return offset
+
+    def write_keys(self):
+        offset = self._f.tell()
+        self._f.write(_U32.pack(len(self._keys)))
+        for key in self._keys:
+            encoded = key.encode('utf-8')
+            self._f.write(_U32.pack(len(encoded)) + encoded)
+
+        return offset
+
+
+def write_binary_rmr(rmr, f, source_hash = bytes(32)):
+    """Writes an RMR in the binary RMR format
+
+    Parameters
+    ----------
+    rmr : dict
+        An RMR as deserialized from JSON
+    f : file
+        A seekable file opened for binary writing
+    source_hash : bytes
+        The SHA-256 digest of the source JSON file
+    """
+    start = f.tell()
+    f.write(_HEADER.pack(MAGIC, source_hash, 0, 0))
+    writer = _Writer(f)
+    root_offset = writer.write_node(rmr)
+    keys_offset = writer.write_keys()
+    end = f.tell()
+
+    f.seek(start)
+    f.write(_HEADER.pack(MAGIC, source_hash, keys_offset, root_offset))
+    f.seek(end)
+
+
+def compile_rmr(json_path, binary_path = None):
+    """Converts an RMR JSON file into the binary RMR format
+
+    Parameters
+    ----------
+    json_path : string
+        Path to the RMR JSON file
+    binary_path : string
+        Path to the binary file to write; defaults to json_path with the
+        BINARY_RMR_SUFFIX extension
+
+    Returns
+    -------
+    string
+        The path of the binary file
+    """
+    if binary_path is None:
+        binary_path = os.path.splitext(json_path)[0] + BINARY_RMR_SUFFIX
+
+    with open(json_path, 'rb') as f:
+        rmr = json.load(f)
+
+    # Write to a temporary file so that readers never see a partial file
+    temp_path = binary_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        write_binary_rmr(rmr, f, file_sha256(json_path))
+    os.replace(temp_path, binary_path)
+
+    return binary_path
+
+
+class BinaryRMR:
+    """A memory-mapped binary RMR
+
+    Nodes are decoded on access; objects and arrays are returned as lazy
+    read-only LazyMapping and LazySequence views, and float arrays as
+    ScheduleValues.
+    """
+
+    def __init__(self, buf):
+        """
+        Parameters
+        ----------
+        buf : bytes-like
+            The content of a binary RMR file, e.g. an mmap
+        """
+        if len(buf) < _HEADER.size:
+            raise ValueError(NOT_BINARY_RMR_MSG)
+        magic, self.source_hash, keys_offset, self._root_offset = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError(NOT_BINARY_RMR_MSG)
+        self._buf = buf
+
+        count, = _U32.unpack_from(buf, keys_offset)
+        pos = keys_offset + _U32.size
+        keys = []
+        for _ in range(count):
+            length, = _U32.unpack_from(buf, pos)
+            pos += _U32.size
+            keys.append(sys.intern(bytes(buf[pos:pos + length]).decode('utf-8')))
+            pos += length
+        self._keys = keys
+
+    @classmethod
+    def open(cls, path):
+        """Memory maps a binary RMR file"""
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ))
+
+    @property
+    def root(self):
+        return self.decode(self._root_offset)
+
+    def decode(self, offset):
+        buf = self._buf
+        tag = buf[offset:offset + 1]
+        pos = offset + 1
+
+        if tag == _DICT:
+            return LazyMapping(self, offset)
+        if tag == _LIST:
+            return LazySequence(self, offset)
+        if tag == _FLOAT_ARRAY:
+            count, = _U32.unpack_from(buf, pos)
+            pos += _U32.size
+            values = array('d')
+            values.frombytes(buf[pos:pos + count * _F64.size])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            return ScheduleValues(values)
+        if tag == _STRING:
+            length, = _U32.unpack_from(buf, pos)
+            pos += _U32.size
+            return bytes(buf[pos:pos + length]).decode('utf-8')
+        if tag == _FLOAT:
+            return _F64.unpack_from(buf, pos)[0]
+        if tag == _INT:
+            return _I64.unpack_from(buf, pos)[0]
+        if tag == _BIG_INT:
+            length, = _U32.unpack_from(buf, pos)
+            pos += _U32.size
+            return int(bytes(buf[pos:pos + length]))
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+
+        raise ValueError(f'Unknown binary RMR node tag {tag!r} at offset {offset}')
+
+
+class LazyMapping(Mapping):
+    """Read-only view of an object in a BinaryRMR; values are decoded on
+    first access and then kept
+    """
+    __slots__ = ('_rmr', '_offsets', '_values')
+
+    def __init__(self, rmr, offset):
+        count, = _U32.unpack_from(rmr._buf, offset + 1)
+        start = offset + 1 + _U32.size
+        keys = rmr._keys
+        self._rmr = rmr
+        self._offsets = {
+            keys[key_index]: child
+            for key_index, child in _DICT_ENTRY.iter_unpack(rmr._buf[start:start + count * _DICT_ENTRY.size])
+        }
+        self._values = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            value = self._values[key] = self._rmr.decode(self._offsets[key])
+            return value
+
+    def __contains__(self, key):
+        return key in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __repr__(self):
+        return f'LazyMapping({list(self._offsets)!r})'
+
+
+class LazySequence(Sequence):
+    """Read-only view of an array in a BinaryRMR; items are decoded on
+    first access and then kept
+    """
+    __slots__ = ('_rmr', '_offsets', '_values')
+
+    def __init__(self, rmr, offset):
+        count, = _U32.unpack_from(rmr._buf, offset + 1)
+        start = offset + 1 + _U32.size
+        self._rmr = rmr
+        self._offsets = array('Q', rmr._buf[start:start + count * _U64.size])
+        if sys.byteorder == 'big':
+            self._offsets.byteswap()
+        self._values = {}
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._offsets)))]
+        if index < 0:
+            index += len(self._offsets)
+        if index < 0 or index >= len(self._offsets):
+            raise IndexError('LazySequence index out of range')
+        try:
+            return self._values[index]
+        except KeyError:
+            value = self._values[index] = self._rmr.decode(self._offsets[index])
+            return value
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, LazySequence)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f'LazySequence(len={len(self._offsets)})'
+
+
+def is_binary_rmr(buf):
+    """Returns True if a bytes-like buffer starts with the binary RMR magic"""
+    return bytes(buf[:len(MAGIC)]) == MAGIC
+
+
+def materialize(obj):
+    """Converts lazy binary RMR views into plain dicts, lists, and floats"""
+    if isinstance(obj, Mapping):
+        return {key: materialize(value) for key, value in obj.items()}
+    if isinstance(obj, ScheduleValues):
+        return obj.tolist()
+    if isinstance(obj, Sequence) and not isinstance(obj, str):
+        return [materialize(value) for value in obj]
+
+    return obj
@@ -0,0 +1,49 @@
+import io
+import pytest
+
+from binary_rmr import BinaryRMR, materialize, write_binary_rmr
+from rct229.utils.schedules import ScheduleValues
+
+test_rmr = {
+    'transformers': [{'name': 'T1', 'capacity': 500.0, 'peak_load': 2 ** 70}, {'name': 'T2', 'efficiency': None}],
+    'schedules': [{'id': 1, 'name': 'S1', 'values': [0.0, 0.5, 1.0]}],
+    'calendar': {'id': 1, 'is_leap_year': False, 'is_daylight_savings_time': True},
+    'building_rotation_angles': [0, 90.0, 'x'],
+    'empty': []
+}
+
+def _binary_rmr(rmr):
+    f = io.BytesIO()
+    write_binary_rmr(rmr, f)
+    return BinaryRMR(f.getvalue())
+
+# Testing BinaryRMR
+def test__binary_rmr__round_trip():
+    assert materialize(_binary_rmr(test_rmr).root) == test_rmr
+
+def test__binary_rmr__lazy_access():
+    root = _binary_rmr(test_rmr).root
+    assert root['transformers'][1]['name'] == 'T2'
+    assert root['transformers'][-1]['efficiency'] is None
+    assert 'calendar' in root
+    assert len(root['transformers']) == 2
+
+def test__binary_rmr__index_out_of_range():
+    transformers = _binary_rmr(test_rmr).root['transformers']
+    for index in [2, -3, -5]:
+        with pytest.raises(IndexError):
+            transformers[index]
+
+def test__binary_rmr__packs_float_arrays():
+    values = _binary_rmr(test_rmr).root['schedules'][0]['values']
+    assert isinstance(values, ScheduleValues)
+    assert values == [0.0, 0.5, 1.0]
+
+def test__binary_rmr__keeps_integer_types():
+    root = _binary_rmr(test_rmr).root
+    assert isinstance(root['calendar']['id'], int)
+    assert root['transformers'][0]['peak_load'] == 2 ** 70
+
+def test__binary_rmr__with_json_input():
+    with pytest.raises(ValueError, match='Not a binary RMR file'):
+        BinaryRMR(b'{"transformers": []}' + bytes(64))
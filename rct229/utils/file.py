@@ -1,12 +1,207 @@
+import bz2
+import gzip
+import io
+import lzma
+import mmap
 import os
 import json
 
-def deserialize_rmr_file(rmr_file):
+from rct229.utils.binary_rmr import BinaryRMR, BINARY_RMR_SUFFIX, file_sha256, is_binary_rmr, MAGIC, write_binary_rmr
+from rct229.utils.instrumentation import instrumented
+from rct229.utils.json_tokenizer import load_projection
+
+# Magic bytes of the supported compression formats
+_COMPRESSION_MAGIC = {
+    'gzip': b'\x1f\x8b',
+    'bzip2': b'BZh',
+    'xz': b'\xfd7zXZ\x00'
+}
+_MAGIC_PEEK_SIZE = 8
+
+# Decompressing wrappers of open binary files by compression format
+_STREAM_OPENERS = {
+    'gzip': lambda f: gzip.GzipFile(fileobj = f, mode = 'rb'),
+    'bzip2': lambda f: bz2.BZ2File(f, mode = 'rb'),
+    'xz': lambda f: lzma.LZMAFile(f, mode = 'rb')
+}
+
+# Compressed file openers by compression format
+_PATH_OPENERS = {
+    'gzip': gzip.open,
+    'bzip2': bz2.open,
+    'xz': lzma.open
+}
+
+# Compression formats by file extension
+_COMPRESSION_SUFFIXES = {
+    '.gz': 'gzip',
+    '.bz2': 'bzip2',
+    '.xz': 'xz'
+}
+
+def _compression_format(head):
+    """Returns the compression format whose magic bytes start head, or None"""
+    for compression, magic in _COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+
+    return None
+
+def _peek(rmr_file, size):
+    """Returns the first bytes of an open binary file without consuming them"""
+    if hasattr(rmr_file, 'peek'):
+        return rmr_file.peek(size)[:size]
+    pos = rmr_file.tell()
+    head = rmr_file.read(size)
+    rmr_file.seek(pos)
+
+    return head
+
+def _open_buffer(rmr_file):
+    """Returns a bytes-like view of an open binary file; regular files are
+    memory mapped rather than read
+    """
+    if isinstance(rmr_file, (io.BufferedReader, io.FileIO)):
+        try:
+            if os.fstat(rmr_file.fileno()).st_size > 0:
+                return mmap.mmap(rmr_file.fileno(), 0, access = mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            pass
+
+    return rmr_file.read()
+
+def _decompressed(rmr_file):
+    """Wraps an open binary file in a streaming decompressor when it starts
+    with the magic bytes of a gzip, bzip2, or xz stream
+    """
+    compression = _compression_format(_peek(rmr_file, _MAGIC_PEEK_SIZE))
+    if compression is None:
+        return rmr_file
+
+    return _STREAM_OPENERS[compression](rmr_file)
+
+def open_output_file(path, mode = 'wt'):
+    """Opens a file for writing, compressing it when the path ends with
+    .gz, .bz2, or .xz
+
+    Parameters
+    ----------
+    path : string
+        The path of the file
+    mode : string
+        'wt' for text or 'wb' for binary output
+
+    Returns
+    -------
+    file
+        The open file
+    """
+    compression = _COMPRESSION_SUFFIXES.get(os.path.splitext(path)[1].lower())
+    if compression is None:
+        return open(path, mode)
+
+    return _PATH_OPENERS[compression](path, mode)
+
+def open_input_file(path):
+    """Opens a file for binary reading, decompressing it as it is read when
+    it is gzip, bzip2, or xz compressed
+
+    Parameters
+    ----------
+    path : string
+        The path of the file
+
+    Returns
+    -------
+    file
+        The open file
+    """
+    with open(path, 'rb') as f:
+        compression = _compression_format(f.read(_MAGIC_PEEK_SIZE))
+    if compression is None:
+        return open(path, 'rb')
+
+    return _PATH_OPENERS[compression](path, 'rb')
+
+def _source_path(rmr_file):
+    """Returns the path of a regular file opened from disk or None"""
+    name = getattr(rmr_file, 'name', None)
+
+    return name if isinstance(name, str) and os.path.isfile(name) else None
+
+@instrumented('deserialize_rmr_file', track_memory = True)
+def deserialize_rmr_file(rmr_file, pointers = None, cache_dir = None, interner = None):
+    """Deserializes an RMR from an open file
+
+    The file may contain RMR JSON or a binary RMR written by compile_rmr();
+    binary RMRs are memory mapped and decoded lazily as they are accessed.
+    Either may be gzip, bzip2, or xz compressed, in which case it is
+    decompressed while it is read.
+
+    Parameters
+    ----------
+    rmr_file : file
+        An RMR file opened in binary mode
+    pointers : iterable of string
+        Optional JSON pointers selecting the parts of the RMR to load, e.g.
+        the rmr_context pointers of the rules to be evaluated. Everything
+        else is skipped while scanning the file, so the result is a
+        partial RMR. By default the whole RMR is loaded.
+    cache_dir : string
+        Optional directory of binary RMRs keyed by the SHA-256 of their
+        source JSON. A cached binary RMR is used in place of parsing the
+        JSON, and a missing one is written after parsing.
+    interner : SubtreeInterner
+        Optional interner, see rct229.utils.structural_sharing, that shares
+        identical subtrees as the JSON is parsed, so duplicates are never
+        held; passing the same interner for each RMR of a trio shares
+        subtrees across them. The result is immutable. Binary RMRs are
+        returned unshared.
+
+    Returns
+    -------
+    dict or Mapping
+        The RMR or None if no file was given
+    """
     #with open(file_name) as f:
     if rmr_file:
-        data = json.load(rmr_file)
+        source_path = _source_path(rmr_file) if cache_dir else None
+        rmr_file = _decompressed(rmr_file)
+
+        if is_binary_rmr(_peek(rmr_file, len(MAGIC))):
+            return BinaryRMR(_open_buffer(rmr_file)).root
+
+        if source_path:
+            source_hash = file_sha256(source_path)
+            cache_path = os.path.join(cache_dir, source_hash.hex() + BINARY_RMR_SUFFIX)
+            if os.path.isfile(cache_path):
+                return BinaryRMR.open(cache_path).root
+
+        if pointers is None or source_path:
+            # The cache always holds the whole RMR
+            if interner is not None:
+                data = json.load(rmr_file, object_pairs_hook = interner.object_pairs_hook)
+            else:
+                data = json.load(rmr_file)
+        else:
+            buf = _open_buffer(rmr_file)
+            try:
+                data = load_projection(buf, pointers)
+            finally:
+                if isinstance(buf, mmap.mmap):
+                    buf.close()
+            if interner is not None:
+                # A projection holds only the parts read by the rules
+                data = interner.intern(data)
+
+        if source_path:
+            os.makedirs(cache_dir, exist_ok = True)
+            temp_path = f'{cache_path}.{os.getpid()}.tmp'
+            with open(temp_path, 'wb') as f:
+                write_binary_rmr(data, f, source_hash)
+            os.replace(temp_path, cache_path)
 
         return data
-        
+
     else:
-        return None
\ No newline at end of file
+        return None
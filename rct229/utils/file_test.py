@@ -0,0 +1,63 @@
+import bz2
+import gzip
+import io
+import json
+import lzma
+import pytest
+
+from file import deserialize_rmr_file, open_input_file, open_output_file
+from structural_sharing import FrozenDict, SubtreeInterner
+
+test_rmr = {'transformers': [{'name': 'T1'}], 'weather': {'climate_zone': 'CZ4A'}}
+test_json = json.dumps(test_rmr).encode()
+
+# Testing deserialize_rmr_file()
+@pytest.mark.parametrize('compress', [lambda b: b, gzip.compress, bz2.compress, lzma.compress])
+def test__deserialize_rmr_file__with_compression(compress):
+    assert deserialize_rmr_file(io.BytesIO(compress(test_json))) == test_rmr
+
+def test__deserialize_rmr_file__with_pointers_and_compression():
+    rmr_file = io.BytesIO(gzip.compress(test_json))
+    assert deserialize_rmr_file(rmr_file, ['/transformers']) == {'transformers': [{'name': 'T1'}]}
+
+def test__deserialize_rmr_file__with_interner_shares_across_rmrs():
+    interner = SubtreeInterner()
+    user_rmr = deserialize_rmr_file(io.BytesIO(test_json), interner = interner)
+    baseline_rmr = deserialize_rmr_file(io.BytesIO(gzip.compress(test_json)), interner = interner)
+    assert user_rmr == test_rmr
+    assert isinstance(user_rmr, FrozenDict)
+    assert user_rmr is baseline_rmr
+
+def test__deserialize_rmr_file__with_interner_and_pointers():
+    interner = SubtreeInterner()
+    rmr = deserialize_rmr_file(io.BytesIO(test_json), ['/transformers'], interner = interner)
+    assert rmr == {'transformers': [{'name': 'T1'}]}
+    assert rmr['transformers'][0] is interner.intern({'name': 'T1'})
+
+def test__deserialize_rmr_file__with_cache_dir(tmp_path):
+    json_path = tmp_path / 'rmr.json'
+    json_path.write_bytes(test_json)
+    cache_dir = str(tmp_path / 'cache')
+    with open(json_path, 'rb') as f:
+        assert deserialize_rmr_file(f, cache_dir = cache_dir) == test_rmr
+    with open(json_path, 'rb') as f:
+        cached_rmr = deserialize_rmr_file(f, cache_dir = cache_dir)
+    assert not isinstance(cached_rmr, dict)
+    assert cached_rmr == test_rmr
+
+# Testing open_output_file()
+@pytest.mark.parametrize('suffix, decompress', [('.json', lambda b: b), ('.json.gz', gzip.decompress), ('.json.xz', lzma.decompress)])
+def test__open_output_file__compresses_by_suffix(tmp_path, suffix, decompress):
+    path = str(tmp_path / ('report' + suffix))
+    with open_output_file(path) as f:
+        f.write('{}')
+    with open(path, 'rb') as f:
+        assert decompress(f.read()) == b'{}'
+
+# Testing open_input_file()
+@pytest.mark.parametrize('compress', [lambda b: b, gzip.compress, bz2.compress, lzma.compress])
+def test__open_input_file__decompresses_by_content(tmp_path, compress):
+    path = tmp_path / 'report.json'
+    path.write_bytes(compress(test_json))
+    with open_input_file(str(path)) as f:
+        assert f.read() == test_json
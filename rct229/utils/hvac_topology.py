@@ -0,0 +1,304 @@
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+
+# Node kinds in the topology graph
+ZONE = 'zone'
+HVAC = 'hvac'
+FLUID_LOOP = 'fluid_loop'
+BOILER = 'boiler'
+CHILLER = 'chiller'
+PUMP = 'pump'
+HEAT_REJECTION = 'heat_rejection'
+
+# The schema defines FluidLoop, Boiler, Chiller, Pump, and HeatRejection but
+# does not yet place them in the RMR tree, so plant equipment is collected from
+# lists stored under these keys wherever they appear in the RMR.
+PLANT_LIST_KEYS = {
+    'fluid_loops': FLUID_LOOP,
+    'boilers': BOILER,
+    'chillers': CHILLER,
+    'pumps': PUMP,
+    'heat_rejections': HEAT_REJECTION
+}
+
+# HVAC system fields that name the fluid loops serving the system
+HVAC_LOOP_NAME_KEYS = [
+    'hot_water_loop_name',
+    'chilled_water_loop_name',
+    'condenser_water_loop_name',
+    'preheat_loop_name',
+    'reheat_loop_name'
+]
+
+# Maximum number of RMRs whose topology is kept by get_hvac_topology()
+TOPOLOGY_CACHE_SIZE = 8
+
+
+class HVACTopology:
+    """Directed graph of the HVAC systems, zones, fluid loops, and plant
+    equipment in a single RMR
+
+    Edges point in the direction of service: plant equipment -> fluid loop ->
+    HVAC system -> zone. Every node is identified by a (kind, name) pair, where
+    kind is one of the node kind constants in this module.
+
+    Traversals are memoised, so repeated queries cost a dictionary lookup.
+    The RMR must not be modified after the topology has been built.
+    """
+
+    def __init__(self, rmr):
+        """Builds the topology for an RMR
+
+        Parameters
+        ----------
+        rmr : dict
+            An RMR as deserialized from JSON
+        """
+        # elements[kind][name] is the RMR element for a node
+        self.elements = {
+            kind: {} for kind in [ZONE, HVAC, FLUID_LOOP, BOILER, CHILLER, PUMP, HEAT_REJECTION]
+        }
+        self._upstream = {}
+        self._downstream = {}
+        self._traversal_cache = {}
+
+        self._build(rmr)
+
+    def _add_node(self, kind, element):
+        name = element.get('name')
+        if name is None:
+            return None
+        self.elements[kind].setdefault(name, element)
+        node = (kind, name)
+        self._upstream.setdefault(node, set())
+        self._downstream.setdefault(node, set())
+
+        return node
+
+    def _add_edge(self, from_node, to_node):
+        """Adds an edge meaning from_node serves to_node"""
+        for node in [from_node, to_node]:
+            self._upstream.setdefault(node, set())
+            self._downstream.setdefault(node, set())
+        self._downstream[from_node].add(to_node)
+        self._upstream[to_node].add(from_node)
+
+    def _build(self, rmr):
+        hvac_names_by_id = {}
+        served_by_blocks = []
+
+        for building in rmr.get('buildings', []):
+            for segment in building.get('building_segments', []):
+                for thermal_block in segment.get('thermal_blocks', []):
+                    zone_nodes = [
+                        self._add_node(ZONE, zone) for zone in thermal_block.get('zones', [])
+                    ]
+                    served_by = thermal_block.get('served_by_heating_ventilation_air_conditioning_systems', [])
+                    if served_by:
+                        served_by_blocks.append((served_by, zone_nodes))
+
+                for hvac in segment.get('heating_ventilation_air_conditioning_systems', []):
+                    hvac_node = self._add_node(HVAC, hvac)
+                    if hvac_node is None:
+                        continue
+                    if 'id' in hvac:
+                        hvac_names_by_id[str(hvac['id'])] = hvac_node
+
+                    for zone in hvac.get('zones_served', []):
+                        zone_node = self._add_node(ZONE, zone)
+                        if zone_node is not None:
+                            self._add_edge(hvac_node, zone_node)
+
+                    for loop_key in HVAC_LOOP_NAME_KEYS:
+                        loop_name = hvac.get(loop_key)
+                        if loop_name is not None:
+                            self._add_edge((FLUID_LOOP, loop_name), hvac_node)
+
+        # Thermal blocks reference the HVAC systems serving them by id
+        for served_by, zone_nodes in served_by_blocks:
+            for hvac_id in served_by:
+                hvac_node = hvac_names_by_id.get(str(hvac_id))
+                if hvac_node is not None:
+                    for zone_node in zone_nodes:
+                        if zone_node is not None:
+                            self._add_edge(hvac_node, zone_node)
+
+        # Plant equipment refers to its fluid loop by loop_name
+        for kind, element in _find_plant_elements(rmr):
+            node = self._add_node(kind, element)
+            loop_name = element.get('loop_name')
+            if node is not None and kind != FLUID_LOOP and loop_name is not None:
+                self._add_edge(node, (FLUID_LOOP, loop_name))
+
+    def _reachable(self, kind, name, target_kind, adjacency):
+        start = (kind, name)
+        found = set()
+        visited = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for next_node in adjacency.get(node, ()):
+                if next_node not in visited:
+                    visited.add(next_node)
+                    stack.append(next_node)
+                    if next_node[0] == target_kind:
+                        found.add(next_node[1])
+
+        return tuple(sorted(found))
+
+    def upstream(self, kind, name, target_kind):
+        """Returns the names of all target_kind nodes that serve a node,
+        directly or indirectly
+
+        Parameters
+        ----------
+        kind : string
+            The kind of the starting node, e.g. ZONE
+        name : string
+            The name of the starting node
+        target_kind : string
+            The kind of the nodes to be returned, e.g. BOILER
+
+        Returns
+        -------
+        tuple of string
+            The sorted names of the matching nodes
+        """
+        key = ('upstream', kind, name, target_kind)
+        if key not in self._traversal_cache:
+            self._traversal_cache[key] = self._reachable(kind, name, target_kind, self._upstream)
+
+        return self._traversal_cache[key]
+
+    def downstream(self, kind, name, target_kind):
+        """Returns the names of all target_kind nodes served by a node,
+        directly or indirectly
+
+        Parameters
+        ----------
+        kind : string
+            The kind of the starting node, e.g. BOILER
+        name : string
+            The name of the starting node
+        target_kind : string
+            The kind of the nodes to be returned, e.g. ZONE
+
+        Returns
+        -------
+        tuple of string
+            The sorted names of the matching nodes
+        """
+        key = ('downstream', kind, name, target_kind)
+        if key not in self._traversal_cache:
+            self._traversal_cache[key] = self._reachable(kind, name, target_kind, self._downstream)
+
+        return self._traversal_cache[key]
+
+    def upstream_total(self, kind, name, target_kind, field):
+        """Sums a numeric field over the target_kind nodes serving a node
+
+        Elements that do not report the field are skipped.
+
+        Parameters
+        ----------
+        kind : string
+            The kind of the starting node
+        name : string
+            The name of the starting node
+        target_kind : string
+            The kind of the serving nodes to be summed
+        field : string
+            The element field to be summed, e.g. 'design_capacity'
+
+        Returns
+        -------
+        float
+            The sum of the field
+        """
+        key = ('upstream_total', kind, name, target_kind, field)
+        if key not in self._traversal_cache:
+            elements = self.elements[target_kind]
+            self._traversal_cache[key] = sum(
+                elements[equip_name].get(field, 0)
+                for equip_name in self.upstream(kind, name, target_kind)
+                if equip_name in elements
+            )
+
+        return self._traversal_cache[key]
+
+    def boilers_serving_zone(self, zone_name):
+        return self.upstream(ZONE, zone_name, BOILER)
+
+    def chillers_serving_zone(self, zone_name):
+        return self.upstream(ZONE, zone_name, CHILLER)
+
+    def hvac_systems_serving_zone(self, zone_name):
+        return self.upstream(ZONE, zone_name, HVAC)
+
+    def zones_served_by_loop(self, loop_name):
+        return self.downstream(FLUID_LOOP, loop_name, ZONE)
+
+    def loop_heating_capacity(self, loop_name):
+        """Total boiler design capacity on a fluid loop in W"""
+        return self.upstream_total(FLUID_LOOP, loop_name, BOILER, 'design_capacity')
+
+    def loop_cooling_capacity(self, loop_name):
+        """Total chiller design capacity on a fluid loop in W"""
+        return self.upstream_total(FLUID_LOOP, loop_name, CHILLER, 'design_capacity')
+
+    def loop_pump_power(self, loop_name):
+        """Total pump power on a fluid loop in W"""
+        return self.upstream_total(FLUID_LOOP, loop_name, PUMP, 'power')
+
+
+def _is_list(obj):
+    return isinstance(obj, Sequence) and not isinstance(obj, str)
+
+
+def _find_plant_elements(rmr):
+    """Yields (kind, element) for each plant element found anywhere in the RMR"""
+    stack = [rmr]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, Mapping):
+            for key, value in obj.items():
+                kind = PLANT_LIST_KEYS.get(key)
+                if kind is not None and _is_list(value):
+                    for element in value:
+                        if isinstance(element, Mapping):
+                            yield kind, element
+                stack.append(value)
+        elif _is_list(obj):
+            # Skip numeric arrays such as schedule values
+            if len(obj) > 0 and (isinstance(obj[0], Mapping) or _is_list(obj[0])):
+                stack.extend(obj)
+
+
+_topology_cache = OrderedDict()
+
+def get_hvac_topology(rmr):
+    """Returns the HVACTopology for an RMR, building it only once per RMR
+
+    Parameters
+    ----------
+    rmr : dict
+        An RMR as deserialized from JSON
+
+    Returns
+    -------
+    HVACTopology
+        The topology of the RMR
+    """
+    key = id(rmr)
+    cached = _topology_cache.get(key)
+    # The RMR is stored with its topology so that its id cannot be reused
+    if cached is not None and cached[0] is rmr:
+        _topology_cache.move_to_end(key)
+        return cached[1]
+
+    topology = HVACTopology(rmr)
+    _topology_cache[key] = (rmr, topology)
+    if len(_topology_cache) > TOPOLOGY_CACHE_SIZE:
+        _topology_cache.popitem(last = False)
+
+    return topology
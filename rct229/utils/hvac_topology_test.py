@@ -0,0 +1,73 @@
+from hvac_topology import get_hvac_topology, HVACTopology, BOILER, FLUID_LOOP, ZONE
+
+test_rmr = {
+    'buildings': [
+        {
+            'id': 1,
+            'name': 'Building 1',
+            'building_segments': [
+                {
+                    'id': 1,
+                    'thermal_blocks': [
+                        {
+                            'zones': [{'id': 1, 'name': 'Zone 1'}, {'id': 2, 'name': 'Zone 2'}],
+                            'served_by_heating_ventilation_air_conditioning_systems': ['2']
+                        },
+                        {
+                            'zones': [{'id': 3, 'name': 'Zone 3'}]
+                        }
+                    ],
+                    'heating_ventilation_air_conditioning_systems': [
+                        {
+                            'id': 1,
+                            'name': 'HVAC 1',
+                            'zones_served': [{'id': 3, 'name': 'Zone 3'}],
+                            'hot_water_loop_name': 'HW Loop 1',
+                            'chilled_water_loop_name': 'CHW Loop 1'
+                        },
+                        {
+                            'id': 2,
+                            'name': 'HVAC 2',
+                            'reheat_loop_name': 'HW Loop 2'
+                        }
+                    ]
+                }
+            ]
+        }
+    ],
+    'fluid_loops': [{'id': 1, 'name': 'HW Loop 1'}, {'id': 2, 'name': 'HW Loop 2'}],
+    'boilers': [
+        {'id': 1, 'name': 'Boiler 1', 'loop_name': 'HW Loop 1', 'design_capacity': 100.0},
+        {'id': 2, 'name': 'Boiler 2', 'loop_name': 'HW Loop 1', 'design_capacity': 50.0},
+        {'id': 3, 'name': 'Boiler 3', 'loop_name': 'HW Loop 2', 'design_capacity': 25.0}
+    ],
+    'chillers': [{'id': 1, 'name': 'Chiller 1', 'loop_name': 'CHW Loop 1', 'design_capacity': 300.0}]
+}
+
+# Testing HVACTopology
+def test__hvac_topology__boilers_serving_zone_by_zones_served():
+    assert HVACTopology(test_rmr).boilers_serving_zone('Zone 3') == ('Boiler 1', 'Boiler 2')
+
+def test__hvac_topology__boilers_serving_zone_by_thermal_block():
+    assert HVACTopology(test_rmr).boilers_serving_zone('Zone 1') == ('Boiler 3',)
+
+def test__hvac_topology__chillers_serving_zone():
+    topology = HVACTopology(test_rmr)
+    assert topology.chillers_serving_zone('Zone 3') == ('Chiller 1',)
+    assert topology.chillers_serving_zone('Zone 1') == ()
+
+def test__hvac_topology__zones_served_by_loop():
+    assert HVACTopology(test_rmr).zones_served_by_loop('HW Loop 2') == ('Zone 1', 'Zone 2')
+
+def test__hvac_topology__loop_heating_capacity():
+    assert HVACTopology(test_rmr).loop_heating_capacity('HW Loop 1') == 150.0
+
+def test__hvac_topology__unknown_node():
+    assert HVACTopology(test_rmr).upstream(ZONE, 'No Zone', BOILER) == ()
+
+def test__hvac_topology__downstream_from_boiler():
+    assert HVACTopology(test_rmr).downstream(BOILER, 'Boiler 3', FLUID_LOOP) == ('HW Loop 2',)
+
+# Testing get_hvac_topology()
+def test__get_hvac_topology__is_memoised():
+    assert get_hvac_topology(test_rmr) is get_hvac_topology(test_rmr)
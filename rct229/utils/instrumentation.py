@@ -0,0 +1,328 @@
+from array import array
+from collections.abc import Mapping, Sequence
+import functools
+import jsonpointer
+import sys
+from time import perf_counter
+import tracemalloc
+
+# The Timings and MemoryTracker collecting measurements, or None when that
+# instrumentation is off
+_active_timings = None
+_active_memory_tracker = None
+
+
+def get_active_timings():
+    """Returns the active Timings or None when instrumentation is off"""
+    return _active_timings
+
+
+def get_active_memory_tracker():
+    """Returns the active MemoryTracker or None when memory tracking is off"""
+    return _active_memory_tracker
+
+
+def call_untimed(name, func, *args, **kwargs):
+    """Calls func; the counterpart of Timings.call() when instrumentation is off"""
+    return func(*args, **kwargs)
+
+
+class Timings:
+    """Wall times and call counts of rule workflow stages and helper functions
+
+    Measurements are attributed to the rule being evaluated: the id of the
+    nearest rule with an id, usually the top-level rule, along with the class
+    of the rule itself, so that nested rules are told apart. Times are
+    inclusive; the rule_check of a list-type rule includes the stages of its
+    nested rule.
+
+    Instrumentation is active inside a with block:
+
+        with Timings() as timings:
+            report = evaluate_rules(rules_list, rmrs)
+        report['timings'] = timings.to_dict()
+    """
+
+    def __init__(self):
+        # (rule_id, rule_class, name) -> [calls, seconds]
+        self.records = {}
+        # rule_id -> {item name: seconds}
+        self.item_seconds = {}
+        self._rule_stack = []
+        self._stage_stack = []
+        self._previous = None
+
+    def __enter__(self):
+        global _active_timings
+        self._previous = _active_timings
+        _active_timings = self
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _active_timings
+        _active_timings = self._previous
+
+    def enter_rule(self, rule):
+        """Attributes measurements to a rule until exit_rule() is called"""
+        rule_id = rule.id
+        if not rule_id and self._rule_stack:
+            rule_id = self._rule_stack[-1][0]
+        self._rule_stack.append((rule_id, type(rule).__name__))
+
+    def exit_rule(self):
+        self._rule_stack.pop()
+
+    def current_rule(self):
+        """Returns (rule_id, rule_class) of the rule being evaluated or
+        (None, None) outside of any rule
+        """
+        return self._rule_stack[-1] if self._rule_stack else (None, None)
+
+    def current_stage(self):
+        """Returns the name of the innermost stage or function being timed or None"""
+        return self._stage_stack[-1] if self._stage_stack else None
+
+    def record(self, name, seconds):
+        """Records a call taking seconds against the current rule"""
+        key = self.current_rule() + (name,)
+        record = self.records.get(key)
+        if record is None:
+            self.records[key] = [1, seconds]
+        else:
+            record[0] += 1
+            record[1] += seconds
+
+    def record_item(self, rule, name, seconds):
+        """Records the evaluation time of an item of a list-type rule"""
+        rule_id = rule.id or self.current_rule()[0]
+        rule_items = self.item_seconds.setdefault(rule_id, {})
+        rule_items[name] = rule_items.get(name, 0.0) + seconds
+
+    def call(self, name, func, *args, **kwargs):
+        """Calls func, recording its wall time under name"""
+        self._stage_stack.append(name)
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.record(name, perf_counter() - start)
+            self._stage_stack.pop()
+
+    def to_dict(self):
+        """Returns the measurements in a JSON-serializable form
+
+        Returns
+        -------
+        dict
+            {
+                stages: [dict] - {rule_id, rule_class, stage, calls, seconds}
+                    for each rule and stage or function, slowest first;
+                    rule_id and rule_class are None outside of any rule
+                items: dict - For each list-type rule id, the seconds spent
+                    evaluating each list item by item name
+            }
+        """
+        stages = [
+            {'rule_id': rule_id, 'rule_class': rule_class, 'stage': name, 'calls': calls, 'seconds': seconds}
+            for (rule_id, rule_class, name), (calls, seconds) in self.records.items()
+        ]
+        stages.sort(key = lambda stage: stage['seconds'], reverse = True)
+
+        return {
+            'stages': stages,
+            'items': {str(rule_id): dict(items) for rule_id, items in self.item_seconds.items()}
+        }
+
+
+class MemoryTracker:
+    """Peak and retained memory of evaluation phases, measured with tracemalloc
+
+    Phases are RMR loading, RMR validation, and the evaluation of each rule
+    with an id. For each phase and rule id, the tracker keeps the number of
+    calls, the largest peak allocated above the memory in use when the phase
+    began, and the total memory still allocated when it ended.
+
+    Memory tracking is active inside a with block, which starts tracemalloc
+    unless it is already tracing:
+
+        with MemoryTracker() as memory:
+            report = evaluate_rules(rules_list, rmrs)
+        report['memory'] = memory.to_dict()
+
+    Python 3.9 or later is needed to measure the peak of each phase; before
+    that the peak is the highest since tracing began.
+    """
+
+    def __init__(self):
+        # (rule_id, phase) -> [calls, peak bytes, retained bytes]
+        self.records = {}
+        # [start bytes, highest peak seen before a nested phase] per open phase
+        self._phase_stack = []
+        self._started_tracing = False
+        self._previous = None
+
+    def __enter__(self):
+        global _active_memory_tracker
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._previous = _active_memory_tracker
+        _active_memory_tracker = self
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _active_memory_tracker
+        _active_memory_tracker = self._previous
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def start_phase(self):
+        current, peak = tracemalloc.get_traced_memory()
+        if self._phase_stack:
+            # Keep the enclosing phase's peak before the peak is reset
+            parent = self._phase_stack[-1]
+            parent[1] = max(parent[1], peak)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        self._phase_stack.append([current, current])
+
+    def end_phase(self, name, rule_id = None):
+        current, peak = tracemalloc.get_traced_memory()
+        start, nested_peak = self._phase_stack.pop()
+        peak = max(peak, nested_peak)
+        if self._phase_stack:
+            parent = self._phase_stack[-1]
+            parent[1] = max(parent[1], peak)
+
+        key = (rule_id, name)
+        record = self.records.get(key)
+        if record is None:
+            record = self.records[key] = [0, 0, 0]
+        record[0] += 1
+        record[1] = max(record[1], peak - start)
+        record[2] += current - start
+
+    def call(self, name, rule_id, func, *args, **kwargs):
+        """Calls func, recording its memory use as a phase"""
+        self.start_phase()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.end_phase(name, rule_id)
+
+    def to_dict(self):
+        """Returns the measurements in a JSON-serializable form
+
+        Returns
+        -------
+        dict
+            {
+                phases: [dict] - {rule_id, phase, calls, peak_bytes,
+                    retained_bytes} for each phase and rule id, largest peak
+                    first; rule_id is None outside of any rule
+            }
+        """
+        phases = [
+            {'rule_id': rule_id, 'phase': name, 'calls': calls, 'peak_bytes': peak, 'retained_bytes': retained}
+            for (rule_id, name), (calls, peak, retained) in self.records.items()
+        ]
+        phases.sort(key = lambda phase: phase['peak_bytes'], reverse = True)
+
+        return {'phases': phases}
+
+
+# Sequences whose items are held inside the object itself
+_FLAT_SEQUENCES = (str, bytes, bytearray, memoryview, array, range)
+
+
+def _slot_values(obj):
+    """Returns the values of the __slots__ attributes set on an object"""
+    values = []
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for slot in slots:
+            if slot in ('__dict__', '__weakref__'):
+                continue
+            try:
+                values.append(getattr(obj, slot))
+            except AttributeError:
+                pass
+
+    return values
+
+
+def deep_sizeof(obj):
+    """Returns the approximate memory used by an object and everything it
+    references through containers, counting shared objects once
+
+    Objects with attributes, including __slots__ such as LazyMapping,
+    LazySequence, and ScheduleValues, are measured through their attributes,
+    so lazy views are not decoded. Other mappings and sequences are measured
+    through their items.
+    """
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, _FLAT_SEQUENCES):
+            continue
+        elif hasattr(obj, '__dict__') or hasattr(type(obj), '__slots__'):
+            if hasattr(obj, '__dict__'):
+                stack.append(vars(obj))
+            stack.extend(_slot_values(obj))
+        elif isinstance(obj, Mapping):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, Sequence):
+            stack.extend(obj)
+
+    return size
+
+
+def instrumented(name, track_memory = False):
+    """Decorates a function so that its calls are timed under name while
+    instrumentation is active; otherwise it costs one extra call
+
+    Parameters
+    ----------
+    name : string
+        The name the calls are recorded under
+    track_memory : bool
+        If True, each call is also recorded as a phase of the active
+        MemoryTracker
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _active_timings
+            memory_tracker = _active_memory_tracker if track_memory else None
+            if timings is None and memory_tracker is None:
+                return func(*args, **kwargs)
+            if memory_tracker is not None:
+                if timings is not None:
+                    return memory_tracker.call(name, None, timings.call, name, func, *args, **kwargs)
+                return memory_tracker.call(name, None, func, *args, **kwargs)
+            return timings.call(name, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# jsonpointer.resolve_pointer, timed while instrumentation is active
+resolve_pointer = instrumented('resolve_pointer')(jsonpointer.resolve_pointer)
@@ -0,0 +1,91 @@
+import io
+
+from rct229.rule_engine.engine import evaluate_rules
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.rules.section15 import Section15Rule1, Section15Rule3
+from rct229.utils.binary_rmr import BinaryRMR, write_binary_rmr
+from rct229.utils.instrumentation import deep_sizeof, get_active_memory_tracker, get_active_timings, instrumented, MemoryTracker, Timings
+from rct229.utils.schedules import ScheduleValues
+
+test_rmrs = UserBaselineProposedVals(
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    {'transformers': [{'name': 'T1'}, {'name': 'T2'}]},
+    {'transformers': [{'name': 'T1'}]}
+)
+
+def _stage(timings_dict, rule_class, stage):
+    return next(
+        record for record in timings_dict['stages']
+        if record['rule_class'] == rule_class and record['stage'] == stage
+    )
+
+# Testing Timings
+def test__timings__active_only_in_with_block():
+    assert get_active_timings() is None
+    with Timings() as timings:
+        assert get_active_timings() is timings
+    assert get_active_timings() is None
+
+def test__instrumented__records_calls():
+    double = instrumented('double')(lambda x: 2 * x)
+    assert double(1) == 2
+    with Timings() as timings:
+        assert double(2) == 4
+        assert double(3) == 6
+    assert timings.records[(None, None, 'double')][0] == 2
+
+def test__timings__evaluate_rules():
+    for columnar in [False, True]:
+        with Timings() as timings:
+            evaluate_rules([Section15Rule1(), Section15Rule3()], test_rmrs, columnar = columnar)
+        timings_dict = timings.to_dict()
+        assert _stage(timings_dict, 'Section15Rule1', 'rule_check')['calls'] == 1
+        assert _stage(timings_dict, 'Section15Rule3', 'match_lists')['calls'] == 1
+        # The nested rule is attributed to the id of its parent
+        nested = [record for record in timings_dict['stages'] if record['rule_id'] == '15-3' and record['stage'] == 'get_context']
+        assert sum(record['calls'] for record in nested) == 3
+        assert _stage(timings_dict, None, 'validate_rmr')['calls'] == 3
+        assert sorted(timings_dict['items']['15-3']) == ['T1', 'T2']
+
+# Testing MemoryTracker
+def test__memory_tracker__records_phases():
+    allocate = instrumented('allocate', track_memory = True)(lambda size: bytearray(size))
+    with MemoryTracker() as memory_tracker:
+        kept = allocate(1000000)
+        memory_tracker.start_phase()
+        allocate(2000000)
+        memory_tracker.end_phase('outer')
+    assert get_active_memory_tracker() is None
+    calls, peak, retained = memory_tracker.records[(None, 'allocate')]
+    assert calls == 2
+    assert peak >= 2000000
+    # Returned objects are still allocated when a phase ends
+    assert retained >= 3000000
+    # A nested peak counts toward the enclosing phase
+    assert memory_tracker.records[(None, 'outer')][1] >= 2000000
+
+def test__memory_tracker__evaluate_rules():
+    with MemoryTracker() as memory_tracker:
+        evaluate_rules([Section15Rule1(), Section15Rule3()], test_rmrs, columnar = True)
+    phases = {(phase['rule_id'], phase['phase']): phase for phase in memory_tracker.to_dict()['phases']}
+    assert phases[(None, 'validate_rmr')]['calls'] == 3
+    assert phases[('15-1', 'evaluate')]['calls'] == 1
+    assert phases[('15-3', 'evaluate_item')]['calls'] == 2
+
+# Testing deep_sizeof()
+def test__deep_sizeof__counts_shared_objects_once():
+    item = {'name': 'x' * 1000}
+    assert deep_sizeof([item, item]) < deep_sizeof([item, {'name': 'y' * 1000}])
+
+def test__deep_sizeof__counts_slots():
+    values = list(range(10000))
+    assert deep_sizeof(ScheduleValues(values)) > 8 * len(values)
+
+def test__deep_sizeof__does_not_decode_lazy_views():
+    f = io.BytesIO()
+    write_binary_rmr({'transformers': [{'name': 'T1'}]}, f)
+    root = BinaryRMR(f.getvalue()).root
+    size = deep_sizeof(root)
+    assert root._values == {}
+    root['transformers'][0]['name']
+    assert deep_sizeof(root) > size
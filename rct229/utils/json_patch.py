@@ -0,0 +1,188 @@
+import copy
+
+UNKNOWN_OP_MSG = 'Unknown JSON patch operation'
+INVALID_PATH_MSG = 'JSON patch path does not exist'
+TEST_FAILED_MSG = 'JSON patch test failed'
+MOVE_INTO_SELF_MSG = 'A JSON patch cannot move a value into itself'
+
+_OPS = ['add', 'remove', 'replace', 'move', 'copy', 'test']
+
+
+def _parse_pointer(pointer):
+    """Splits a JSON pointer into its unescaped reference tokens"""
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+
+    return [token.replace('~1', '/').replace('~0', '~') for token in pointer[1:].split('/')]
+
+
+def _list_index(node, token, pointer, allow_end = False):
+    """Returns the list index of a reference token; '-' is the end of the list"""
+    if token == '-' and allow_end:
+        return len(node)
+    if not token.isdigit() or (len(token) > 1 and token.startswith('0')):
+        raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+    index = int(token)
+    if index > len(node) or (index == len(node) and not allow_end):
+        raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+
+    return index
+
+
+def _get(doc, tokens, pointer):
+    node = doc
+    for token in tokens:
+        if isinstance(node, dict):
+            if token not in node:
+                raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_list_index(node, token, pointer)]
+        else:
+            raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+
+    return node
+
+
+class _Overlay:
+    """Applies patch operations to a document by copying only the containers
+    on the path to each change; everything else stays shared with the
+    original document
+    """
+
+    def __init__(self, doc):
+        self.doc = doc
+        # The containers copied by this overlay by id, which may be changed in
+        # place; holding them keeps their ids from being reused
+        self._owned = {}
+
+    def _own(self, node):
+        if id(node) in self._owned:
+            return node
+        node = dict(node) if isinstance(node, dict) else list(node)
+        self._owned[id(node)] = node
+
+        return node
+
+    def _parent(self, tokens, pointer):
+        """Returns the container holding the target of a path, copying it and
+        every container above it that is still shared
+        """
+        if not isinstance(self.doc, (dict, list)):
+            raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+        self.doc = node = self._own(self.doc)
+        for token in tokens[:-1]:
+            if isinstance(node, dict):
+                if token not in node:
+                    raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+                key = token
+            elif isinstance(node, list):
+                key = _list_index(node, token, pointer)
+            else:
+                raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+            child = node[key]
+            if not isinstance(child, (dict, list)):
+                raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+            node[key] = child = self._own(child)
+            node = child
+
+        return node
+
+    def add(self, pointer, value):
+        tokens = _parse_pointer(pointer)
+        if not tokens:
+            self.doc = value
+            return
+        parent = self._parent(tokens, pointer)
+        if isinstance(parent, dict):
+            parent[tokens[-1]] = value
+        else:
+            parent.insert(_list_index(parent, tokens[-1], pointer, allow_end = True), value)
+
+    def remove(self, pointer):
+        tokens = _parse_pointer(pointer)
+        if not tokens:
+            raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+        parent = self._parent(tokens, pointer)
+        if isinstance(parent, dict):
+            if tokens[-1] not in parent:
+                raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+            return parent.pop(tokens[-1])
+
+        return parent.pop(_list_index(parent, tokens[-1], pointer))
+
+    def replace(self, pointer, value):
+        tokens = _parse_pointer(pointer)
+        if not tokens:
+            self.doc = value
+            return
+        parent = self._parent(tokens, pointer)
+        if isinstance(parent, dict):
+            if tokens[-1] not in parent:
+                raise ValueError(f'{INVALID_PATH_MSG}: {pointer}')
+            parent[tokens[-1]] = value
+        else:
+            parent[_list_index(parent, tokens[-1], pointer)] = value
+
+    def apply(self, operation):
+        op = operation.get('op')
+        pointer = operation.get('path')
+        if op not in _OPS or pointer is None:
+            raise ValueError(f'{UNKNOWN_OP_MSG}: {operation}')
+
+        if op == 'add':
+            self.add(pointer, operation['value'])
+        elif op == 'remove':
+            self.remove(pointer)
+        elif op == 'replace':
+            self.replace(pointer, operation['value'])
+        elif op == 'move':
+            from_pointer = operation['from']
+            if pointer.startswith(from_pointer + '/'):
+                raise ValueError(f'{MOVE_INTO_SELF_MSG}: {from_pointer} to {pointer}')
+            if from_pointer != pointer:
+                self.add(pointer, self.remove(from_pointer))
+        elif op == 'copy':
+            # The copy may be changed later, so it must not share the source
+            value = _get(self.doc, _parse_pointer(operation['from']), operation['from'])
+            self.add(pointer, copy.deepcopy(value))
+        elif op == 'test':
+            if _get(self.doc, _parse_pointer(pointer), pointer) != operation['value']:
+                raise ValueError(f'{TEST_FAILED_MSG}: {pointer}')
+
+
+def apply_patch(doc, patch):
+    """Applies a JSON patch (RFC 6902) to a document as a copy-on-write overlay
+
+    The document is not modified. Only the objects and arrays on the path
+    to each change are copied, so the result shares every unchanged
+    subtree with the document; a large document can be patched many times
+    at the cost of the changes alone. Values added by the patch are used
+    as is, not copied.
+
+    Parameters
+    ----------
+    doc : dict or list
+        The document, e.g. an RMR
+    patch : list of dict
+        JSON patch operations, each with 'op' of 'add', 'remove', 'replace',
+        'move', 'copy', or 'test', a JSON pointer 'path', and 'value' or
+        'from' as the operation requires
+
+    Returns
+    -------
+    dict or list
+        The patched document
+
+    Raises
+    ------
+    ValueError
+        If an operation is unknown, a path does not exist, or a test fails
+    """
+    overlay = _Overlay(doc)
+    for operation in patch:
+        overlay.apply(operation)
+
+    return overlay.doc
@@ -0,0 +1,50 @@
+import pytest
+
+from json_patch import apply_patch
+
+doc = {
+    'transformers': [{'name': 'T1'}, {'name': 'T2'}],
+    'buildings': [{'id': 1, 'name': 'B1', 'building_segments': [{'id': 1}]}],
+    'a/b': {'~c': 1}
+}
+
+# Testing apply_patch()
+def test__apply_patch__operations():
+    patched = apply_patch(doc, [
+        {'op': 'replace', 'path': '/transformers/0/name', 'value': 'T9'},
+        {'op': 'add', 'path': '/transformers/-', 'value': {'name': 'T3'}},
+        {'op': 'remove', 'path': '/transformers/1'},
+        {'op': 'add', 'path': '/a~1b/~0d', 'value': 2},
+        {'op': 'copy', 'from': '/transformers/0', 'path': '/copied'},
+        {'op': 'move', 'from': '/copied', 'path': '/moved'},
+        {'op': 'test', 'path': '/moved/name', 'value': 'T9'}
+    ])
+    assert patched == {
+        'transformers': [{'name': 'T9'}, {'name': 'T3'}],
+        'buildings': doc['buildings'],
+        'a/b': {'~c': 1, '~d': 2},
+        'moved': {'name': 'T9'}
+    }
+
+def test__apply_patch__copies_only_changed_paths():
+    patched = apply_patch(doc, [{'op': 'replace', 'path': '/transformers/1/name', 'value': 'T9'}])
+    assert doc['transformers'][1] == {'name': 'T2'}
+    assert patched['transformers'] is not doc['transformers']
+    assert patched['transformers'][0] is doc['transformers'][0]
+    assert patched['buildings'] is doc['buildings']
+
+def test__apply_patch__empty_patch_shares_document():
+    assert apply_patch(doc, []) is doc
+
+@pytest.mark.parametrize('operation', [
+    {'op': 'remove', 'path': '/missing'},
+    {'op': 'replace', 'path': '/transformers/2', 'value': {}},
+    {'op': 'add', 'path': '/transformers/01', 'value': {}},
+    {'op': 'add', 'path': 'transformers', 'value': {}},
+    {'op': 'test', 'path': '/transformers/0/name', 'value': 'T2'},
+    {'op': 'move', 'from': '/buildings', 'path': '/buildings/0/moved'},
+    {'op': 'update', 'path': '/transformers'}
+])
+def test__apply_patch__invalid_operations(operation):
+    with pytest.raises(ValueError):
+        apply_patch(doc, [operation])
@@ -0,0 +1,383 @@
+import codecs
+import json
+import re
+
+from jsonpointer import JsonPointer
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SCALAR = re.compile(rb'[^,\]}\s]+')
+_TEXT_SEPARATOR = re.compile(r'[ \t\n\r]*(?:,[ \t\n\r]*)?')
+# Consumes everything up to the next bracket outside of a string and captures
+# the bracket. The lookahead and backreference make each run of plain
+# characters atomic, which keeps a failed match on truncated input linear.
+_TO_NEXT_BRACKET = re.compile(rb'(?:(?=([^"\[\]{}]+))\1|"[^"\\]*(?:\\.[^"\\]*)*")*([\[\]{}])', re.S)
+
+_OPEN_OBJECT = ord('{')
+_CLOSE_OBJECT = ord('}')
+_OPEN_ARRAY = ord('[')
+_CLOSE_ARRAY = ord(']')
+_COMMA = ord(',')
+_COLON = ord(':')
+_QUOTE = ord('"')
+_OPENING = (_OPEN_OBJECT, _OPEN_ARRAY)
+
+UNEXPECTED_END_MSG = 'Unexpected end of JSON input'
+
+# Bytes of the buffer decoded at a time by JsonTokenizer.iter_items()
+ITEMS_WINDOW_SIZE = 1 << 20
+
+# Bytes read from the stream at a time by JsonStreamTokenizer
+STREAM_CHUNK_SIZE = 1 << 16
+
+_DECODER = json.JSONDecoder()
+
+
+class JsonTokenizer:
+    """Incremental tokenizer over a JSON document held in a bytes-like buffer
+
+    The buffer may be bytes or an mmap. Values are only turned into Python
+    objects when read_value() is called; skip_value() passes over a value,
+    however large, without building any objects.
+
+    Objects and arrays are walked with a cursor:
+
+        tokenizer.start_object()
+        key = tokenizer.next_key()
+        while key is not None:
+            ... read_value(), skip_value(), or descend ...
+            key = tokenizer.next_key()
+
+        tokenizer.start_array()
+        while tokenizer.next_item():
+            ... read_value(), skip_value(), or descend ...
+    """
+
+    def __init__(self, buf, pos = 0):
+        self.buf = buf
+        self.pos = pos
+        self.end = len(buf)
+
+    def _window(self, window_size):
+        """Returns the next window_size bytes from the cursor and whether
+        they reach the end of input
+        """
+        window_end = min(self.pos + window_size, self.end)
+
+        return bytes(self.buf[self.pos:window_end]), window_end == self.end
+
+    def _skip_whitespace(self):
+        self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+
+    def _expect(self, char):
+        self._skip_whitespace()
+        if self.pos >= self.end:
+            raise ValueError(UNEXPECTED_END_MSG)
+        if self.buf[self.pos] != char:
+            raise ValueError(f'Expected {chr(char)!r} at position {self.pos}')
+        self.pos += 1
+
+    def peek(self):
+        """Returns the first character of the next value or None at the end of input"""
+        self._skip_whitespace()
+
+        return chr(self.buf[self.pos]) if self.pos < self.end else None
+
+    def start_object(self):
+        self._expect(_OPEN_OBJECT)
+
+    def start_array(self):
+        self._expect(_OPEN_ARRAY)
+
+    def next_key(self):
+        """Returns the next key of the current object, leaving the cursor at
+        its value, or None after consuming the closing brace
+        """
+        self._skip_whitespace()
+        if self.pos >= self.end:
+            raise ValueError(UNEXPECTED_END_MSG)
+        char = self.buf[self.pos]
+        if char == _CLOSE_OBJECT:
+            self.pos += 1
+            return None
+        if char == _COMMA:
+            self.pos += 1
+            self._skip_whitespace()
+
+        match = _STRING.match(self.buf, self.pos)
+        if match is None:
+            raise ValueError(f'Expected an object key at position {self.pos}')
+        self.pos = match.end()
+        self._expect(_COLON)
+
+        return json.loads(match.group())
+
+    def next_item(self):
+        """Returns True with the cursor at the next item of the current array,
+        or False after consuming the closing bracket
+        """
+        self._skip_whitespace()
+        if self.pos >= self.end:
+            raise ValueError(UNEXPECTED_END_MSG)
+        char = self.buf[self.pos]
+        if char == _CLOSE_ARRAY:
+            self.pos += 1
+            return False
+        if char == _COMMA:
+            self.pos += 1
+
+        return True
+
+    def skip_value(self):
+        """Moves the cursor past the next value without decoding it"""
+        self._skip_whitespace()
+        if self.pos >= self.end:
+            raise ValueError(UNEXPECTED_END_MSG)
+        char = self.buf[self.pos]
+
+        if char in _OPENING:
+            depth = 0
+            pos = self.pos
+            while True:
+                match = _TO_NEXT_BRACKET.match(self.buf, pos)
+                if match is None:
+                    raise ValueError(UNEXPECTED_END_MSG)
+                pos = match.end()
+                if self.buf[pos - 1] in _OPENING:
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        break
+            self.pos = pos
+
+        elif char == _QUOTE:
+            match = _STRING.match(self.buf, self.pos)
+            if match is None:
+                raise ValueError(UNEXPECTED_END_MSG)
+            self.pos = match.end()
+
+        else:
+            self.pos = _SCALAR.match(self.buf, self.pos).end()
+
+    def read_value(self):
+        """Decodes the next value and moves the cursor past it"""
+        self._skip_whitespace()
+        start = self.pos
+        self.skip_value()
+
+        return json.loads(self.buf[start:self.pos])
+
+    def iter_items(self, window_size = ITEMS_WINDOW_SIZE):
+        """Yields the decoded items of the current array after start_array(),
+        leaving the cursor past the closing bracket
+
+        Items are decoded straight from windows of the buffer, which is much
+        faster than calling read_value() for each of many small items. An
+        item larger than a window is read with read_value().
+        """
+        match_separator = _TEXT_SEPARATOR.match
+        scan_once = _DECODER.scan_once
+        while True:
+            window, final = self._window(window_size)
+            # A multi-byte character cut by the window end is left for the
+            # next window
+            text = codecs.getincrementaldecoder('utf-8')().decode(window, final = final)
+            text_length = len(text)
+            index = 0
+            consumed = 0
+            while True:
+                index = match_separator(text, index).end()
+                if index < text_length and text[index] == ']':
+                    self.pos += len(text[:index + 1].encode('utf-8'))
+                    return
+                try:
+                    value, end = scan_once(text, index)
+                except (StopIteration, ValueError):
+                    break
+                # A number at the window end may continue in the next window
+                if end >= text_length and not final:
+                    break
+                yield value
+                consumed = index = end
+
+            if consumed == 0:
+                if not self.next_item():
+                    return
+                yield self.read_value()
+            else:
+                self.pos += len(text[:consumed].encode('utf-8'))
+
+
+class JsonStreamTokenizer(JsonTokenizer):
+    """JsonTokenizer over a binary file object, e.g. a decompressing stream
+
+    The stream is read a chunk at a time as the cursor advances, and only
+    the bytes from the start of the token being read are held, so a
+    compressed document is walked without decompressing all of it into
+    memory. A value passed to read_value() or skip_value() is held whole
+    while it is read.
+    """
+
+    def __init__(self, stream, chunk_size = STREAM_CHUNK_SIZE):
+        super(JsonStreamTokenizer, self).__init__(bytearray())
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.at_eof = False
+        self._completing = False
+
+    def _read_more(self, keep_from):
+        """Drops the bytes before keep_from and appends the next chunk"""
+        # Reading at least as much as is held keeps the rescans of a large
+        # value linear in its size
+        chunk = self.stream.read(max(self.chunk_size, self.end - keep_from))
+        if not chunk:
+            self.at_eof = True
+        del self.buf[:keep_from]
+        self.buf += chunk
+        self.pos -= keep_from
+        self.end = len(self.buf)
+
+    def _complete(self, method, *args):
+        """Runs a tokenizer method, reading more of the stream and retrying
+        until the token it reads is known not to continue past the bytes held
+        """
+        # A method called by another, e.g. skip_value() by read_value(), is
+        # retried by the outer call
+        if self._completing:
+            return method(self, *args)
+
+        self._completing = True
+        try:
+            while True:
+                start = self.pos
+                try:
+                    result = method(self, *args)
+                    if self.pos < self.end or self.at_eof:
+                        return result
+                except ValueError:
+                    if self.at_eof:
+                        raise
+                self.pos = start
+                self._read_more(start)
+        finally:
+            self._completing = False
+
+    def _window(self, window_size):
+        while self.end - self.pos < window_size and not self.at_eof:
+            self._read_more(self.pos)
+
+        return super(JsonStreamTokenizer, self)._window(window_size)
+
+    def peek(self):
+        return self._complete(JsonTokenizer.peek)
+
+    def start_object(self):
+        self._complete(JsonTokenizer.start_object)
+
+    def start_array(self):
+        self._complete(JsonTokenizer.start_array)
+
+    def next_key(self):
+        return self._complete(JsonTokenizer.next_key)
+
+    def next_item(self):
+        return self._complete(JsonTokenizer.next_item)
+
+    def skip_value(self):
+        self._complete(JsonTokenizer.skip_value)
+
+    def read_value(self):
+        return self._complete(JsonTokenizer.read_value)
+
+
+def _pointer_trie(pointers):
+    """Builds a trie of pointer parts; a None node means the whole subtree is
+    needed, so the trie for the root pointer is None
+    """
+    trie = {}
+    for pointer in pointers:
+        parts = JsonPointer(pointer).parts
+        node = trie
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                break
+            node = node.setdefault(part, child)
+        else:
+            if not parts:
+                return None
+            node[parts[-1]] = None
+
+    return trie
+
+
+def _project(tokenizer, trie):
+    char = tokenizer.peek()
+
+    if char == '{':
+        obj = {}
+        tokenizer.start_object()
+        while True:
+            key = tokenizer.next_key()
+            if key is None:
+                break
+            subtrie = trie.get(key, trie.get('*', False))
+            if subtrie is False:
+                tokenizer.skip_value()
+            elif subtrie is None:
+                obj[key] = tokenizer.read_value()
+            else:
+                obj[key] = _project(tokenizer, subtrie)
+        return obj
+
+    elif char == '[':
+        arr = []
+        # Unneeded items before the last needed index are kept as None so that
+        # array indexes in pointers still resolve
+        last_index = max((int(part) for part in trie if part.isdigit()), default = -1)
+        tokenizer.start_array()
+        index = 0
+        while tokenizer.next_item():
+            subtrie = trie.get(str(index), trie.get('*', False))
+            if subtrie is False:
+                tokenizer.skip_value()
+                if index < last_index:
+                    arr.append(None)
+            elif subtrie is None:
+                arr.append(tokenizer.read_value())
+            else:
+                arr.append(_project(tokenizer, subtrie))
+            index += 1
+        return arr
+
+    # A pointer into a scalar selects the scalar itself
+    return tokenizer.read_value()
+
+
+def load_projection(buf, pointers):
+    """Decodes only the parts of a JSON document selected by JSON pointers
+
+    Subtrees that are not selected are scanned over without ever becoming
+    Python objects. A pointer part of '*' selects every key of an object or
+    every item of an array.
+
+    Parameters
+    ----------
+    buf : bytes-like
+        The JSON document, e.g. bytes or an mmap
+    pointers : iterable of string
+        JSON pointers, each with a leading '/'; the root pointer '' selects
+        the whole document
+
+    Returns
+    -------
+    dict or list
+        A partial document containing only the selected subtrees along with
+        the objects and arrays leading to them
+    """
+    trie = _pointer_trie(pointers)
+    if trie is None:
+        return json.loads(buf[:])
+
+    return _project(JsonTokenizer(buf), trie)
@@ -0,0 +1,108 @@
+import io
+import json
+import pytest
+
+from json_tokenizer import JsonStreamTokenizer, JsonTokenizer, load_projection
+
+test_doc = {
+    'transformers': [{'name': 'T1', 'capacity': 500.0}, {'name': 'T2', 'capacity': 600.0}],
+    'schedules': [{'id': 1, 'name': 'S "1" ]}', 'values': [0.0, 1.5, -2e-3]}],
+    'weather': {'climate_zone': 'CZ4A', 'monthly_ground_temperature': [[1], {'a': []}]},
+    'buildings': [{'id': 1, 'name': 'B1'}, {'id': 2, 'name': 'B2'}, {'id': 3, 'name': 'B3'}]
+}
+test_buf = json.dumps(test_doc, indent=4).encode()
+
+# Testing JsonTokenizer
+def test__json_tokenizer__walks_object_keys():
+    tokenizer = JsonTokenizer(test_buf)
+    tokenizer.start_object()
+    keys = []
+    key = tokenizer.next_key()
+    while key is not None:
+        keys.append(key)
+        tokenizer.skip_value()
+        key = tokenizer.next_key()
+    assert keys == ['transformers', 'schedules', 'weather', 'buildings']
+
+def test__json_tokenizer__reads_array_items():
+    tokenizer = JsonTokenizer(b'[1, "a,]", {"b": [null]}, true]')
+    tokenizer.start_array()
+    items = []
+    while tokenizer.next_item():
+        items.append(tokenizer.read_value())
+    assert items == [1, 'a,]', {'b': [None]}, True]
+
+@pytest.mark.parametrize('window_size', [1, 7, 64, 1 << 20])
+def test__json_tokenizer__iter_items(window_size):
+    items = [12345, 'caf\u00e9 \u2603', {'name': 'T1', 'values': [1.5, None]}, [], True, -0.25]
+    tokenizer = JsonTokenizer(json.dumps({'a': items, 'b': 1}, ensure_ascii = False).encode())
+    tokenizer.start_object()
+    tokenizer.next_key()
+    tokenizer.start_array()
+    assert list(tokenizer.iter_items(window_size)) == items
+    assert tokenizer.next_key() == 'b'
+
+def test__json_tokenizer__iter_items_with_truncated_input():
+    tokenizer = JsonTokenizer(b'[1, {"a": 2')
+    tokenizer.start_array()
+    with pytest.raises(ValueError):
+        list(tokenizer.iter_items(4))
+
+def test__json_tokenizer__with_truncated_input():
+    tokenizer = JsonTokenizer(test_buf[:-10])
+    with pytest.raises(ValueError, match='Unexpected end of JSON input'):
+        tokenizer.skip_value()
+
+# Testing JsonStreamTokenizer
+@pytest.mark.parametrize('chunk_size', [1, 5, 1 << 16])
+def test__json_stream_tokenizer__matches_json_tokenizer(chunk_size):
+    tokenizer = JsonStreamTokenizer(io.BytesIO(test_buf), chunk_size)
+    tokenizer.start_object()
+    values = {}
+    key = tokenizer.next_key()
+    while key is not None:
+        if key == 'transformers':
+            tokenizer.start_array()
+            values[key] = list(tokenizer.iter_items(7))
+        elif key == 'weather':
+            tokenizer.skip_value()
+        else:
+            values[key] = tokenizer.read_value()
+        key = tokenizer.next_key()
+    assert values == {key: value for key, value in test_doc.items() if key != 'weather'}
+    assert tokenizer.peek() is None
+
+def test__json_stream_tokenizer__holds_only_unread_bytes():
+    items = list(range(10000))
+    tokenizer = JsonStreamTokenizer(io.BytesIO(json.dumps(items).encode()), 64)
+    tokenizer.start_array()
+    while tokenizer.next_item():
+        tokenizer.read_value()
+        assert len(tokenizer.buf) <= 128
+
+def test__json_stream_tokenizer__with_truncated_input():
+    tokenizer = JsonStreamTokenizer(io.BytesIO(test_buf[:-10]), 16)
+    with pytest.raises(ValueError, match='Unexpected end of JSON input'):
+        tokenizer.skip_value()
+
+# Testing load_projection()
+def test__load_projection__selects_top_level_subtree():
+    assert load_projection(test_buf, ['/transformers']) == {'transformers': test_doc['transformers']}
+
+def test__load_projection__with_root_pointer():
+    assert load_projection(test_buf, ['', '/transformers']) == test_doc
+
+def test__load_projection__with_nested_pointers():
+    assert load_projection(test_buf, ['/schedules/0/name', '/weather/climate_zone']) == {
+        'schedules': [{'name': 'S "1" ]}'}],
+        'weather': {'climate_zone': 'CZ4A'}
+    }
+
+def test__load_projection__keeps_array_indexes():
+    assert load_projection(test_buf, ['/buildings/1/name']) == {'buildings': [None, {'name': 'B2'}]}
+
+def test__load_projection__with_wildcard():
+    assert load_projection(test_buf, ['/buildings/*/id']) == {'buildings': [{'id': 1}, {'id': 2}, {'id': 3}]}
+
+def test__load_projection__with_no_pointers():
+    assert load_projection(test_buf, []) == {}
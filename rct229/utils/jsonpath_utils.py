@@ -1,4 +1,9 @@
 from jsonpath_ng import parse
 
+from rct229.utils.binary_rmr import materialize
+
 def find_all(jpath, obj):
+    # jsonpath_ng only walks plain dicts and lists
+    if not isinstance(obj, (dict, list)):
+        obj = materialize(obj)
     return [match.value for match in parse(jpath).find(obj)]
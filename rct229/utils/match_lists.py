@@ -1,7 +1,8 @@
 
-from jsonpointer import resolve_pointer
+from rct229.utils.instrumentation import instrumented, resolve_pointer
 import copy
 
+@instrumented('match_lists')
 def match_lists(index_list, list2, id_pointer):
     """Returns a new list of entries taken from list2 that match the
     corresponding entries of index_list. An entry is set to None if there is no
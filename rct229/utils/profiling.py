@@ -0,0 +1,184 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+
+from rct229.utils.instrumentation import get_active_timings, Timings
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.001
+
+PSTATS_SUFFIX = '.pstats'
+SPEEDSCOPE_SUFFIX = '.speedscope.json'
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+
+class _Sampler(threading.Thread):
+    """Samples the stack of a thread at a fixed interval, prefixing each stack
+    with the rule and workflow stage active in timings
+    """
+
+    def __init__(self, thread_id, timings, interval):
+        super(_Sampler, self).__init__(daemon = True)
+        self._thread_id = thread_id
+        self._timings = timings
+        self._interval = interval
+        self._stop_event = threading.Event()
+        self.frames = []
+        self._frame_indexes = {}
+        self.samples = []
+        self.weights = []
+
+    def _frame_index(self, name, file = None, line = None):
+        key = (name, file, line)
+        index = self._frame_indexes.get(key)
+        if index is None:
+            index = self._frame_indexes[key] = len(self.frames)
+            frame = {'name': name}
+            if file is not None:
+                frame['file'] = file
+                frame['line'] = line
+            self.frames.append(frame)
+
+        return index
+
+    def _sample(self):
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return None
+
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(self._frame_index(code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+
+        try:
+            rule_id, rule_class = self._timings.current_rule()
+            stage = self._timings.current_stage()
+        except IndexError:
+            # The stacks changed while they were being read
+            rule_id, rule_class, stage = None, None, None
+        prefix = []
+        if rule_class is not None:
+            prefix.append(self._frame_index(f'rule {rule_id}'))
+            prefix.append(self._frame_index(f'{rule_class}.{stage}' if stage else rule_class))
+        elif stage is not None:
+            prefix.append(self._frame_index(stage))
+
+        return prefix + stack
+
+    def run(self):
+        last = time.perf_counter()
+        while not self._stop_event.wait(self._interval):
+            stack = self._sample()
+            now = time.perf_counter()
+            if stack is not None:
+                self.samples.append(stack)
+                self.weights.append(now - last)
+            last = now
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """Profiles rule evaluation inside a with block
+
+    Two profiles are taken at once:
+        - a deterministic cProfile profile, written in pstats format
+        - a sampling profile of the calling thread, written in the speedscope
+            flame graph format; each sample is rooted at the id of the rule
+            being evaluated and the workflow stage or timed function, e.g.
+            'rule 15-3' > 'Section15Rule3.rule_check'
+
+    Attribution uses a Timings instance, so timings are recorded as well:
+
+        with Profiler('profile') as profiler:
+            report = evaluate_rules(rules_list, rmrs)
+        # Writes profile.pstats and profile.speedscope.json
+    """
+
+    def __init__(self, path_prefix, interval = SAMPLE_INTERVAL, name = 'rct229'):
+        """
+        Parameters
+        ----------
+        path_prefix : string
+            The profiles are written to path_prefix + PSTATS_SUFFIX and
+            path_prefix + SPEEDSCOPE_SUFFIX
+        interval : float
+            Seconds between stack samples
+        name : string
+            The name of the speedscope profile
+        """
+        self.pstats_path = path_prefix + PSTATS_SUFFIX
+        self.speedscope_path = path_prefix + SPEEDSCOPE_SUFFIX
+        self.interval = interval
+        self.name = name
+        self.timings = None
+        self._owns_timings = False
+        self._profile = None
+        self._sampler = None
+        self._start = None
+
+    def __enter__(self):
+        self.timings = get_active_timings()
+        if self.timings is None:
+            self.timings = Timings()
+            self.timings.__enter__()
+            self._owns_timings = True
+
+        self._sampler = _Sampler(threading.get_ident(), self.timings, self.interval)
+        self._start = time.perf_counter()
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._profile.disable()
+        self._sampler.stop()
+        duration = time.perf_counter() - self._start
+        if self._owns_timings:
+            self.timings.__exit__(exc_type, exc_value, traceback)
+
+        directory = os.path.dirname(self.pstats_path)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+        self._profile.dump_stats(self.pstats_path)
+        with open(self.speedscope_path, 'w') as f:
+            json.dump(self.to_speedscope(duration), f)
+
+    def to_speedscope(self, duration = None):
+        """Returns the sampling profile as a speedscope document
+
+        Parameters
+        ----------
+        duration : float
+            The profiled wall time in seconds; defaults to the sum of the
+            sample weights
+        """
+        sampler = self._sampler
+        if duration is None:
+            duration = sum(sampler.weights)
+
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'shared': {'frames': sampler.frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': self.name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': duration,
+                'samples': sampler.samples,
+                'weights': sampler.weights
+            }],
+            'name': self.name,
+            'exporter': 'rct229'
+        }
@@ -0,0 +1,32 @@
+import json
+import pstats
+
+from rct229.rule_engine.engine import evaluate_rules
+from rct229.rule_engine.user_baseline_proposed_vals import UserBaselineProposedVals
+from rct229.rules.section15 import Section15Rule3
+from rct229.utils.instrumentation import get_active_timings
+from rct229.utils.profiling import Profiler
+
+test_rmrs = UserBaselineProposedVals(
+    {'transformers': [{'name': f'T{i}'} for i in range(50)]},
+    {'transformers': [{'name': f'T{i}'} for i in range(50)]},
+    {'transformers': [{'name': f'T{i}'} for i in range(50)]}
+)
+
+# Testing Profiler
+def test__profiler__writes_pstats_and_speedscope(tmp_path):
+    prefix = str(tmp_path / 'profile')
+    with Profiler(prefix, interval = 0.0001) as profiler:
+        evaluate_rules([Section15Rule3()], test_rmrs)
+    assert get_active_timings() is None
+
+    stats = pstats.Stats(profiler.pstats_path)
+    assert any(func[2] == 'evaluate_rules' for func in stats.stats)
+
+    with open(profiler.speedscope_path) as f:
+        speedscope = json.load(f)
+    profile = speedscope['profiles'][0]
+    assert profile['type'] == 'sampled'
+    assert len(profile['samples']) == len(profile['weights']) > 0
+    frame_names = [frame['name'] for frame in speedscope['shared']['frames']]
+    assert 'rule 15-3' in frame_names
@@ -0,0 +1,336 @@
+import json
+import os
+import random
+import types
+
+from rct229.schema.validate import SCHEMA_ENUM_KEY, SCHEMA_ENUM_PATH, SCHEMA_KEY, SCHEMA_PATH
+from rct229.utils.file import open_output_file
+
+RMR_VARIANTS = ('user', 'baseline', 'proposed')
+
+# Number of objects generated per parent object; buildings, transformers,
+# and schedules are per RMR
+DEFAULT_COUNTS = {
+    'buildings': 1,
+    'building_segments': 1,
+    'hvac_systems': 2,
+    'zones': 4,
+    'spaces': 2,
+    'surfaces': 6,
+    'fenestrations': 1,
+    'transformers': 2,
+    'schedules': 4
+}
+
+HOURS_PER_YEAR = 8760
+MONTHS_PER_YEAR = 12
+
+# Ranges of numbers the rules check against tables, by definition and property
+_VALUE_RANGES = {
+    # V-A, within the single-phase range of Table 8.4.4
+    ('Transformer', 'capacity'): (15000.0, 333000.0),
+    ('Transformer', 'efficiency'): (0.97, 0.995),
+}
+
+# Upper bound of numbers the schema does not bound, above their minimum
+_DEFAULT_SPAN = 100.0
+
+# Largest relative change made to the numbers of a diverging object
+_DIVERGENCE_SCALE = 0.2
+
+# Suffix of string properties naming a schedule
+_SCHEDULE_NAME_SUFFIX = '_schedule_name'
+
+
+def _load_definitions():
+    """Returns the definitions of the RMR schema and its enumerations by schema key"""
+    definitions = {}
+    for key, path in ((SCHEMA_KEY, SCHEMA_PATH), (SCHEMA_ENUM_KEY, SCHEMA_ENUM_PATH)):
+        with open(path) as json_file:
+            definitions[key] = json.load(json_file)['definitions']
+
+    return definitions
+
+
+def _scalar_fields(definitions, definition_name):
+    """Returns (property, kind, arg) for each property of a schema definition
+    that the generator fills with a random value
+
+    kind is 'number' with arg (minimum, maximum), 'enum' with the list of
+    values as arg, 'boolean', or 'schedule' for the name of a schedule.
+    Ids, names, arrays, and nested objects are left to the generator.
+    """
+    fields = []
+    properties = definitions[SCHEMA_KEY][definition_name]['properties']
+    for prop, prop_schema in properties.items():
+        if prop in ('id', 'name'):
+            continue
+
+        ref = prop_schema.get('$ref')
+        if ref is not None:
+            schema_key, ref_name = ref.split('#/definitions/')
+            ref_schema = definitions[schema_key][ref_name]
+            if 'enum' in ref_schema:
+                fields.append((prop, 'enum', ref_schema['enum']))
+            continue
+
+        prop_type = prop_schema.get('type')
+        if prop_type == 'number':
+            value_range = _VALUE_RANGES.get((definition_name, prop))
+            if value_range is None:
+                minimum = prop_schema.get('minimum', prop_schema.get('exclusiveMinimum', 0.0))
+                value_range = (minimum, prop_schema.get('maximum', minimum + _DEFAULT_SPAN))
+            fields.append((prop, 'number', value_range))
+        elif prop_type == 'boolean':
+            fields.append((prop, 'boolean', None))
+        elif prop_type == 'string' and prop.endswith(_SCHEDULE_NAME_SUFFIX):
+            fields.append((prop, 'schedule', None))
+
+    return fields
+
+
+def write_json(value, stream):
+    """Writes a value as JSON, writing generators as arrays one item at a
+    time so that the value never has to be held in memory as a whole
+
+    Parameters
+    ----------
+    value : object
+        A JSON-serializable value, where any dict or list may contain
+        generators in place of lists
+    stream : file
+        A file open for text writing
+    """
+    if isinstance(value, types.GeneratorType):
+        stream.write('[')
+        for index, item in enumerate(value):
+            if index:
+                stream.write(', ')
+            write_json(item, stream)
+        stream.write(']')
+    elif isinstance(value, dict) and any(isinstance(item, (dict, types.GeneratorType)) for item in value.values()):
+        stream.write('{')
+        for index, (key, item) in enumerate(value.items()):
+            if index:
+                stream.write(', ')
+            stream.write(json.dumps(key))
+            stream.write(': ')
+            write_json(item, stream)
+        stream.write('}')
+    else:
+        stream.write(json.dumps(value))
+
+
+class RMRGenerator:
+    """Generates synthetic RMRs that are valid against ASHRAE229.schema.json
+
+    Each RMR has buildings made of building segments, each with HVAC systems
+    and a thermal block of zones; zones hold spaces, spaces hold surfaces, and
+    surfaces hold fenestrations. Transformers, 8760-hour schedules, and the
+    weather are at the top level. Every object gets a random value for each
+    number, enumeration, boolean, and schedule name property in its schema
+    definition.
+
+    The RMRs of a trio share the same objects, ids, and names and are
+    identical except that, in the baseline and proposed RMRs, each object
+    diverges from the user RMR with probability divergence: its numbers
+    are scaled by up to _DIVERGENCE_SCALE and its enumerations chosen anew.
+    The output depends only on the counts, the seed, and the divergence.
+
+        generator = RMRGenerator({'zones': 100}, seed = 1, divergence = 0.1)
+        with open('baseline_rmr.json', 'w') as f:
+            generator.write(f, 'baseline')
+    """
+
+    def __init__(self, counts = None, seed = 0, divergence = 0.0):
+        """
+        Parameters
+        ----------
+        counts : dict
+            Overrides of DEFAULT_COUNTS
+        seed : int
+            The seed of the random values
+        divergence : float
+            The fraction of objects of the baseline and proposed RMRs whose
+            values differ from the user RMR, from 0 to 1
+        """
+        unknown = set(counts or {}) - set(DEFAULT_COUNTS)
+        if unknown:
+            raise ValueError(f"Unknown counts: {', '.join(sorted(unknown))}")
+        if not 0.0 <= divergence <= 1.0:
+            raise ValueError('divergence must be between 0 and 1')
+
+        self.counts = dict(DEFAULT_COUNTS, **(counts or {}))
+        self.seed = seed
+        self.divergence = divergence
+
+        definitions = _load_definitions()
+        self._fields = {
+            name: _scalar_fields(definitions, name) for name in (
+                'Building', 'BuildingSegment', 'HeatingVentilationAirConditioningSystem', 'Zone',
+                'Space', 'Surface', 'Fenestration', 'Transformer', 'Schedule', 'Weather'
+            )
+        }
+        self._schedule_names = [f'Schedule {index + 1}' for index in range(self.counts['schedules'])]
+
+        # The state of the RMR being written
+        self._rng = None
+        self._diverge_rng = None
+        self._diverges = False
+        self._ids = None
+
+    def write(self, stream, variant = 'user'):
+        """Writes an RMR of the trio as JSON
+
+        Parameters
+        ----------
+        stream : file
+            A file open for text writing
+        variant : string
+            'user', 'baseline', or 'proposed'
+        """
+        if variant not in RMR_VARIANTS:
+            raise ValueError(f'Unknown RMR variant: {variant}')
+
+        # Values common to the trio come from _rng and divergence from
+        # _diverge_rng, so that diverging objects do not shift the values
+        # of the objects after them
+        self._rng = random.Random(self.seed)
+        self._diverge_rng = random.Random(f'{self.seed}:{variant}')
+        self._diverges = variant != 'user'
+        self._ids = {}
+
+        write_json(self._rmr(), stream)
+
+    def _repeat(self, make_object, count_key, *args):
+        for _ in range(self.counts[count_key]):
+            yield make_object(*args)
+
+    def _object(self, definition_name):
+        """Returns an object of a schema definition with its id, name, and
+        random scalar values
+        """
+        object_id = self._ids.get(definition_name, 0) + 1
+        self._ids[definition_name] = object_id
+        obj = {'id': object_id, 'name': f'{definition_name} {object_id}'}
+
+        rng = self._rng
+        diverges = self._diverges and self._diverge_rng.random() < self.divergence
+        for prop, kind, arg in self._fields[definition_name]:
+            if kind == 'number':
+                minimum, maximum = arg
+                value = rng.uniform(minimum, maximum)
+                if diverges:
+                    value *= 1.0 + self._diverge_rng.uniform(-_DIVERGENCE_SCALE, _DIVERGENCE_SCALE)
+                    value = min(max(value, minimum), maximum)
+                obj[prop] = round(value, 4)
+            elif kind == 'enum':
+                obj[prop] = rng.choice(arg)
+                if diverges:
+                    obj[prop] = self._diverge_rng.choice(arg)
+            elif kind == 'boolean':
+                obj[prop] = rng.random() < 0.5
+            elif kind == 'schedule' and self._schedule_names:
+                obj[prop] = rng.choice(self._schedule_names)
+
+        return obj
+
+    def _rmr(self):
+        return {
+            'transformers': self._repeat(self._transformer, 'transformers'),
+            'buildings': self._repeat(self._building, 'buildings'),
+            'schedules': self._repeat(self._schedule, 'schedules'),
+            'weather': self._weather()
+        }
+
+    def _transformer(self):
+        transformer = self._object('Transformer')
+        # Transformers are identified by name only
+        del transformer['id']
+
+        return transformer
+
+    def _building(self):
+        building = self._object('Building')
+        building['building_segments'] = self._repeat(self._building_segment, 'building_segments')
+
+        return building
+
+    def _building_segment(self):
+        segment = self._object('BuildingSegment')
+        del segment['name']
+        hvac_systems = [
+            self._object('HeatingVentilationAirConditioningSystem') for _ in range(self.counts['hvac_systems'])
+        ]
+        segment['thermal_blocks'] = (block for block in [{
+            'zones': self._repeat(self._zone, 'zones'),
+            'served_by_heating_ventilation_air_conditioning_systems': [system['name'] for system in hvac_systems]
+        }])
+        segment['heating_ventilation_air_conditioning_systems'] = hvac_systems
+
+        return segment
+
+    def _zone(self):
+        zone = self._object('Zone')
+        zone['spaces'] = self._repeat(self._space, 'spaces')
+
+        return zone
+
+    def _space(self):
+        space = self._object('Space')
+        space['surfaces'] = self._repeat(self._surface, 'surfaces')
+
+        return space
+
+    def _surface(self):
+        surface = self._object('Surface')
+        surface['fenestration_subsurfaces'] = self._repeat(self._object, 'fenestrations', 'Fenestration')
+
+        return surface
+
+    def _schedule(self):
+        schedule = self._object('Schedule')
+        rng = self._rng
+        schedule['values'] = [round(rng.random(), 2) for _ in range(HOURS_PER_YEAR)]
+
+        return schedule
+
+    def _weather(self):
+        weather = self._object('Weather')
+        del weather['id']
+        del weather['name']
+        rng = self._rng
+        weather['monthly_ground_temperature'] = [round(rng.uniform(0.0, 25.0), 1) for _ in range(MONTHS_PER_YEAR)]
+
+        return weather
+
+
+def write_rmr_trio(directory, counts = None, seed = 0, divergence = 0.0, extension = '.json'):
+    """Writes a synthetic user, baseline, and proposed RMR trio
+
+    Parameters
+    ----------
+    directory : string
+        The directory to write user_rmr.json, baseline_rmr.json, and
+        proposed_rmr.json to
+    counts, seed, divergence
+        See RMRGenerator
+    extension : string
+        The file extension; the files are compressed when it ends with .gz,
+        .bz2, or .xz
+
+    Returns
+    -------
+    list of string
+        The paths of the user, baseline, and proposed RMRs
+    """
+    generator = RMRGenerator(counts, seed, divergence)
+    os.makedirs(directory, exist_ok = True)
+    paths = []
+    for variant in RMR_VARIANTS:
+        path = os.path.join(directory, f'{variant}_rmr{extension}')
+        with open_output_file(path) as f:
+            generator.write(f, variant)
+        paths.append(path)
+
+    return paths
@@ -0,0 +1,62 @@
+import io
+import os
+import json
+import pytest
+
+from rct229.schema.validate import validate_rmr
+from rmr_generator import RMRGenerator, write_json, write_rmr_trio
+
+SMALL_COUNTS = {'zones': 2, 'spaces': 1, 'surfaces': 2, 'schedules': 1}
+
+
+def _generate(generator, variant):
+    stream = io.StringIO()
+    generator.write(stream, variant)
+
+    return json.loads(stream.getvalue())
+
+# Testing write_json()
+def test__write_json__writes_generators_as_arrays():
+    stream = io.StringIO()
+    write_json({'a': (i for i in range(3)), 'b': {'c': (s for s in ['x'])}, 'd': 1}, stream)
+    assert json.loads(stream.getvalue()) == {'a': [0, 1, 2], 'b': {'c': ['x']}, 'd': 1}
+
+# Testing RMRGenerator
+def test__rmr_generator__rmrs_are_schema_valid():
+    generator = RMRGenerator(SMALL_COUNTS, seed = 1, divergence = 0.5)
+    for variant in ['user', 'baseline', 'proposed']:
+        assert validate_rmr(_generate(generator, variant)) == {'passed': True, 'error': None}
+
+def test__rmr_generator__counts():
+    rmr = _generate(RMRGenerator(dict(SMALL_COUNTS, buildings = 2, transformers = 3)), 'user')
+    assert len(rmr['transformers']) == 3
+    assert len(rmr['buildings']) == 2
+    zones = rmr['buildings'][1]['building_segments'][0]['thermal_blocks'][0]['zones']
+    assert [zone['id'] for zone in zones] == [3, 4]
+    assert len(zones[0]['spaces'][0]['surfaces']) == 2
+    assert len(rmr['schedules'][0]['values']) == 8760
+
+def test__rmr_generator__is_deterministic():
+    first = _generate(RMRGenerator(SMALL_COUNTS, seed = 7, divergence = 0.5), 'baseline')
+    second = _generate(RMRGenerator(SMALL_COUNTS, seed = 7, divergence = 0.5), 'baseline')
+    assert first == second
+    assert first != _generate(RMRGenerator(SMALL_COUNTS, seed = 8, divergence = 0.5), 'baseline')
+
+def test__rmr_generator__divergence():
+    generator = RMRGenerator(dict(SMALL_COUNTS, transformers = 50), seed = 3, divergence = 0.0)
+    assert _generate(generator, 'user') == _generate(generator, 'baseline')
+
+    generator = RMRGenerator(dict(SMALL_COUNTS, transformers = 50), seed = 3, divergence = 1.0)
+    user_rmr = _generate(generator, 'user')
+    proposed_rmr = _generate(generator, 'proposed')
+    assert [t['name'] for t in user_rmr['transformers']] == [t['name'] for t in proposed_rmr['transformers']]
+    assert user_rmr['transformers'] != proposed_rmr['transformers']
+
+def test__rmr_generator__rejects_unknown_counts():
+    with pytest.raises(ValueError):
+        RMRGenerator({'floors': 2})
+
+# Testing write_rmr_trio()
+def test__write_rmr_trio__writes_compressed_files(tmp_path):
+    paths = write_rmr_trio(str(tmp_path), SMALL_COUNTS, extension = '.json.gz')
+    assert [os.path.basename(path) for path in paths] == ['user_rmr.json.gz', 'baseline_rmr.json.gz', 'proposed_rmr.json.gz']
@@ -0,0 +1,289 @@
+from collections import OrderedDict
+from functools import wraps
+
+from rct229.utils.schedules import ScheduleValues
+
+HOURS_PER_DAY = 24
+DAYS_PER_MONTH = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+LEAP_YEAR_DAYS_PER_MONTH = [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+YEAR_HOURS = 8760
+LEAP_YEAR_HOURS = 8784
+
+# Seasons as lists of 0-based month indices
+SEASON_MONTHS = {
+    'winter': [11, 0, 1],
+    'spring': [2, 3, 4],
+    'summer': [5, 6, 7],
+    'fall': [8, 9, 10]
+}
+
+# Maximum number of memoised results and of RMR schedule indexes kept
+RESULT_CACHE_SIZE = 4096
+INDEX_CACHE_SIZE = 8
+
+_result_cache = OrderedDict()
+_index_cache = OrderedDict()
+
+
+def _memoised_by_content(func):
+    """Memoises a schedule function by the content hash of its values
+
+    The wrapped function receives the values as a ScheduleValues; plain lists
+    are packed first so that they share results with identical schedules.
+    """
+    @wraps(func)
+    def wrapper(values, *args):
+        if not isinstance(values, ScheduleValues):
+            values = ScheduleValues(values)
+        key = (func.__name__, values.content_hash, args)
+        if key in _result_cache:
+            _result_cache.move_to_end(key)
+            return _result_cache[key]
+
+        result = func(values, *args)
+        _result_cache[key] = result
+        if len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last = False)
+
+        return result
+
+    return wrapper
+
+
+def _open_hour_slices(values, open_time, close_time):
+    """Returns one strided slice of the values for each open hour of the day
+
+    open_time and close_time are hours ending, 1 to 24, as in the schema:
+    hour ending h covers the 0-based hour of the day h - 1. The building is
+    open from the hour ending open_time through the hour ending close_time;
+    when close_time is earlier than open_time the open period wraps past
+    midnight.
+    """
+    OUT_OF_RANGE_MSG = 'Building open and close times must be hours ending from 1 to 24'
+
+    if not (1 <= open_time <= HOURS_PER_DAY and 1 <= close_time <= HOURS_PER_DAY):
+        raise ValueError(f'{OUT_OF_RANGE_MSG}: {open_time}, {close_time}')
+    open_hour = int(open_time) - 1
+    close_hour = int(close_time) - 1
+    if open_hour <= close_hour:
+        hours = range(open_hour, close_hour + 1)
+    else:
+        hours = list(range(open_hour, HOURS_PER_DAY)) + list(range(0, close_hour + 1))
+
+    packed = values._values
+    return [packed[hour::HOURS_PER_DAY] for hour in hours]
+
+
+def _month_bounds(values):
+    """Returns the (start, end) hours of each month of a full year of values"""
+    NOT_A_YEAR_MSG = 'Schedule values must cover a full year of 8760 or 8784 hours, not'
+
+    if len(values) not in (YEAR_HOURS, LEAP_YEAR_HOURS):
+        raise ValueError(f'{NOT_A_YEAR_MSG} {len(values)}')
+    days_per_month = LEAP_YEAR_DAYS_PER_MONTH if len(values) == LEAP_YEAR_HOURS else DAYS_PER_MONTH
+    bounds = []
+    start = 0
+    for days in days_per_month:
+        end = start + days * HOURS_PER_DAY
+        bounds.append((start, end))
+        start = end
+
+    return bounds
+
+
+@_memoised_by_content
+def equivalent_full_load_hours(values):
+    """Returns the equivalent full-load hours of a schedule
+
+    This is the sum of the hourly values divided by the peak value.
+
+    Parameters
+    ----------
+    values : sequence of float
+        Hourly schedule values
+
+    Returns
+    -------
+    float
+        The equivalent full-load hours; 0 if the peak value is not positive
+    """
+    peak = max(values._values, default = 0)
+    if peak <= 0:
+        return 0.0
+
+    return sum(values._values) / peak
+
+
+@_memoised_by_content
+def operating_hours(values, open_time, close_time):
+    """Returns the number of hours with a non-zero value while the building is open
+
+    Parameters
+    ----------
+    values : sequence of float
+        Hourly schedule values
+    open_time : float
+        Building open_time, the hour ending (1-24) in which the building opens
+    close_time : float
+        Building close_time, the last hour ending (1-24) in which the
+        building is open
+
+    Returns
+    -------
+    int
+        The number of open hours with a non-zero schedule value
+
+    Raises
+    ------
+    ValueError
+        If open_time or close_time is not from 1 to 24
+    """
+    return sum(
+        len(hour_values) - hour_values.count(0.0)
+        for hour_values in _open_hour_slices(values, open_time, close_time)
+    )
+
+
+@_memoised_by_content
+def open_hours_full_load_hours(values, open_time, close_time):
+    """Returns the sum of the schedule values while the building is open
+
+    Parameters
+    ----------
+    values : sequence of float
+        Hourly schedule values
+    open_time : float
+        Building open_time, the hour ending (1-24) in which the building opens
+    close_time : float
+        Building close_time, the last hour ending (1-24) in which the
+        building is open
+
+    Returns
+    -------
+    float
+        The sum of the values over the open hours
+
+    Raises
+    ------
+    ValueError
+        If open_time or close_time is not from 1 to 24
+    """
+    return sum(sum(hour_values) for hour_values in _open_hour_slices(values, open_time, close_time))
+
+
+@_memoised_by_content
+def monthly_means(values):
+    """Returns the mean schedule value for each month
+
+    Parameters
+    ----------
+    values : sequence of float
+        Hourly schedule values for a full year of 8760 or 8784 hours
+
+    Returns
+    -------
+    tuple of float
+        The twelve monthly means
+
+    Raises
+    ------
+    ValueError
+        If the values are not for a full year
+    """
+    packed = values._values
+    return tuple(sum(packed[start:end]) / (end - start) for start, end in _month_bounds(values))
+
+
+@_memoised_by_content
+def seasonal_means(values):
+    """Returns the mean schedule value for each season
+
+    Seasons are winter (Dec-Feb), spring (Mar-May), summer (Jun-Aug), and
+    fall (Sep-Nov).
+
+    Parameters
+    ----------
+    values : sequence of float
+        Hourly schedule values for a full year of 8760 or 8784 hours
+
+    Returns
+    -------
+    dict
+        The mean value keyed by season name
+
+    Raises
+    ------
+    ValueError
+        If the values are not for a full year
+    """
+    packed = values._values
+    bounds = _month_bounds(values)
+    means = {}
+    for season, months in SEASON_MONTHS.items():
+        total = sum(sum(packed[bounds[month][0]:bounds[month][1]]) for month in months)
+        hours = sum(bounds[month][1] - bounds[month][0] for month in months)
+        means[season] = total / hours
+
+    return means
+
+
+def get_schedule_values(rmr, schedule_name):
+    """Returns the values of the schedule with the given name
+
+    The name index is built once per RMR.
+
+    Parameters
+    ----------
+    rmr : dict
+        An RMR as deserialized from JSON
+    schedule_name : string
+        The name of the schedule
+
+    Returns
+    -------
+    ScheduleValues
+        The schedule values or None if there is no such schedule
+    """
+    key = id(rmr)
+    cached = _index_cache.get(key)
+    # The RMR is stored with its index so that its id cannot be reused
+    if cached is not None and cached[0] is rmr:
+        _index_cache.move_to_end(key)
+        index = cached[1]
+    else:
+        index = {}
+        for schedule in rmr.get('schedules', []):
+            if 'name' in schedule and 'values' in schedule:
+                values = schedule['values']
+                index[schedule['name']] = values if isinstance(values, ScheduleValues) else ScheduleValues(values)
+        _index_cache[key] = (rmr, index)
+        if len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last = False)
+
+    return index.get(schedule_name)
+
+
+def get_element_schedule_values(rmr, element, schedule_name_key):
+    """Returns the values of the schedule referenced by an RMR element
+
+    Parameters
+    ----------
+    rmr : dict
+        The RMR containing the element
+    element : dict
+        An RMR element such as an InteriorLighting or Space
+    schedule_name_key : string
+        The element field naming the schedule, e.g. 'lighting_schedule_name'
+        or 'infiltration_schedule_name'
+
+    Returns
+    -------
+    ScheduleValues
+        The schedule values or None if the element does not reference an
+        existing schedule
+    """
+    schedule_name = element.get(schedule_name_key)
+    if schedule_name is None:
+        return None
+
+    return get_schedule_values(rmr, schedule_name)
@@ -0,0 +1,70 @@
+import pytest
+
+from schedule_analytics import (
+    equivalent_full_load_hours,
+    get_element_schedule_values,
+    monthly_means,
+    open_hours_full_load_hours,
+    operating_hours,
+    seasonal_means
+)
+
+# Lights at 1.0 in the hours ending 9 to 17 every day, otherwise 0.5 in January and 0 after
+office_values = [
+    1.0 if 8 <= hour % 24 < 17 else (0.5 if hour < 744 else 0.0)
+    for hour in range(8760)
+]
+
+# Testing equivalent_full_load_hours()
+def test__equivalent_full_load_hours__with_fractional_schedule():
+    assert equivalent_full_load_hours(office_values) == 365 * 9 + 31 * 15 * 0.5
+
+def test__equivalent_full_load_hours__with_zero_schedule():
+    assert equivalent_full_load_hours([0.0] * 8760) == 0.0
+
+# Testing operating_hours() and open_hours_full_load_hours()
+def test__operating_hours__within_open_hours():
+    assert operating_hours(office_values, 9, 17) == 365 * 9
+
+def test__operating_hours__with_open_period_past_midnight():
+    assert operating_hours(office_values, 22, 2) == 31 * 5
+
+def test__operating_hours__open_all_day():
+    assert operating_hours([1.0] * 8760, 1, 24) == 8760
+
+def test__operating_hours__open_in_first_hour_only():
+    assert operating_hours([1.0] * 8760, 1, 1) == 365
+
+def test__operating_hours__open_in_last_hour_only():
+    assert operating_hours([1.0] * 8760, 24, 24) == 365
+
+def test__operating_hours__with_time_out_of_range():
+    with pytest.raises(ValueError):
+        operating_hours(office_values, 0, 17)
+
+def test__open_hours_full_load_hours__within_open_hours():
+    assert open_hours_full_load_hours(office_values, 8, 17) == 365 * 9 + 31 * 0.5
+
+# Testing monthly_means() and seasonal_means()
+def test__monthly_means__values():
+    means = monthly_means(office_values)
+    assert len(means) == 12
+    assert means[0] == pytest.approx((9 + 15 * 0.5) / 24)
+    assert means[6] == pytest.approx(9 / 24)
+
+def test__monthly_means__with_partial_year():
+    with pytest.raises(ValueError):
+        monthly_means([1.0] * 24)
+
+def test__seasonal_means__summer():
+    assert seasonal_means(office_values)['summer'] == pytest.approx(9 / 24)
+
+# Testing get_element_schedule_values()
+def test__get_element_schedule_values__by_lighting_schedule_name():
+    rmr = {'schedules': [{'id': 1, 'name': 'Office Lighting', 'values': office_values}]}
+    values = get_element_schedule_values(rmr, {'lighting_schedule_name': 'Office Lighting'}, 'lighting_schedule_name')
+    assert values == office_values
+
+def test__get_element_schedule_values__with_missing_schedule():
+    rmr = {'schedules': []}
+    assert get_element_schedule_values(rmr, {'infiltration_schedule_name': 'None'}, 'infiltration_schedule_name') is None
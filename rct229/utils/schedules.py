@@ -0,0 +1,148 @@
+from array import array
+from collections.abc import Sequence
+import hashlib
+
+
+def _numbers(values):
+    """Yields the values, raising TypeError at the first that is not an int
+    or a float
+    """
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError(f'Schedule values must be numbers, not {type(value).__name__}')
+        yield value
+
+
+class ScheduleValues(Sequence):
+    """Read-only sequence of schedule values stored in a packed array of doubles
+
+    Behaves like the list of numbers it replaces for indexing, slicing,
+    iteration, len(), and equality, while using a fraction of the memory.
+    Instances are identified by a hash of their content, so identical
+    schedules can be shared across RMRs.
+    """
+    __slots__ = ('_values', 'content_hash')
+
+    def __init__(self, values):
+        """
+        Parameters
+        ----------
+        values : iterable of float
+            The schedule values
+
+        Raises
+        ------
+        TypeError
+            If a value is not an int or a float; booleans are refused
+            rather than stored as 1.0 and 0.0
+        """
+        if isinstance(values, array) and values.typecode == 'd':
+            self._values = values
+        else:
+            self._values = array('d', _numbers(values))
+        self.content_hash = hashlib.blake2b(self._values.tobytes(), digest_size = 16).hexdigest()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ScheduleValues(self._values[index])
+        return self._values[index]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, ScheduleValues):
+            return self is other or self.content_hash == other.content_hash
+        if isinstance(other, (list, tuple, array)):
+            return len(other) == len(self._values) and all(a == b for a, b in zip(self._values, other))
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.content_hash)
+
+    def __repr__(self):
+        return f'ScheduleValues(len={len(self._values)}, content_hash={self.content_hash!r})'
+
+    def __reduce__(self):
+        return (ScheduleValues, (self._values,))
+
+    def tolist(self):
+        """Returns the values as a list of floats, e.g. for JSON serialization"""
+        return self._values.tolist()
+
+
+class SchedulePool:
+    """Interns ScheduleValues by content hash so that identical schedules
+    share a single packed array
+    """
+
+    def __init__(self):
+        self._schedules = {}
+
+    def __len__(self):
+        return len(self._schedules)
+
+    def intern(self, values):
+        """Returns the shared ScheduleValues for a sequence of values
+
+        Parameters
+        ----------
+        values : iterable of float
+            The schedule values
+
+        Returns
+        -------
+        ScheduleValues
+            The pooled instance having the same content
+        """
+        schedule_values = values if isinstance(values, ScheduleValues) else ScheduleValues(values)
+
+        return self._schedules.setdefault(schedule_values.content_hash, schedule_values)
+
+
+def compact_schedules(*rmrs, pool = None):
+    """Replaces the values list of every schedule in the RMRs with a shared
+    ScheduleValues
+
+    Passing the user, baseline, and proposed RMRs of a trio together lets
+    identical schedules in all three share storage. Schedules whose values
+    are not all numbers, including booleans, are left untouched so that
+    schema validation can report them, as are schedules with integers too
+    large for a double.
+
+    Parameters
+    ----------
+    rmrs : dict
+        RMRs as deserialized from JSON; None entries are skipped
+    pool : SchedulePool
+        Optional pool to intern into; a new pool is used by default
+
+    Returns
+    -------
+    SchedulePool
+        The pool holding the interned schedule values
+    """
+    if pool is None:
+        pool = SchedulePool()
+
+    for rmr in rmrs:
+        if not isinstance(rmr, dict):
+            continue
+        for schedule in rmr.get('schedules', []):
+            if not isinstance(schedule, dict):
+                continue
+            values = schedule.get('values')
+            if isinstance(values, list):
+                try:
+                    schedule['values'] = pool.intern(values)
+                except TypeError:
+                    # Non-numeric or boolean values; leave them for schema validation
+                    pass
+                except OverflowError:
+                    # Integers beyond the range of a double are kept exactly as given
+                    pass
+
+    return pool
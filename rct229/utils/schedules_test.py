@@ -0,0 +1,61 @@
+import pytest
+
+from rct229.schema.validate import validate_rmr
+from schedules import compact_schedules, ScheduleValues, SchedulePool
+
+# Testing ScheduleValues
+def test__schedule_values__sequence_access():
+    values = ScheduleValues([0, 0.5, 1])
+    assert len(values) == 3
+    assert values[1] == 0.5
+    assert values[-1] == 1.0
+    assert list(values[0:2]) == [0.0, 0.5]
+    assert list(values) == [0.0, 0.5, 1.0]
+
+def test__schedule_values__equals_list():
+    assert ScheduleValues([0, 0.5, 1]) == [0, 0.5, 1]
+    assert ScheduleValues([0, 0.5, 1]) != [0, 0.5]
+
+def test__schedule_values__is_read_only():
+    values = ScheduleValues([0, 0.5, 1])
+    with pytest.raises(TypeError):
+        values[0] = 1
+
+def test__schedule_values__content_hash():
+    assert ScheduleValues([1, 2]).content_hash == ScheduleValues([1.0, 2.0]).content_hash
+    assert ScheduleValues([1, 2]).content_hash != ScheduleValues([2, 1]).content_hash
+
+# Testing compact_schedules()
+def test__compact_schedules__shares_identical_schedules_across_rmrs():
+    user_rmr = {'schedules': [{'id': 1, 'name': 'S1', 'values': [1, 0, 1]}]}
+    baseline_rmr = {'schedules': [
+        {'id': 1, 'name': 'S1', 'values': [1, 0, 1]},
+        {'id': 2, 'name': 'S2', 'values': [0, 0, 1]}
+    ]}
+    pool = compact_schedules(user_rmr, baseline_rmr, None)
+
+    assert len(pool) == 2
+    assert user_rmr['schedules'][0]['values'] is baseline_rmr['schedules'][0]['values']
+    assert baseline_rmr['schedules'][1]['values'] == [0, 0, 1]
+
+def test__compact_schedules__leaves_non_numeric_values():
+    rmr = {'schedules': [{'id': 1, 'name': 'S1', 'values': [1, 'x']}]}
+    compact_schedules(rmr, pool = SchedulePool())
+    assert rmr['schedules'][0]['values'] == [1, 'x']
+
+def test__schedule_values__refuses_booleans():
+    with pytest.raises(TypeError):
+        ScheduleValues([0.5, True])
+
+def test__compact_schedules__leaves_boolean_values_for_validation():
+    values = [True, False] * 4380
+    rmr = {'schedules': [{'id': 1, 'name': 'S1', 'values': values}]}
+    assert not validate_rmr(rmr)['passed']
+    compact_schedules(rmr, pool = SchedulePool())
+    assert rmr['schedules'][0]['values'] is values
+    assert "True is not of type 'number'" in validate_rmr(rmr)['error']
+
+def test__compact_schedules__leaves_values_too_large_for_doubles():
+    rmr = {'schedules': [{'id': 1, 'name': 'S1', 'values': [1, 10**400]}]}
+    compact_schedules(rmr, pool = SchedulePool())
+    assert rmr['schedules'][0]['values'] == [1, 10**400]
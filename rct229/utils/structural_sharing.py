@@ -0,0 +1,198 @@
+from array import array
+import sys
+
+from rct229.utils.schedules import ScheduleValues
+
+FROZEN_MSG = 'Shared RMR subtrees are immutable'
+
+
+class FrozenDict(dict):
+    """An immutable dict used for RMR subtrees shared between RMRs
+
+    It subclasses dict so that json, jsonpointer, jsonpath_ng, and jsonschema
+    handle it exactly like the dict it replaces.
+    """
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(FROZEN_MSG)
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __ior__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+
+    def __eq__(self, other):
+        return self is other or dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """An immutable list used for RMR subtrees shared between RMRs
+
+    It subclasses list so that json, jsonpointer, jsonpath_ng, and jsonschema
+    handle it exactly like the list it replaces.
+    """
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(FROZEN_MSG)
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __iadd__ = _immutable
+    __imul__ = _immutable
+    append = _immutable
+    clear = _immutable
+    extend = _immutable
+    insert = _immutable
+    pop = _immutable
+    remove = _immutable
+    reverse = _immutable
+    sort = _immutable
+
+    def __eq__(self, other):
+        return self is other or list.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+class SubtreeInterner:
+    """Interns RMR subtrees bottom-up by their structure
+
+    Two subtrees are shared when they have the same type, the same keys in
+    the same order, and children that are themselves shared. Frozen
+    subtrees are taken to be interned already and are returned as is.
+
+    Passing object_pairs_hook to the JSON decoder interns each object as it
+    is parsed, so duplicate subtrees are discarded as soon as they are
+    built rather than after the whole RMR is in memory.
+    """
+
+    def __init__(self):
+        self._pool = {}
+
+    @staticmethod
+    def _number_key(obj):
+        if isinstance(obj, float):
+            # Distinguishes 0.0 from -0.0 and lets nan match itself
+            return (float, obj.hex())
+        return (type(obj), obj)
+
+    @staticmethod
+    def _key(obj):
+        """Returns the key of an interned child in its container's pool key"""
+        # Interned containers and numbers are kept alive by the pool, so
+        # their ids are stable
+        if isinstance(obj, (FrozenDict, FrozenList, ScheduleValues, int, float)):
+            return id(obj)
+        return (type(obj), obj)
+
+    def intern(self, obj):
+        if isinstance(obj, (FrozenDict, FrozenList)):
+            return obj
+
+        elif isinstance(obj, dict):
+            return self.object_pairs_hook(obj.items())
+
+        elif isinstance(obj, list):
+            values = [self.intern(value) for value in obj]
+            keys = [self._key(value) for value in values]
+            if all(isinstance(key, int) for key in keys):
+                # Packed, as long lists such as schedule values would otherwise
+                # need a tuple of int objects as large as the list itself
+                pool_key = (FrozenList, array('Q', keys).tobytes())
+            else:
+                pool_key = (FrozenList, tuple(keys))
+            shared = self._pool.get(pool_key)
+            if shared is None:
+                shared = self._pool[pool_key] = FrozenList(values)
+            return shared
+
+        elif isinstance(obj, ScheduleValues):
+            return self._pool.setdefault((ScheduleValues, obj.content_hash), obj)
+
+        elif isinstance(obj, str):
+            return sys.intern(obj)
+
+        elif isinstance(obj, (int, float)):
+            return self._pool.setdefault(self._number_key(obj), obj)
+
+        return obj
+
+    def object_pairs_hook(self, pairs):
+        """Interns a JSON object from its key and value pairs; see
+        json.load()
+        """
+        items = [
+            (sys.intern(key) if isinstance(key, str) else key, self.intern(value))
+            for key, value in pairs
+        ]
+        pool_key = (FrozenDict, tuple((key, self._key(value)) for key, value in items))
+        shared = self._pool.get(pool_key)
+        if shared is None:
+            shared = self._pool[pool_key] = FrozenDict(items)
+
+        return shared
+
+
+def share_structure(*rmrs):
+    """Interns identical subtrees across RMRs into shared immutable objects
+
+    Passing the user, baseline, and proposed RMRs of a trio together lets
+    subtrees that are identical in any of them be stored once. The returned
+    RMRs are made of FrozenDict and FrozenList objects, so any
+    in-place modification, such as compact_schedules(), must happen first.
+
+    The RMRs are copied while the originals are still held, so for RMRs
+    loaded from files pass a SubtreeInterner to deserialize_rmr_file()
+    instead, which shares subtrees while parsing.
+
+    Parameters
+    ----------
+    rmrs : dict
+        RMRs as deserialized from JSON; None entries are passed through
+
+    Returns
+    -------
+    tuple
+        The shared RMRs in the order given
+    """
+    interner = SubtreeInterner()
+
+    return tuple(None if rmr is None else interner.intern(rmr) for rmr in rmrs)
+
+
+def subtrees_equal(subtree1, subtree2):
+    """Compares two RMR subtrees, short-circuiting on shared subtrees
+
+    Parameters
+    ----------
+    subtree1 : any
+        An RMR subtree
+    subtree2 : any
+        Another RMR subtree
+
+    Returns
+    -------
+    bool
+        True if the subtrees are equal
+    """
+    return subtree1 is subtree2 or subtree1 == subtree2
@@ -0,0 +1,58 @@
+import json
+import pytest
+
+from structural_sharing import share_structure, subtrees_equal, FrozenDict, FrozenList, SubtreeInterner
+
+user_rmr = {
+    'transformers': [{'name': 'T1', 'capacity': 500.0}, {'name': 'T2', 'capacity': 500.0}]
+}
+baseline_rmr = {
+    'transformers': [{'name': 'T1', 'capacity': 500.0}, {'name': 'T2', 'capacity': 600.0}]
+}
+
+# Testing share_structure()
+def test__share_structure__preserves_content():
+    shared_user, shared_baseline, shared_proposed = share_structure(user_rmr, baseline_rmr, None)
+    assert shared_user == user_rmr
+    assert shared_baseline == baseline_rmr
+    assert shared_proposed is None
+
+def test__share_structure__shares_identical_subtrees():
+    shared_user, shared_baseline = share_structure(user_rmr, baseline_rmr)
+    assert shared_user['transformers'][0] is shared_baseline['transformers'][0]
+    assert shared_user['transformers'][1] is not shared_baseline['transformers'][1]
+
+def test__share_structure__shares_identical_rmrs():
+    shared_user, shared_baseline = share_structure(user_rmr, {'transformers': [dict(t) for t in user_rmr['transformers']]})
+    assert shared_user is shared_baseline
+
+def test__share_structure__is_immutable():
+    shared_user, = share_structure(user_rmr)
+    assert isinstance(shared_user, FrozenDict)
+    assert isinstance(shared_user['transformers'], FrozenList)
+    with pytest.raises(TypeError):
+        shared_user['transformers'] = []
+    with pytest.raises(TypeError):
+        shared_user['transformers'].append({})
+
+def test__share_structure__keeps_distinct_number_types():
+    shared_a, shared_b = share_structure({'value': 1}, {'value': 1.0})
+    assert shared_a is not shared_b
+    assert isinstance(shared_a['value'], int)
+
+# Testing SubtreeInterner.object_pairs_hook()
+def test__object_pairs_hook__shares_while_parsing():
+    interner = SubtreeInterner()
+    parsed_user = json.loads(json.dumps(user_rmr), object_pairs_hook = interner.object_pairs_hook)
+    parsed_baseline = json.loads(json.dumps(baseline_rmr), object_pairs_hook = interner.object_pairs_hook)
+    shared_user, shared_baseline = share_structure(user_rmr, baseline_rmr)
+    assert parsed_user == shared_user
+    assert isinstance(parsed_user['transformers'], FrozenList)
+    assert parsed_user['transformers'][0] is parsed_baseline['transformers'][0]
+    assert parsed_user['transformers'][1] is not parsed_baseline['transformers'][1]
+
+# Testing subtrees_equal()
+def test__subtrees_equal__with_shared_and_unshared_subtrees():
+    shared_user, shared_baseline = share_structure(user_rmr, baseline_rmr)
+    assert subtrees_equal(shared_user['transformers'][0], shared_baseline['transformers'][0])
+    assert not subtrees_equal(shared_user['transformers'], shared_baseline['transformers'])